@@ -3,7 +3,7 @@ Contains features for load configuration
 """
 import os
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Union, Dict
 
 from dacite import from_dict, Config
@@ -81,9 +81,93 @@ class EndingCondition:
 @dataclass
 class DistributionsRuntimeSettings:
     """
+    preserving_ranges: dump schedules of distributions by stage numbers (CKLKRS), times are set in picoseconds.
+    Schedule is a linear range {"start", "stop", "step"}, log-spaced times {"log": {"start", "stop", "number"}},
+    explicit times {"times": [...]} or a list of them (see wrapper/core/dump_schedule.py).
+    keep_sweep_points: move preserved distributions of each computed point to "sweep" path
+    (see wrapper/misc/collections/fields_integral/fields_integral_sweep.py).
     """
     enable_preserving_ranges: bool
     preserving_ranges: dict
+    keep_sweep_points: bool = False
+
+
+@dataclass
+class ProcessSettings:
+    """
+    Settings of "Treada" process launching and supervising.
+    """
+    async_supervisor: bool = False
+    stderr_tail_length: int = 50
+
+
+@dataclass
+class WatchdogSettings:
+    """
+    Limits for stalled or died "Treada" processes. Null limit value disables the limit.
+    for_stages: {stage_name: {"inactivity_timeout_s": float, "wall_clock_limit_s": float}} overrides.
+    """
+    enable: bool = False
+    inactivity_timeout_s: Union[float, None] = 600.
+    wall_clock_limit_s: Union[float, None] = None
+    max_retries: int = 1
+    for_stages: dict = field(default_factory=dict)
+
+
+@dataclass
+class ProgressSettings:
+    """
+    Live progress metrics (steps/s, simulated ps/s, ETA) shown in console and flushed to metrics file.
+    """
+    enable: bool = False
+    update_interval_s: float = 1.
+
+
+@dataclass
+class LiveMonitorSettings:
+    """
+    Shared memory ring buffer of live currents and its out-of-process monitor (--monitor mode).
+    """
+    enable: bool = False
+    shared_memory_name: str = 'treada_live_currents'
+    capacity: int = 100000
+    max_plot_points: int = 5000
+    refresh_interval_ms: int = 200
+
+
+@dataclass
+class CaptureReductionSettings:
+    """
+    Swing door reduction of currents lines written to raw output file on plateaus of source current.
+    The first warmup_steps lines (not less than NMBPZ0 + 2, NMBPZ0 from MTUT) are always kept:
+    NMBPZ0 + 1 lines of initial time steps and the first line of operating time step,
+    so a skipped gap never spans the change of time step.
+    """
+    enable: bool = False
+    relative_tolerance: float = 1e-4
+    absolute_tolerance: float = 0.
+    max_skipped_steps: int = 1000
+    warmup_steps: int = 1000
+
+
+@dataclass
+class FrequencyBandsSettings:
+    """
+    Parallel small signal info stage: MTUT frequency range is split into bands_number bands, each band is computed
+    by its own "Treada" process in a sandbox directory (not more than max_workers at once).
+    start_var, stop_var, number_var: MTUT variables of frequency range and number of frequencies
+    (null number_var - number of frequencies is not changed in bands). scale: "log" or "linear" frequency grid.
+    sandbox_files: names or glob patterns of Treada's input files, which are copied from Treada's directory
+    to band directories besides MTUT (temporary distributions of the directory are not copied).
+    """
+    enable: bool = False
+    bands_number: int = 4
+    max_workers: Union[int, None] = None
+    start_var: str = 'FMIN'
+    stop_var: str = 'FMAX'
+    number_var: Union[str, None] = 'NFREQ'
+    scale: str = 'log'
+    sandbox_files: list = field(default_factory=list)
 
 
 @dataclass
@@ -95,6 +179,12 @@ class RuntimeSettings:
     dark_impulse: DarkImpulse
     ending_condition: EndingCondition
     distributions: DistributionsRuntimeSettings
+    process: ProcessSettings = field(default_factory=ProcessSettings)
+    watchdog: WatchdogSettings = field(default_factory=WatchdogSettings)
+    progress: ProgressSettings = field(default_factory=ProgressSettings)
+    live_monitor: LiveMonitorSettings = field(default_factory=LiveMonitorSettings)
+    capture_reduction: CaptureReductionSettings = field(default_factory=CaptureReductionSettings)
+    frequency_bands: FrequencyBandsSettings = field(default_factory=FrequencyBandsSettings)
 
 
 @dataclass
@@ -125,6 +215,50 @@ class MeanDataFrameCols(CommonDataFrameCols):
     pass
 
 
+@dataclass
+class RawOutputSettings:
+    """
+    Streaming compression of raw output file: "none", "gzip" (.gz suffix) or "xz" (.xz suffix).
+    compression_level is gzip compress level or xz preset.
+    index: build sidecar step index of raw output during capture (checkpoint each index_interval steps).
+    """
+    compression: str = 'none'
+    compression_level: int = 1
+    index: bool = False
+    index_interval: int = 1000
+
+
+@dataclass
+class StreamingAnalysisSettings:
+    """
+    Out-of-core transient analysis: raw output is processed by chunks of chunk_size currents lines,
+    result file is written incrementally. Results are identical to the in-memory analysis.
+    """
+    enable: bool = False
+    chunk_size: int = 1000000
+
+
+@dataclass
+class LeanCollectorSettings:
+    """
+    Memory-lean transient analysis: dataframe cols are stored in one block without copies,
+    float32 halves memory of the block.
+    """
+    enable: bool = False
+    float32: bool = False
+
+
+@dataclass
+class MemoizationSettings:
+    """
+    Disk-backed memoization of analysis results (transient analysis, loaded results, Z parameters).
+    Entries are kept in "cache" result path, least recently used entries are removed above max_size_mb.
+    Parsed WW files are kept in "ww" directory of the cache path with the same size bound.
+    """
+    enable: bool = False
+    max_size_mb: float = 1024.
+
+
 @dataclass
 class ResultSettings:
     """
@@ -133,6 +267,22 @@ class ResultSettings:
     dataframe: DataFrameCols
     mean_dataframe: MeanDataFrameCols
     extra_variables: list
+    # Save all numeric columns of Treada's currents lines in addition to the source current
+    currents_columns: bool = False
+    raw_output: RawOutputSettings = field(default_factory=RawOutputSettings)
+    streaming_analysis: StreamingAnalysisSettings = field(default_factory=StreamingAnalysisSettings)
+    lean_collector: LeanCollectorSettings = field(default_factory=LeanCollectorSettings)
+    memoization: MemoizationSettings = field(default_factory=MemoizationSettings)
+
+
+@dataclass
+class TracingSettings:
+    """
+    Tracing of launcher stages. Spans are saved to "trace" result path in Chrome trace format.
+    memory_report: print peak memory of result collecting on each stage (tracemalloc)
+    """
+    enable: bool = False
+    memory_report: bool = False
 
 
 @dataclass
@@ -142,6 +292,7 @@ class AdvancedSettings:
     runtime: RuntimeSettings
     transient: TransientSettings
     result: ResultSettings
+    tracing: TracingSettings = field(default_factory=TracingSettings)
 
 # Paths section
 @dataclass
@@ -171,6 +322,8 @@ class TemporaryResultFilePaths:
     """
     raw: str
     distributions: str
+    sweep: str = os.path.join('data', 'result', 'temp', 'sweep', '')
+    frequency_bands: str = os.path.join('data', 'result', 'temp', 'frequency_bands', '')
 
 
 @dataclass
@@ -181,6 +334,9 @@ class ResultPaths:
     main: str
     plots: str
     temporary: TemporaryResultFilePaths
+    trace: str = os.path.join('data', 'result', 'trace.json')
+    metrics: str = os.path.join('data', 'result', 'metrics.json')
+    cache: str = os.path.join('data', 'result', 'cache', '')
 
 
 @dataclass
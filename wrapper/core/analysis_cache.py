@@ -0,0 +1,165 @@
+"""
+Disk-backed memoization of derived analysis data.
+Entries are npz files of named arrays in the cache directory. Entry name is a digest of the key, which is built from
+the input data digest, MTUT vars and analysis settings, so unchanged data is never analysed again.
+Total size of the cache is bounded: least recently used entries are evicted.
+
+How to use:
+    1) analysis_cache.configure(enable=True, cache_dir=config.paths.result.cache, max_size_mb=1024)
+    2) key = analysis_cache.key('name', analysis_cache.file_digest(input_path), settings)
+    3) arrays = analysis_cache.memoize(key, compute)  # compute() -> Dict[str, np.ndarray]
+"""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Union
+
+import numpy as np
+
+
+# Is changed if derived data of the same key changes
+ANALYSIS_CACHE_VERSION = 1
+_ENTRY_SUFFIX = '.npz'
+_DIGEST_CHUNK_SIZE = 2 ** 20
+
+
+class AnalysisCache:
+    """
+    Attributes:
+        enabled: is memoization enabled
+        cache_dir: directory of cache entries
+        max_size: maximum total size of entries (bytes)
+        hits, misses: numbers of memoized and computed loads
+    Methods:
+        configure(enable: bool, cache_dir: str, max_size_mb: float)
+        key(*parts) -> str
+        file_digest(file_path: str) -> str
+        arrays_digest(*arrays) -> str
+        load(key: str) -> Union[Dict[str, np.ndarray], None]
+        save(key: str, arrays: Dict[str, np.ndarray])
+        memoize(key: str, compute: Callable) -> Dict[str, np.ndarray]
+        evict()
+    """
+    def __init__(self):
+        self.enabled = False
+        self.cache_dir = ''
+        self.max_size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, enable: bool, cache_dir: str, max_size_mb=1024.):
+        self.enabled = enable
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 2 ** 20)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts) -> str:
+        """
+        :param parts: JSON serializable key parts (digests, MTUT vars, settings)
+        :return: digest of key parts
+        """
+        key_string = json.dumps([ANALYSIS_CACHE_VERSION, *parts], sort_keys=True, default=str)
+        return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        file_hash = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(_DIGEST_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
+
+    @staticmethod
+    def arrays_digest(*arrays: np.ndarray) -> str:
+        arrays_hash = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            arrays_hash.update(str((array.dtype.descr, array.shape)).encode())
+            arrays_hash.update(array.data)
+        return arrays_hash.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _ENTRY_SUFFIX)
+
+    def load(self, key: str) -> Union[Dict[str, np.ndarray], None]:
+        """
+        :return: memoized arrays or None if cache is disabled or there is no valid entry
+        """
+        if not self.enabled:
+            return None
+        entry_path = self.entry_path(key)
+        try:
+            with np.load(entry_path, allow_pickle=False) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+        except (OSError, ValueError):
+            # Missed or broken entry
+            self.misses += 1
+            return None
+        # Access time of the entry for eviction
+        os.utime(entry_path)
+        self.hits += 1
+        return arrays
+
+    def save(self, key: str, arrays: Dict[str, np.ndarray]):
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Entry is written to temporary file and renamed, so readers never see a partial entry
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as entry_file:
+                np.savez(entry_file, **arrays)
+            os.replace(temporary_path, self.entry_path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        self.evict()
+
+    def memoize(self, key: str, compute: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """
+        :param compute: function which calculates arrays if they are not memoized
+        :return: memoized or calculated arrays
+        """
+        arrays = self.load(key)
+        if arrays is not None:
+            return arrays
+        arrays = compute()
+        self.save(key, arrays)
+        return arrays
+
+    def evict(self):
+        """
+        Removes least recently used entries while total size of entries is more than max_size.
+        """
+        evict_least_recently_used(self.cache_dir, _ENTRY_SUFFIX, self.max_size)
+
+
+def evict_least_recently_used(cache_dir: str, suffix: str, max_size: int):
+    """
+    Removes least recently used files with the suffix of the directory while their total size is more than max_size.
+    Recency is mtime of the file, so loads of entries must update it.
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(suffix):
+            try:
+                entry_stat = entry.stat()
+            except FileNotFoundError:
+                # Entry is evicted by another process
+                continue
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= max_size:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+
+
+analysis_cache = AnalysisCache()
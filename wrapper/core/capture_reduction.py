@@ -0,0 +1,100 @@
+"""
+Capture-time reduction of "Treada's" raw output by the swing door compression of source currents.
+While the current changes, each line is kept. On a plateau only the lines which can not be restored
+by linear interpolation within the tolerance are kept, skipped lines are replaced by marker lines:
+    SKIPPED_STEPS <number of skipped currents lines>
+so TransientOutputParser restores true step indexes of the kept lines.
+"""
+import math
+from typing import List, Union
+
+
+SKIPPED_STEPS_MARKER = 'SKIPPED_STEPS'
+
+
+class SwingDoorReducer:
+    """
+    Decides which currents lines of raw output are written to file.
+    Decision about a currents line is made when the next line arrives, so one line is held as pending.
+
+    Attributes:
+        steps: number of currents lines pushed
+        kept_steps: number of currents lines kept
+    Methods:
+        push(line: str, current: Union[float, None]) -> List[str]
+        flush() -> List[str]
+    How to use:
+        output_file.writelines(reducer.push(line, current_value))  # current_value is None for other lines
+        output_file.writelines(reducer.flush())  # at the end of the stage
+    """
+    def __init__(self, relative_tolerance: float, absolute_tolerance=0., max_skipped_steps=1000, warmup_steps=0):
+        """
+        :param relative_tolerance: allowed interpolation error relative to the current value
+        :param absolute_tolerance: minimal allowed interpolation error
+        :param max_skipped_steps: maximal number of consecutive skipped lines
+        :param warmup_steps: number of first currents lines which are always kept
+        """
+        self.relative_tolerance = relative_tolerance
+        self.absolute_tolerance = absolute_tolerance
+        self.max_skipped_steps = max_skipped_steps
+        self.warmup_steps = warmup_steps
+        self.steps = 0
+        self.kept_steps = 0
+        self._last_kept_step = -1
+        # Last kept point: (step, current)
+        self._pivot: Union[tuple, None] = None
+        # Last pushed not kept point: (step, current, line)
+        self._pending: Union[tuple, None] = None
+        self._slope_max = math.inf
+        self._slope_min = -math.inf
+
+    def push(self, line: str, current: Union[float, None]) -> List[str]:
+        """
+        :param line: raw output line
+        :param current: source current value if the line is a currents line, None otherwise
+        :return: lines to write to raw output file
+        """
+        if current is None:
+            # Other lines keep their position relative to currents lines
+            return self.flush() + [line]
+        step = self.steps
+        self.steps += 1
+        if self._pivot is None or step < self.warmup_steps:
+            return self.flush() + self._keep(step, current, line)
+        pivot_step, pivot_current = self._pivot
+        tolerance = max(self.absolute_tolerance, self.relative_tolerance * abs(current))
+        steps_from_pivot = step - pivot_step
+        slope_max = min(self._slope_max, (current + tolerance - pivot_current) / steps_from_pivot)
+        slope_min = max(self._slope_min, (current - tolerance - pivot_current) / steps_from_pivot)
+        if slope_min <= slope_max and steps_from_pivot - 1 <= self.max_skipped_steps:
+            self._slope_max, self._slope_min = slope_max, slope_min
+            self._pending = (step, current, line)
+            return []
+        # The door is closed: pending point is kept and becomes a new pivot
+        pending_step, pending_current, pending_line = self._pending
+        lines = self._keep(pending_step, pending_current, pending_line)
+        steps_from_pivot = step - pending_step
+        self._slope_max = (current + tolerance - pending_current) / steps_from_pivot
+        self._slope_min = (current - tolerance - pending_current) / steps_from_pivot
+        self._pending = (step, current, line)
+        return lines
+
+    def flush(self) -> List[str]:
+        """
+        Keeps the pending line. Must be called at the end of the stage.
+        :return: lines to write to raw output file
+        """
+        if self._pending is None:
+            return []
+        return self._keep(*self._pending)
+
+    def _keep(self, step: int, current: float, line: str) -> List[str]:
+        skipped_steps = step - self._last_kept_step - 1
+        self._last_kept_step = step
+        self._pivot = (step, current)
+        self._pending = None
+        self._slope_max, self._slope_min = math.inf, -math.inf
+        self.kept_steps += 1
+        if skipped_steps:
+            return [f'{SKIPPED_STEPS_MARKER} {skipped_steps}\n', line]
+        return [line]
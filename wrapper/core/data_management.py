@@ -9,7 +9,7 @@ from io import StringIO
 from itertools import islice
 from dataclasses import dataclass, field
 from pprint import pprint
-from typing import Union, List, Tuple, Dict, Iterable
+from typing import Union, List, Tuple, Dict, Iterable, Iterator
 
 from colorama import Fore, Style
 
@@ -22,11 +22,19 @@ try:
     from wrapper.config.config_build import Paths, ResultPaths, ResultSettings, Config
     from wrapper.misc.global_functions import create_dir
     from wrapper.misc import lin_alg as alg
+    from wrapper.misc.tracing import tracer, traced
+    from wrapper.core.capture_reduction import SKIPPED_STEPS_MARKER
+    from wrapper.core.raw_output import open_raw_output
+    from wrapper.core.small_signal_store import SmallSignalResultStore
 except ModuleNotFoundError:
     from launch.scenarios.scenario_build import Stage
     from config.config_build import Paths, ResultPaths, ResultSettings, Config
     from misc.global_functions import create_dir
     from misc import lin_alg as alg
+    from misc.tracing import tracer, traced
+    from core.capture_reduction import SKIPPED_STEPS_MARKER
+    from core.raw_output import open_raw_output
+    from core.small_signal_store import SmallSignalResultStore
 
 
 # Global settings
@@ -263,6 +271,66 @@ transient_cols = TransientDataFrameColNames(
 )
 
 
+# Numeric fields of Treada's currents line: source current, step number and other currents.
+# Currents lines consist of 12 or 13 fields, the absent last field is NaN.
+currents_line_fields = ('source_current', 'step') + tuple(f'col_{index}' for index in range(2, 13))
+currents_line_dtype = np.dtype([(name, np.float64) for name in currents_line_fields])
+# Currents line starts with source current and step number
+CURRENTS_LINE_PATTERN = re.compile(r'\s*[-+]?\d+\.\d+[eE][-+]?\d+\s+\d+\.')
+
+
+def currents_array_to_dataframe(currents_array: np.ndarray, all_columns=False) -> pd.DataFrame:
+    """
+    Converts structured array of currents lines fields to dataframe with transient col names.
+    :param currents_array: array of currents_line_dtype
+    :param all_columns: include all fields or source current only
+    """
+    field_names = currents_line_fields if all_columns else currents_line_fields[:1]
+    currents_df = pd.DataFrame({name: currents_array[name] for name in field_names})
+    return currents_df.rename(columns={'source_current': transient_cols.source_current})
+
+
+class CurrentsCapture:
+    """
+    Structured array of currents lines fields, which is filled during Treada's stdout streaming.
+    Reuses fields which are already split by the stdout capturer.
+
+    How to use:
+        capture.append(currents_list)
+        currents_array = capture.get_array()
+    """
+    _nan_padding = (np.nan,) * len(currents_line_fields)
+
+    def __init__(self, initial_size=4096):
+        self.array = np.empty(initial_size, dtype=currents_line_dtype)
+        self.size = 0
+
+    def append(self, currents_list: List[str]):
+        """
+        Appends fields of currents line. Fields that are not numbers (e.g. "*****" on Fortran overflow) are NaN,
+        so the capture never interrupts Treada's output streaming.
+        """
+        if self.size == self.array.size:
+            self.array = np.concatenate((self.array, np.empty(self.array.size, dtype=currents_line_dtype)))
+        currents_list = currents_list[:len(currents_line_fields)]
+        try:
+            row = tuple(map(float, currents_list))
+        except ValueError:
+            row = tuple(self.to_float(field) for field in currents_list)
+        self.array[self.size] = row + self._nan_padding[len(row):]
+        self.size += 1
+
+    @staticmethod
+    def to_float(field: str) -> float:
+        try:
+            return float(field)
+        except ValueError:
+            return np.nan
+
+    def get_array(self) -> np.ndarray:
+        return self.array[:self.size]
+
+
 @dataclass
 class ComplexParamNameParts:
     name: str
@@ -295,13 +363,15 @@ class TreadaOutputParser:
         1) Create an instance (performs parsing of raw "Treada's" output file)
         2) Get a prepared data by get_prepared_dataframe() method
     Attributes:
-        raw_output_path: path to Treada's raw output file
+        raw_output_path: path to Treada's raw output file (it can be compressed, see raw_output module)
+        is_streamed: if True, clean_data() gets the iterator over raw file lines instead of loaded list
     Methods:
         prepare_data() -> pd.DataFrame
         load_raw_file(raw_file_path: str) -> list
         clean_data(data_list: list) -> pd.DataFrame
         get_prepared_dataframe() -> pd.DataFrame
     """
+    is_streamed = False
 
     def __init__(self, raw_output_path: str):
         self.raw_output_path = raw_output_path
@@ -309,15 +379,17 @@ class TreadaOutputParser:
         self.dataframe: pd.DataFrame = prepared_dataframe
 
     def prepare_data(self) -> pd.DataFrame:
-        # Load raw treada output file
-        data_list = self.load_raw_file(self.raw_output_path)
-        # Create prepared dataframe with source currents
-        prepared_dataframe = self.clean_data(data_list)
+        with tracer.span(f'{self.__class__.__name__}.prepare_data', path=self.raw_output_path):
+            # Load raw treada output file (decompressed stream is read incrementally if parser is streamed)
+            with open_raw_output(self.raw_output_path) as raw_file:
+                data_list = raw_file if self.is_streamed else raw_file.readlines()
+                # Create prepared dataframe with source currents
+                prepared_dataframe = self.clean_data(data_list)
         return prepared_dataframe
 
     @staticmethod
     def load_raw_file(raw_file_path: str) -> list:
-        with open(raw_file_path, 'r') as file:
+        with open_raw_output(raw_file_path) as file:
             data = file.readlines()
         return data
 
@@ -344,16 +416,123 @@ class TransientOutputParser(TreadaOutputParser):
     Methods:
     """
 
-    def __init__(self, raw_output_path: str):
+    # Only currents lines are kept in memory
+    is_streamed = True
+    # Parse all numeric columns of currents lines, not only source current
+    all_columns = False
+    currents_array: Union[np.ndarray, None] = None
+
+    def __init__(self, raw_output_path: str, all_columns=False):
+        self.all_columns = all_columns
         super().__init__(raw_output_path)
 
-    def clean_data(self, data_list: list) -> pd.DataFrame:
-        # Get pure source currents list
-        pure_data_lines = [line.split(' ', 1)[0] for line in data_list if self.find_currents_line(line)]
-        # Creation of dataframe of float currents
-        pure_df = pd.DataFrame({transient_cols.source_current: pure_data_lines}).astype(np.float64)
+    def clean_data(self, data_list: Iterable[str]) -> pd.DataFrame:
+        # Currents lines and markers of steps skipped by capture reduction
+        currents_lines = [line for line in data_list
+                          if self.find_currents_line(line) or line.startswith(SKIPPED_STEPS_MARKER)]
+        currents_lines, steps_index = self.restore_steps_index(currents_lines)
+        pure_df, currents_array = self.currents_lines_to_dataframe(currents_lines, steps_index, self.all_columns)
+        if self.all_columns:
+            self.currents_array = currents_array
         return pure_df
 
+    @classmethod
+    def iter_dataframe_chunks(cls, raw_output_path: str, chunk_size: int, all_columns=False) -> Iterator[pd.DataFrame]:
+        """
+        Parses raw output file by chunks in bounded memory. Concatenated chunks are equal to the parser's dataframe.
+        :param raw_output_path: path to Treada's raw output file
+        :param chunk_size: number of currents lines in chunk
+        :param all_columns: parse all numeric columns of currents lines
+        :return: iterator over dataframes, which are indexed by steps
+        """
+        first_step = 0
+        currents_lines = []
+        chunk_currents_number = 0
+        with open_raw_output(raw_output_path) as raw_file:
+            for line in raw_file:
+                if cls.find_currents_line(line):
+                    currents_lines.append(line)
+                    chunk_currents_number += 1
+                elif line.startswith(SKIPPED_STEPS_MARKER):
+                    currents_lines.append(line)
+                if chunk_currents_number < chunk_size:
+                    continue
+                chunk_df = cls.currents_lines_to_dataframe(*cls.restore_steps_index(currents_lines, first_step),
+                                                           all_columns=all_columns)[0]
+                first_step = chunk_df.index[-1] + 1
+                currents_lines = []
+                chunk_currents_number = 0
+                yield chunk_df
+        if chunk_currents_number:
+            yield cls.currents_lines_to_dataframe(*cls.restore_steps_index(currents_lines, first_step),
+                                                  all_columns=all_columns)[0]
+
+    @classmethod
+    def currents_lines_to_dataframe(cls, currents_lines: List[str], steps_index: Union[np.ndarray, None] = None,
+                                    all_columns=False) -> Tuple[pd.DataFrame, Union[np.ndarray, None]]:
+        """
+        :param currents_lines: pure currents lines
+        :param steps_index: step indexes of the lines (default range index is used if None)
+        :param all_columns: parse all numeric columns of currents lines
+        :return: currents dataframe and structured array of currents lines fields (None if not all_columns)
+        """
+        currents_array = None
+        if all_columns:
+            currents_array = cls.parse_currents_lines(currents_lines)
+            pure_df = currents_array_to_dataframe(currents_array, all_columns=True)
+        else:
+            # Get pure source currents list
+            pure_data_lines = [line.split(' ', 1)[0] for line in currents_lines]
+            # Creation of dataframe of float currents
+            pure_df = pd.DataFrame({transient_cols.source_current: pure_data_lines}).astype(np.float64)
+        if steps_index is not None:
+            pure_df.index = steps_index
+        return pure_df, currents_array
+
+    @staticmethod
+    def restore_steps_index(currents_lines: List[str], first_step=0) -> Tuple[List[str], Union[np.ndarray, None]]:
+        """
+        Removes markers of skipped steps and calculates true step indexes of the remaining currents lines.
+        :param currents_lines: currents lines mixed with skipped steps markers
+        :param first_step: step index of the first line (not zero for the next chunks of raw output)
+        :return: pure currents lines and their step indexes (None if there are no skipped steps and first_step is 0)
+        """
+        if not any(line.startswith(SKIPPED_STEPS_MARKER) for line in currents_lines):
+            if not first_step:
+                return currents_lines, None
+            return currents_lines, np.arange(first_step, first_step + len(currents_lines))
+        pure_currents_lines = []
+        steps_index = []
+        step = first_step
+        for line in currents_lines:
+            if line.startswith(SKIPPED_STEPS_MARKER):
+                step += int(line.split()[1])
+                continue
+            pure_currents_lines.append(line)
+            steps_index.append(step)
+            step += 1
+        return pure_currents_lines, np.array(steps_index)
+
+    @staticmethod
+    def parse_currents_lines(currents_lines: List[str]) -> np.ndarray:
+        """
+        Parses all numeric fields of currents lines to structured array by a single pass of pandas C parser.
+        :param currents_lines: raw currents lines
+        :return: array of currents_line_dtype
+        """
+        if not currents_lines:
+            return np.empty(0, dtype=currents_line_dtype)
+        try:
+            currents_df = pd.read_csv(StringIO(''.join(currents_lines)), sep=' ', header=None,
+                                      names=currents_line_fields, dtype=np.float64, skipinitialspace=True)
+        except (pd.errors.ParserError, ValueError):
+            # Malformed lines are parsed one by one
+            capture = CurrentsCapture(len(currents_lines))
+            for line in currents_lines:
+                capture.append(line.split()[:len(currents_line_fields)])
+            return capture.get_array()
+        return currents_df.to_records(index=False).astype(currents_line_dtype)
+
     def extract_current_value(self, line):
         if self.find_currents_line(line):
             return line.split(' ', 1)[0]
@@ -382,12 +561,10 @@ class TransientOutputParser(TreadaOutputParser):
 
     @staticmethod
     def find_currents_line(string: str) -> bool:
-        numeric_data_pattern = r'\s*[-+]?\d+\.\d+[eE][-+]?\d+\s+\d+\.'
-        match = re.match(numeric_data_pattern, string)
-        if match:
-            return True
-        else:
-            return False
+        """
+        The only predicate of currents lines, it is used by the parser and by the stdout capturer.
+        """
+        return CURRENTS_LINE_PATTERN.match(string) is not None
 
     @staticmethod
     def temporary_results_line_found(string: str) -> bool:
@@ -483,6 +660,108 @@ class SmallSignalInfoOutputParser(TreadaOutputParser):
             raise ValueError(f"Can't extract value of {name}")
 
 
+class VectorizedSmallSignalInfoOutputParser(SmallSignalInfoOutputParser):
+    """
+    SmallSignalInfoOutputParser which finds header data and S/Y parameters tables in one scan
+    of the joined raw output and converts numeric rows of each table by one NumPy conversion.
+    Dataframe and header data are identical to the SmallSignalInfoOutputParser ones.
+    """
+    param_names = ('S22', 'Y22', 'S12', 'Y21')
+    numeric_line_pattern = re.compile(r'^[-+]?\d+\.\d+[eE][-+]?\d+', re.MULTILINE)
+
+    def clean_data(self, data_list: list) -> pd.DataFrame:
+        raw_text = ''.join(data_list)
+        self.find_header_data(raw_text)
+        params_data = {}
+        for params, table_text in self.find_param_tables(raw_text).items():
+            cols = [0]
+            for param in params:
+                col = self.define_param_col_index(param)
+                cols += [col, col + 1]
+            table = self.table_text_to_array(table_text, cols)
+            if not params_data:
+                params_data[small_signal_cols.frequency] = table[:, 0]
+            for param_index, param in enumerate(params):
+                params_data[f'{param}.real'] = table[:, 2 * param_index + 1]
+                params_data[f'{param}.img'] = table[:, 2 * param_index + 2]
+        pure_df = pd.DataFrame(params_data)
+        pd.set_option('display.max_rows', None)
+        pd.set_option('display.max_columns', None)
+        pd.set_option('display.width', None)
+        return pure_df
+
+    @staticmethod
+    def find_line(text: str, position: int) -> Tuple[int, int]:
+        """
+        :return: start and end indexes of the text line which contains position
+        """
+        line_end = text.find('\n', position)
+        return text.rfind('\n', 0, position) + 1, len(text) if line_end == -1 else line_end
+
+    def find_header_data(self, raw_text: str):
+        header_pattern = re.compile('|'.join(map(re.escape, self.header_data)))
+        position = 0
+        while self.is_find_header_data:
+            header_match = header_pattern.search(raw_text, position)
+            if not header_match:
+                break
+            line_start, line_end = self.find_line(raw_text, header_match.start())
+            self.extract_header_data(raw_text[line_start:line_end])
+            position = line_end
+
+    def find_param_tables(self, raw_text: str) -> Dict[tuple, str]:
+        """
+        Finds tables like SmallSignalParamsFilter does: the table starts from the first numeric line after
+        the line with param names and ends before the empty line.
+        :return: dict, where keys: tuples of param names in title and values: text of table numeric rows
+        """
+        param_names = sorted(self.param_names)
+        title_pattern = re.compile('|'.join(param_names))
+        param_tables = {}
+        position = 0
+        while True:
+            title_match = title_pattern.search(raw_text, position)
+            if not title_match:
+                break
+            title_start, title_end = self.find_line(raw_text, title_match.start())
+            numeric_match = self.numeric_line_pattern.search(raw_text, title_start)
+            if not numeric_match:
+                break
+            params = tuple(name for name in param_names if name in raw_text[title_start:title_end])
+            table_start = numeric_match.start()
+            # Numeric line is not empty, so the empty line is preceded by the end of another line
+            ending_index = raw_text.find('\n\n', table_start)
+            if ending_index == -1:
+                param_tables[params] = raw_text[table_start:]
+                break
+            param_tables[params] = raw_text[table_start:ending_index + 1]
+            position = ending_index + 2
+        if not param_tables:
+            raise ValueError('param_indexes not exists')
+        return param_tables
+
+    @staticmethod
+    def table_text_to_array(table_text: str, cols: List[int]) -> np.ndarray:
+        """
+        Converts cols of table rows, which are separated by double spaces, to 2-D array.
+        Tables with irregular rows are converted row by row.
+        :param cols: indexes of cols to convert
+        """
+        rows_number = table_text.count('\n') + (not table_text.endswith('\n'))
+        cols_number = len(table_text[:table_text.find('\n')].split('  '))
+        is_regular = max(cols) < cols_number and table_text.count('  ') == rows_number * (cols_number - 1)
+        if is_regular:
+            try:
+                values = np.array(table_text.split(), dtype=np.float64)
+            except ValueError:
+                values = np.empty(0)
+            if values.size == rows_number * cols_number:
+                return values.reshape(rows_number, cols_number)[:, cols]
+        rows = table_text.split('\n')[:rows_number]
+        table = np.array([[float(row.split('  ')[col]) for col in cols] for row in rows], dtype=np.float64)
+        return table.reshape(-1, len(cols))
+
+
 class SmallSignalParamsFilter:
     """Allows to filter parameters' values in the small signal mode raw info file."""
     def __init__(self, param_names: Iterable):
@@ -696,13 +975,26 @@ class TransientParameters:
 
 
 class TransientResultDataCollector:
-    def __init__(self, mtut_file_path, result_paths: ResultPaths, relative_time: float):
+    def __init__(self, mtut_file_path, result_paths: ResultPaths, relative_time: float,
+                 all_currents_columns=False, currents_array: Union[np.ndarray, None] = None):
+        """
+        :param all_currents_columns: keep all numeric columns of currents lines as extra dataframe cols
+        :param currents_array: currents lines fields captured during the stage run.
+                               If it is passed, raw output file is not parsed again.
+        """
         self.mtut_manager = MtutManager(mtut_file_path)
         self.mtut_manager.load_file()
         self.relative_time = relative_time
-        self.transient_parser = TransientOutputParser(result_paths.temporary.raw)
-        # Set dataframe col names
-        self.dataframe = self.transient_parser.get_prepared_dataframe()
+        if currents_array is not None and currents_array.size:
+            self.transient_parser = None
+            self.dataframe = currents_array_to_dataframe(currents_array, all_columns=all_currents_columns)
+        else:
+            self.transient_parser = TransientOutputParser(result_paths.temporary.raw, all_columns=all_currents_columns)
+            # Set dataframe col names
+            self.dataframe = self.transient_parser.get_prepared_dataframe()
+        self._init_result_attributes(result_paths)
+
+    def _init_result_attributes(self, result_paths: ResultPaths):
         # Create dataframe which contains mean current densities and its dependencies
         self.mean_dataframe = pd.DataFrame()
         # Result data
@@ -717,6 +1009,7 @@ class TransientResultDataCollector:
         # Define Treada's MTUT vars on current stage
         self.treada_state = self._treada_state_definition()
 
+    @traced()
     def prepare_result_data(self, stage: StageData,
                             prev_stage_last_current: Union[float, None],
                             custom_df_col_params: dict):
@@ -767,9 +1060,71 @@ class TransientResultDataCollector:
             if self.treada_state['stage'] > 1:
                 self._add_first_df_current(value=previous_last_current)
 
+    @classmethod
+    def from_memoized_arrays(cls, arrays: Dict[str, np.ndarray], mtut_file_path, result_paths: ResultPaths,
+                             relative_time: float) -> 'TransientResultDataCollector':
+        """
+        Creates collector with result data restored from analysis cache without parsing of raw output.
+        :param arrays: arrays returned by get_memoized_arrays()
+        """
+        result_collector = cls.__new__(cls)
+        result_collector.mtut_manager = MtutManager(mtut_file_path)
+        result_collector.mtut_manager.load_file()
+        result_collector.relative_time = relative_time
+        result_collector.transient_parser = None
+        result_collector._init_result_attributes(result_paths)
+        result_collector.restore_memoized_arrays(arrays)
+        return result_collector
+
+    def get_memoized_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        :return: derived data of prepared result for analysis cache
+        """
+        result_dataframe = self.get_result_dataframe()
+        mean_dataframe = self.get_mean_dataframe()
+        transient_state = {name: value.item() if isinstance(value, np.generic) else value
+                           for name, value in self.transient.__dict__.items()}
+        return {
+            'result_columns': np.array(result_dataframe.columns, dtype=str),
+            'result_values': result_dataframe.values,
+            'result_index': result_dataframe.index.values,
+            'mean_columns': np.array(mean_dataframe.columns, dtype=str),
+            'mean_values': mean_dataframe.values,
+            'mean_index': mean_dataframe.index.values,
+            'last_means': np.array([self.last_mean_time, self.last_mean_current_density], dtype=np.float64),
+            'transient': np.array(json.dumps(transient_state)),
+        }
+
+    def restore_memoized_arrays(self, arrays: Dict[str, np.ndarray]):
+        self.result_dataframe = pd.DataFrame(arrays['result_values'], index=arrays['result_index'],
+                                             columns=arrays['result_columns'].tolist())
+        # Result dataframe has all cols which are used after analysis
+        self.dataframe = self.result_dataframe
+        self.mean_dataframe = pd.DataFrame(arrays['mean_values'], index=arrays['mean_index'],
+                                           columns=arrays['mean_columns'].tolist())
+        self.last_mean_time, self.last_mean_current_density = arrays['last_means']
+        transient_state = json.loads(arrays['transient'].item())
+        if transient_state['criteria_calculating_df_slice'] is not None:
+            transient_state['criteria_calculating_df_slice'] = tuple(transient_state['criteria_calculating_df_slice'])
+        self.transient.__dict__.update(transient_state)
+
+    def get_first_df_current(self, previous_last_current: Union[float, None]) -> Union[float, None]:
+        """
+        :return: current value, which is added as the first value of dataframe (see add_null_current_on_first_stage()
+                 and add_previous_last_current_on_stage()), or None
+        """
+        first_current = None
+        if self.treada_state['stage'] < 2:
+            first_current = 0
+        if previous_last_current and self.treada_state['jpush'] == '0':
+            if self.treada_state['stage'] > 1:
+                first_current = previous_last_current
+        return first_current
+
     def _add_first_df_current(self, value: float):
-        # Adding a current value to string with index = -1
-        self.dataframe.loc[-1] = value
+        # Adding a current value to string with index = -1 (other currents line columns are unknown)
+        self.dataframe.loc[-1] = np.nan
+        self.dataframe.loc[-1, transient_cols.source_current] = value
         # Shifting index
         self.dataframe.index = self.dataframe.index + 1
         # Sorting by index
@@ -836,14 +1191,59 @@ class TransientResultDataCollector:
         # print(f'{operating_time_step_const=}')
         # print(f'{relative_time=}')
 
+    def calculate_time_values(self, steps: np.ndarray, skip_initial_time_step=False) -> np.ndarray:
+        """
+        The same calculation as in time_col_calculate() for an array of steps, which can be a part of dataframe index.
+        Initial steps are never skipped by capture reduction, so the time of the last initial step is known.
+        """
+        operating_time_step = float(self.mtut_manager.get_var('TSTEP'))
+        operating_time_step_const = operating_time_step * self.relative_time
+        if skip_initial_time_step:
+            return steps * operating_time_step_const
+        initial_time_step = float(self.mtut_manager.get_var('TSTEPH'))
+        initial_steps_number = int(self.mtut_manager.get_var('NMBPZ0'))
+        initial_time_step_const = initial_time_step * self.relative_time
+        last_initial_time = np.int64(initial_steps_number) * initial_time_step_const
+        return np.where(
+            steps < initial_steps_number + 1,
+            steps * initial_time_step_const,
+            (steps - initial_steps_number) * operating_time_step_const + last_initial_time,
+        )
+
+    def check_initial_steps_number(self, rows_number: int, skip_initial_time_step=False):
+        """
+        Raises the same error as time_col_calculate() if there are not enough steps for the initial time step.
+        """
+        initial_steps_number = int(self.mtut_manager.get_var('NMBPZ0'))
+        if not skip_initial_time_step and rows_number <= initial_steps_number:
+            error = IndexError('single positional indexer is out-of-bounds')
+            print(f'{error.__class__.__name__}: {error} Maybe number of initial time steps: {initial_steps_number=}'
+                  f' more than steps in current stage.\n'
+                  f'Try to decrease number of initial time steps or time step.')
+            raise error
+
+    def get_step_current_density_seria(self) -> pd.Series:
+        """
+        :return: current density of each step. Steps skipped by capture reduction are restored by linear
+        interpolation between kept steps, it is the approximation which the reducer keeps within its tolerance.
+        """
+        densities = self.dataframe[transient_cols.current_density]
+        steps = self.dataframe.index
+        if len(steps) == 0 or steps[-1] - steps[0] + 1 == len(steps):
+            return densities
+        all_steps = np.arange(steps[0], steps[-1] + 1)
+        return pd.Series(np.interp(all_steps, steps, densities.values), index=all_steps, name=densities.name)
+
     def get_mean_current_density_seria(self, window_size_denominator: Union[None, int]) -> pd.Series:
+        # Windows are counted in steps, so means of reduced capture are weighted by skipped steps
+        step_densities = self.get_step_current_density_seria()
         # Set window_size if denominator exists or use its own window_size value if not
         if window_size_denominator is not None:
-            dataframe_length = self.dataframe.shape[0]
-            self.transient.window_size = int(dataframe_length / window_size_denominator)
+            steps_number = step_densities.shape[0]
+            self.transient.window_size = int(steps_number / window_size_denominator)
         # Calculating
         mean_densities = (
-            self.dataframe[transient_cols.current_density]
+            step_densities
             .rolling(window=self.transient.window_size, step=self.transient.window_size, center=True)
             .mean()
         )
@@ -851,22 +1251,32 @@ class TransientResultDataCollector:
         return mean_densities
 
     def current_density_col_calculate(self):
-        # Get Device Width (microns)
-        device_width = float(self.mtut_manager.get_var('WIDTH'))
-        # Get HY
-        hy = float(self.mtut_manager.get_var('HY').rstrip(')').split('(')[1])
-        # Calculate density col
+        # Calculate density col (device width in microns)
         self.dataframe[transient_cols.current_density] = (
-                self.dataframe[transient_cols.source_current] / (2 * hy * device_width * 1e-8)
+                self.dataframe[transient_cols.source_current] / self.get_current_density_divider()
         )
 
+    def get_current_density_divider(self) -> float:
+        """
+        :return: divider of source current to get current density
+        """
+        device_width = float(self.mtut_manager.get_var('WIDTH'))
+        hy = float(self.mtut_manager.get_var('HY').rstrip(')').split('(')[1])
+        return 2 * hy * device_width * 1e-8
+
     def set_result_dataframe_cols(self):
         self.result_dataframe = self.dataframe[
             [transient_cols.time,
              transient_cols.source_current,
-             transient_cols.current_density]
+             transient_cols.current_density] + self.get_extra_currents_cols()
         ]
 
+    def get_extra_currents_cols(self) -> List[str]:
+        """
+        :return: names of optional currents lines columns, which are present in dataframe
+        """
+        return [col for col in currents_line_fields[1:] if col in self.dataframe.columns]
+
     def find_transient_time(self) -> float:
         """
         Fills mean_dataframe. Calculates and returns transient time.
@@ -877,9 +1287,18 @@ class TransientResultDataCollector:
         self.mean_dataframe[transient_cols.current_density] = (
             self.get_mean_current_density_seria(window_size_denominator)
         )
-        self.mean_dataframe[transient_cols.time] = (
-            self.dataframe[transient_cols.time].iloc[self.mean_dataframe.index]
-        )
+        # Mean values are indexed by step labels, which may be skipped by capture reduction.
+        # Time is linear between kept steps, so interpolation gives exact time of any step
+        self.mean_dataframe[transient_cols.time] = np.interp(self.mean_dataframe.index,
+                                                             self.dataframe.index,
+                                                             self.dataframe[transient_cols.time])
+        return self.find_transient_time_by_means()
+
+    def find_transient_time_by_means(self) -> float:
+        """
+        Calculates transient time from filled mean_dataframe.
+        :return: transient time
+        """
         self.mean_dataframe.drop(self.mean_dataframe.index[-1], inplace=True)
         tr_criteria_dict = self.transient_criteria_calculate()
         self.transient_criteria_apply(tr_criteria_dict)
@@ -910,16 +1329,13 @@ class TransientResultDataCollector:
 
     def transient_criteria_apply(self, tr_criteria: dict):
         # Calculation of transient ending criteria
-        self.mean_dataframe['compare_plus'] = 0
-        self.mean_dataframe['compare_minus'] = 0
-        self.mean_dataframe.loc[self.mean_dataframe[transient_cols.current_density] > tr_criteria['minus'],
-                                'compare_minus'] = 1
-        self.mean_dataframe.loc[self.mean_dataframe[transient_cols.current_density] < tr_criteria['plus'],
-                                'compare_plus'] = 1
+        mean_densities = self.mean_dataframe[transient_cols.current_density].values
+        compare_minus = mean_densities > tr_criteria['minus']
+        compare_plus = mean_densities < tr_criteria['plus']
 
-        # Get indexes on which ending criteria satisfied
-        ending_minus_index = self.mean_dataframe['compare_minus'][::-1].idxmin()
-        ending_plus_index = self.mean_dataframe['compare_plus'][::-1].idxmin()
+        # Get indexes on which ending criteria satisfied (the last index on which criteria is not satisfied)
+        ending_minus_index = self._last_false_index(compare_minus)
+        ending_plus_index = self._last_false_index(compare_plus)
 
         if ending_minus_index < ending_plus_index:
             self.transient.ending_index = ending_plus_index
@@ -947,6 +1363,12 @@ class TransientResultDataCollector:
         # pd.set_option('display.width', None)
         # print(self.mean_dataframe)
 
+    def _last_false_index(self, compare: np.ndarray):
+        """
+        :return: mean_dataframe index of the last False value or the last index if there are no False values
+        """
+        return self.mean_dataframe.index[len(compare) - 1 - np.argmin(compare[::-1])]
+
     def correct_transient_time(self, window_size: int) -> tuple:
         """
         Precises ending transient time and current density.
@@ -957,12 +1379,9 @@ class TransientResultDataCollector:
         # Get transient ending border data
         ending_center_index = self.transient.get_ending_index()
 
-        ending_next_time = (
-            self.mean_dataframe[transient_cols.time].loc[ending_center_index + window_size]
-        )
-        ending_next_index = (
-            self.mean_dataframe.loc[ending_next_time == self.mean_dataframe[transient_cols.time]].index.values[0]
-        )
+        # The next mean point (window_size steps later)
+        ending_next_position = self.mean_dataframe.index.get_loc(ending_center_index) + 1
+        ending_next_index = self.mean_dataframe.index[ending_next_position]
 
         self.transient.ending_index_low = ending_center_index
         self.transient.ending_index_high = ending_next_index
@@ -1007,25 +1426,40 @@ class TransientResultDataCollector:
     def set_distributions_indexes(self, stage_name: str) -> Union[List[int], None]:
         full_dist_result_path = os.path.join(self.dist_result_path, stage_name)
         try:
-            ww_data_indexes_iter = map(int, os.listdir(full_dist_result_path))
+            ww_data_indexes_iter = map(int, filter(str.isdigit, os.listdir(full_dist_result_path)))
         except FileNotFoundError:
             return None
         ww_data_indexes: list = sorted(ww_data_indexes_iter)
         # Select only indexes within size of current df in case if old results remain
-        actual_ww_data_indexes = [index for index in ww_data_indexes if index <= self.dataframe.index[-1]]
+        last_step_index = self.get_last_step_index()
+        actual_ww_data_indexes = [index for index in ww_data_indexes if index <= last_step_index]
         return actual_ww_data_indexes
 
+    def get_last_step_index(self) -> int:
+        return self.dataframe.index[-1]
+
     def set_custom_transient_col(self, col_parameters: dict):
         """
         Allows to set name and source_current multiplier to custom transient column in result dataframe
         :param col_parameters:
         :return:
         """
+        custom_col = self.get_custom_transient_col(col_parameters)
+        if custom_col:
+            self.calculate_custom_transient_col(*custom_col)
+
+    @staticmethod
+    def get_custom_transient_col(col_parameters: dict) -> Union[Tuple[str, float], None]:
+        """
+        Sets name of custom transient column.
+        :return: (name, multiplier) or None if custom col is not set
+        """
         name, coefficient = col_parameters.values()
         pure_name = name.strip()
         if pure_name != '' and coefficient is not None:
             transient_cols.custom = name
-            self.calculate_custom_transient_col(name, coefficient)
+            return name, coefficient
+        return None
 
     def calculate_custom_transient_col(self, name, multiplier):
         with warnings.catch_warnings():
@@ -1092,6 +1526,7 @@ class TransientResultBuilder(ResultBuilder):
         )
         return results
 
+    @traced()
     def save_data(self):
         # Create output dir if it does not exist
         create_dir(self.result_path)
@@ -1121,6 +1556,22 @@ class TransientResultBuilder(ResultBuilder):
         header = [line + '\n' for line in header]
         return header
 
+    def _get_output_col_names(self) -> List[str]:
+        """
+        :return: names of selected dataframe's cols, which are saved to result file
+        """
+        if self.result_settings.select_mean_dataframe:
+            selected_settings = self.result_settings.mean_dataframe
+        else:
+            selected_settings = self.result_settings.dataframe
+        col_names_for_output = list()
+        for col_key, col_name in transient_cols.__dict__.items():
+            if selected_settings.__dict__.get(col_key):
+                col_names_for_output.append(col_name)
+        if not self.result_settings.select_mean_dataframe:
+            col_names_for_output += self.result_collector.get_extra_currents_cols()
+        return col_names_for_output
+
     @staticmethod
     def _header_print(header: list):
         for line in header:
@@ -1132,85 +1583,59 @@ class TransientResultBuilder(ResultBuilder):
             res_file.writelines(header)
 
     def _dump_dataframe_to_file(self, file_path: str):
-
         if self.result_settings.select_mean_dataframe:
-            selected_settings = self.result_settings.mean_dataframe
             selected_df = self.results.mean_df
         else:
-            selected_settings = self.result_settings.dataframe
             selected_df = self.results.full_df
-        col_names_for_output = list()
-        for col_key, col_name in transient_cols.__dict__.items():
-            if selected_settings.__dict__.get(col_key):
-                col_names_for_output.append(col_name)
+        col_names_for_output = self._get_output_col_names()
         with open(file_path, 'a') as res_file:
             # Save dataframe without indexes to file
             res_file.write(selected_df[col_names_for_output].to_string(index=False, float_format='%.6e'))
 
 
 class SmallSignalResultBuilder(ResultBuilder):
-    def __init__(self, result_paths: ResultPaths, stage_name='none_stage', is_repeated_stage=False):
+    """
+    Saves small signal analysis results to the frequency-keyed store (see small_signal_store module).
+    Results of not repeated stage replace stored ones. On repeated stage the frequencies which are
+    already in the store are skipped, other rows are appended.
+
+    Attributes:
+        dataframe: all stored results sorted by frequency
+        store: SmallSignalResultStore of the result file
+    Methods:
+        export() -> str
+    """
+    def __init__(self, result_paths: ResultPaths, stage_name='none_stage', is_repeated_stage=False,
+                 stage_dataframe: Union[pd.DataFrame, None] = None):
+        """
+        :param stage_dataframe: small signal results of the stage (e.g. merged results of frequency bands),
+                                if it is not set, raw Treada's output is parsed
+        """
         super(SmallSignalResultBuilder, self).__init__()
         self.is_repeated_stage = is_repeated_stage
-        small_signal_parser = SmallSignalInfoOutputParser(result_paths.temporary.raw)
-        self.dataframe = small_signal_parser.get_prepared_dataframe()
+        if stage_dataframe is None:
+            small_signal_parser = VectorizedSmallSignalInfoOutputParser(result_paths.temporary.raw)
+            stage_dataframe = small_signal_parser.get_prepared_dataframe()
+        self.stage_dataframe = stage_dataframe
         self.result_path = self.file_path_with_name_build(result_path=result_paths.main, stage_name=stage_name)
+        self.store = SmallSignalResultStore.open(self.result_path)
         self.save_data()
+        self.dataframe = self.store.to_dataframe()
 
     def save_data(self):
-        # Create output dir if it does not exist
-        create_dir(self.result_path)
-        self._dump_dataframe_to_file(self.result_path)
-
-    def _dump_dataframe_to_file(self, file_path: str):
-        is_dump = False
-        is_empty_res_file = False
-        is_equal = False
         if not self.is_repeated_stage:
-            is_dump = True
-        elif self.is_repeated_stage:
-            try:
-                old_df = pd.read_csv(file_path, dtype=np.float64, sep='\s+')
-                is_equal = self._compare_dataframe_with_old_data(old_df, file_path)
-            except pd.errors.EmptyDataError:
-                is_empty_res_file = True
-            if not is_empty_res_file and not is_equal:
-                self._update_dataframe(old_df)
-            if is_empty_res_file or not is_equal:
-                is_dump = True
-
-        if is_dump:
-            # Save dataframe without indexes to file
-            df_str = self.dataframe.to_string(index=False, float_format='{:.6e}'.format)
-            with open(file_path, 'w') as res_file:
-                res_file.write(df_str)
-
-    def _compare_dataframe_with_old_data(self, old_df: pd.DataFrame, file_path: str):
-        # Precision of float numbers in dataframes
-        precision = 20
-        old_df_rounded = old_df.round(precision)
-        dataframe_rounded = self.dataframe.round(precision)
-        print('old_df_rounded')
-        print(old_df_rounded)
-        print('dataframe_rounded')
-        print(dataframe_rounded)
-
-        if old_df_rounded.equals(dataframe_rounded):
-            print('Equal')
-            return True
-        else:
-            print('Not eq')
-            return False
+            self.store.reset(self.stage_dataframe.columns)
+        appended_rows_number = self.store.upsert(self.stage_dataframe, skip_existing=self.is_repeated_stage)
+        skipped_rows_number = len(self.stage_dataframe) - appended_rows_number
+        if skipped_rows_number:
+            print(f'Skipped already computed frequencies: {skipped_rows_number}')
 
-    def _update_dataframe(self, old_df: pd.DataFrame):
+    def export(self) -> str:
         """
-        Add current dataframe to old and sort resulting dataframe by freauency.
-        :param old_df: old data loaded from result file
+        Writes all stored results sorted by frequency to the result file.
+        :return: path to the result file
         """
-        self.dataframe = pd.concat([old_df, self.dataframe])
-        self.dataframe.sort_values(by=small_signal_cols.frequency, inplace=True)
-        print('updated dataframe')
-        print(self.dataframe)
+        return self.store.export()
 
 
 class UdrmVectorManager:
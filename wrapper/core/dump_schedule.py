@@ -0,0 +1,91 @@
+"""
+Schedules of distributions dumping (temporary results of "Treada") on a stage.
+"Treada" dumps distributions every TIME steps (MTUT variable), so the launcher sets TIME to the dump interval, which
+is fine enough for all requested times, and copies only the dumps nearest to the requested times.
+
+Schedule of a stage in "preserving_ranges" of config.json can be set as:
+    1) linear range (legacy format): {"start": 0, "stop": 1e4, "step": 100}
+    2) log-spaced times: {"log": {"start": 1, "stop": 1e4, "number": 20}}
+    3) explicit times: {"times": [5, 50, 500]}
+    4) list of any of the above: [{"start": 0, "stop": 100, "step": 10}, {"log": {...}}]
+All times are in picoseconds.
+"""
+import math
+from typing import Iterable, List, Set, Tuple, Union
+
+import numpy as np
+
+
+class DumpSchedule:
+    """
+    Requested dump times of a stage bound to the time step of the stage.
+
+    Attributes:
+        ranges: list of linear (start, stop, step) ranges
+        times: sorted explicit (and log-spaced) times
+        timestep_constant: time of one step (ps)
+        interval_steps: dump interval which is set to MTUT TIME variable
+    Methods:
+        from_config(stage_schedule: Union[dict, list], timestep_constant: float) -> DumpSchedule
+        is_requested(transient_time: float) -> bool
+    """
+    def __init__(self, ranges: List[Tuple[float, float, float]], times: Iterable[float], timestep_constant: float):
+        self.ranges = ranges
+        self.times = np.unique(np.asarray(list(times), dtype=np.float64))
+        self.timestep_constant = timestep_constant
+        self.interval_steps = self.calculate_interval_steps()
+        self.interval_time = self.interval_steps * timestep_constant
+        # Numbers of dumps (dump time / interval time), which are nearest to the explicit times
+        self.requested_dumps: Set[int] = set(np.round(self.times / self.interval_time).astype(np.int64).tolist())
+        # Ranges in dumps: (start, stop, first dump number, step in dumps)
+        self.range_dumps = [(start, stop, math.ceil(start / self.interval_time), max(round(step / self.interval_time), 1))
+                            for start, stop, step in ranges]
+
+    @classmethod
+    def from_config(cls, stage_schedule: Union[dict, list], timestep_constant: float) -> 'DumpSchedule':
+        """
+        :param stage_schedule: schedule of the stage from "preserving_ranges" of config.json
+        :param timestep_constant: time of one step (ps)
+        """
+        entries = stage_schedule if isinstance(stage_schedule, list) else [stage_schedule]
+        ranges = []
+        times = []
+        for entry in entries:
+            if 'log' in entry:
+                log_space = entry['log']
+                if not 0 < log_space['start'] < log_space['stop']:
+                    raise ValueError('"log" range must satisfy 0 < "start" < "stop"')
+                times.extend(np.geomspace(log_space['start'], log_space['stop'], int(log_space['number'])))
+            elif 'times' in entry:
+                times.extend(entry['times'])
+            else:
+                if entry['start'] >= entry['stop']:
+                    raise ValueError('"stop" must be higher than "start" in "time_ps_range"')
+                ranges.append((entry['start'], entry['stop'], min(entry['step'], entry['stop'])))
+        if not ranges and not times:
+            raise ValueError('Distributions dump schedule is empty')
+        return cls(ranges, times, timestep_constant)
+
+    def calculate_interval_steps(self) -> int:
+        """
+        :return: the smallest step of ranges or gap between explicit times in steps (at least 1 step)
+        """
+        gaps = [step for _, _, step in self.ranges]
+        if len(self.times):
+            times_gaps = np.diff(self.times, prepend=0.)
+            gaps.extend(times_gaps[times_gaps > 0].tolist())
+        return max(min(int(gap / self.timestep_constant) for gap in gaps), 1) if gaps else 1
+
+    def is_requested(self, transient_time: float) -> bool:
+        """
+        :param transient_time: time of the dump
+        :return: is the dump nearest to one of requested times
+        """
+        dump_number = round(transient_time / self.interval_time)
+        if dump_number in self.requested_dumps:
+            return True
+        for start, stop, first_dump, step_dumps in self.range_dumps:
+            # The last dump of range can be written on the next step after stop
+            if start <= transient_time <= stop + self.timestep_constant and (dump_number - first_dump) % step_dumps == 0:
+                return True
+        return False
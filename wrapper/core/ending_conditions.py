@@ -2,10 +2,25 @@ from typing import Union, Tuple, List, Any
 import numpy as np
 
 from wrapper.config.config_build import load_config
-from wrapper.core.data_management import MtutManager
+from wrapper.core.data_management import MtutManager, TransientOutputParser
 from wrapper.misc.lin_alg import line_coefficients
 
 
+def split_currents_line(currents_string: str) -> Union[List[str], None]:
+    """
+    Splits raw "Treada's" output string of currents to its fields.
+    Currents lines are found by the same predicate as in TransientOutputParser, so captured currents
+    and parsed raw output have the same lines.
+
+    :param currents_string: raw "Treada's" output string
+    :return: list of string fields or None if the string is not a currents line
+    """
+    if not TransientOutputParser.find_currents_line(currents_string):
+        return None
+    # Whitespace split does not leave empty and line ending fields (e.g. on trailing space)
+    return currents_string.split()
+
+
 def retrieve_current_value(currents_string: str) -> Union[float, None]:
     """
     Prepare raw "Treada's" output string to following operations.
@@ -13,14 +28,10 @@ def retrieve_current_value(currents_string: str) -> Union[float, None]:
     :param currents_string: raw "Treada's" output string
     :return: source current value (from first column of "Treada's" output)
     """
-    currents_list = currents_string.split(' ')
-    length_current_list = len(currents_list)
-    if length_current_list == 12 or length_current_list == 13:
-        try:
-            float(currents_list[3])
-            return float(currents_list[0])
-        except ValueError:
-            return None
+    currents_list = split_currents_line(currents_string)
+    if currents_list is not None:
+        return float(currents_list[0])
+    return None
 
 
 class EndingCondition:
@@ -88,6 +99,28 @@ class EndingCondition:
                 self.means_vector_index += 1
         return False
 
+    def min_steps_to_stop(self) -> int:
+        """
+        Predicts the minimal number of steps after which the condition is checked next time
+        (condition is checked on the step after a chunk filling and only if the means vector is filled).
+        :return: number of steps
+        """
+        current_chunk_steps = self.chunk.size - self.chunk_index + 1
+        chunks_to_fill = max(self.chunks_means_vector.size - 1 - self.means_vector_index, 0)
+        return current_chunk_steps + chunks_to_fill * (self.chunk_size + 1)
+
+    def convergence_ratio(self) -> Union[float, None]:
+        """
+        Ratio of chunks' means spread to the allowed deviation range. Condition is satisfied if the ratio < 1.
+        :return: ratio or None if the means vector is not filled yet
+        """
+        if self.means_vector_index < self.chunks_means_vector.size - 1:
+            return None
+        deviation_range = 2 * self.find_current_deviation()
+        if not deviation_range:
+            return None
+        return float(np.ptp(self.chunks_means_vector) / deviation_range)
+
 
 class Chunk:
     def __init__(self, low_index: int, size: int):
@@ -0,0 +1,224 @@
+"""
+Parallel small signal info stage by frequency bands.
+Frequency range of MTUT is split into bands, each band is computed by its own "Treada" process, which works
+in a sandbox directory with a copy of MTUT (with the band frequency range) and Treada's input files.
+Processes are supervised by TreadaSupervisor in one event loop, partial small signal tables are merged
+and sorted by frequency. Names of MTUT frequency variables and input files are set in "frequency_bands"
+runtime settings.
+
+How to use:
+    band_runner = FrequencyBandsRunner(config, relative_time)
+    dataframe = band_runner.run(stage_data)
+"""
+import glob
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+from wrapper.config.config_build import Config
+from wrapper.core.data_management import MtutManager, VectorizedSmallSignalInfoOutputParser, small_signal_cols
+from wrapper.core.raw_output import find_raw_output_path
+from wrapper.core.small_signal_store import FREQUENCY_KEY_FORMAT
+from wrapper.core.treada_io_handling import StdoutCapturer, build_exe_command
+from wrapper.core.treada_supervisor import TreadaSupervisor, SupervisedRun
+from wrapper.core.watchdog import StageLimits, TreadaStallError
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tracing import tracer
+
+
+FREQUENCY_SCALES = ('log', 'linear')
+BAND_RAW_OUTPUT_NAME = 'treada_raw_output.txt'
+
+
+@dataclass
+class FrequencyBand:
+    """
+    Attributes:
+        index: index of the band
+        start, stop: frequency range of the band
+        number: number of frequencies in the band (None if it is not changed)
+        working_dir: sandbox directory of the band process
+        raw_output_path: path to raw output of the band process
+    """
+    index: int
+    start: float
+    stop: float
+    number: Union[int, None] = None
+    working_dir: str = ''
+    raw_output_path: str = ''
+
+
+def split_frequency_range(start: float, stop: float, bands_number: int, number: Union[int, None] = None,
+                          scale='log') -> List[FrequencyBand]:
+    """
+    Splits frequency range into bands. If number of frequencies is set, band edges are points of the whole grid,
+    so grids of bands (with shared edges) compose the whole grid. Otherwise bands have equal widths on the scale.
+    :param number: number of frequencies in the whole range
+    :param scale: "log" or "linear" frequency grid
+    """
+    if scale not in FREQUENCY_SCALES:
+        raise ValueError(f'Unknown frequency scale "{scale}", available: {FREQUENCY_SCALES}')
+    if number is not None and number < 2:
+        return [FrequencyBand(index=0, start=start, stop=stop, number=number)]
+    if number is not None:
+        intervals_number = number - 1
+        bands_number = max(min(bands_number, intervals_number), 1)
+        band_intervals, extra_intervals = divmod(intervals_number, bands_number)
+        edge_indexes = np.cumsum([0] + [band_intervals + (index < extra_intervals) for index in range(bands_number)])
+        edge_positions = edge_indexes / intervals_number
+        band_numbers = (np.diff(edge_indexes) + 1).tolist()
+    else:
+        bands_number = max(bands_number, 1)
+        edge_positions = np.linspace(0., 1., bands_number + 1)
+        band_numbers = [None] * bands_number
+    if scale == 'log':
+        edges = start * (stop / start) ** edge_positions
+    else:
+        edges = start + (stop - start) * edge_positions
+    edges[0], edges[-1] = start, stop
+    return [FrequencyBand(index=index, start=float(edges[index]), stop=float(edges[index + 1]), number=band_number)
+            for index, band_number in enumerate(band_numbers)]
+
+
+def merge_band_dataframes(dataframes: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merges small signal tables of bands. Frequencies on shared edges of bands are kept once.
+    :return: dataframe sorted by frequency
+    """
+    merged_df = pd.concat(dataframes, ignore_index=True)
+    frequency_keys = merged_df[small_signal_cols.frequency].map(FREQUENCY_KEY_FORMAT.format)
+    merged_df = merged_df[~frequency_keys.duplicated()]
+    return merged_df.sort_values(by=small_signal_cols.frequency, kind='stable', ignore_index=True)
+
+
+class FrequencyBandsRunner:
+    """
+    Runs small signal info stage by frequency bands in parallel.
+
+    Attributes:
+        config: launcher config
+        relative_time: relative time of the stage
+        settings: frequency bands settings
+    Methods:
+        split_bands() -> List[FrequencyBand]
+        prepare_sandbox(band: FrequencyBand)
+        run_batch(bands: List[FrequencyBand], stage_data: StageData, exe_command: list)
+        run(stage_data: StageData) -> pd.DataFrame
+    """
+    def __init__(self, config: Config, relative_time: float):
+        self.config = config
+        self.relative_time = relative_time
+        self.settings = config.advanced_settings.runtime.frequency_bands
+
+    def split_bands(self) -> List[FrequencyBand]:
+        mtut_manager = MtutManager(self.config.paths.treada_core.mtut)
+        mtut_manager.load_file()
+        number = None
+        if self.settings.number_var:
+            number = int(float(mtut_manager.get_var(self.settings.number_var)))
+        return split_frequency_range(start=float(mtut_manager.get_var(self.settings.start_var)),
+                                     stop=float(mtut_manager.get_var(self.settings.stop_var)),
+                                     bands_number=self.settings.bands_number,
+                                     number=number,
+                                     scale=self.settings.scale)
+
+    def prepare_sandbox(self, band: FrequencyBand):
+        """
+        Copies MTUT and input files (sandbox_files setting) of Treada's directory to the band directory
+        and sets the band frequency range in the copied MTUT.
+        """
+        core_dir = os.path.dirname(os.path.abspath(self.config.paths.treada_core.exe))
+        mtut_path = self.config.paths.treada_core.mtut
+        band.working_dir = os.path.abspath(os.path.join(self.config.paths.result.temporary.frequency_bands,
+                                                        f'band_{band.index}'))
+        if os.path.isdir(band.working_dir):
+            shutil.rmtree(band.working_dir)
+        os.makedirs(band.working_dir)
+        for pattern in self.settings.sandbox_files:
+            for file_path in glob.glob(os.path.join(glob.escape(core_dir), pattern)):
+                if os.path.isfile(file_path):
+                    shutil.copy2(file_path, band.working_dir)
+        band_mtut_path = os.path.join(band.working_dir, os.path.basename(mtut_path))
+        shutil.copy2(mtut_path, band_mtut_path)
+        mtut_manager = MtutManager(band_mtut_path)
+        mtut_manager.load_file()
+        mtut_manager.set_var(self.settings.start_var, f'{band.start:.15E}')
+        mtut_manager.set_var(self.settings.stop_var, f'{band.stop:.15E}')
+        if self.settings.number_var and band.number is not None:
+            mtut_manager.set_var(self.settings.number_var, str(band.number))
+        mtut_manager.save_file()
+        band.raw_output_path = os.path.join(band.working_dir, BAND_RAW_OUTPUT_NAME)
+
+    def create_capturer(self, stage_data: StageData, band: FrequencyBand) -> StdoutCapturer:
+        capturer = StdoutCapturer(process=None, config=self.config, relative_time=self.relative_time)
+        capturer.set_stage_data(stage_data, is_show_stage_name=False)
+        capturer.set_runtime_console_info(f'   band {band.index}')
+        watchdog_settings = self.config.advanced_settings.runtime.watchdog
+        if watchdog_settings.enable:
+            capturer.limits = StageLimits.from_settings(watchdog_settings, stage_data.name)
+        return capturer
+
+    def run_batch(self, bands: List[FrequencyBand], stage_data: StageData, exe_command: list):
+        """
+        Runs band processes in one event loop. Failed bands are retried up to max_retries of watchdog settings
+        (if watchdog is enabled), so merged results never miss frequencies of a failed band.
+        TreadaStallError is raised if a band fails on every attempt.
+        """
+        watchdog_settings = self.config.advanced_settings.runtime.watchdog
+        attempts_number = 1 + (watchdog_settings.max_retries if watchdog_settings.enable else 0)
+        failures = {}
+        for attempt in range(1, attempts_number + 1):
+            if attempt > 1:
+                print(f'Retry {attempt - 1}/{attempts_number - 1} of frequency bands: '
+                      f'{", ".join(str(band.index) for band in bands)}')
+            supervisor = TreadaSupervisor()
+            for band in bands:
+                self.prepare_sandbox(band)
+                capturer = self.create_capturer(stage_data, band)
+                output_file_path = capturer.prepare_stream(None, band.raw_output_path)
+                supervisor.add_run(capturer, exe_path=exe_command[0], exe_args=exe_command[1:],
+                                   cwd=band.working_dir, output_file_path=output_file_path)
+            supervised_runs = supervisor.run()
+            failures = {band.index: self.band_failure_reason(supervised_run)
+                        for band, supervised_run in zip(bands, supervised_runs)}
+            bands = [band for band in bands if failures[band.index] is not None]
+            if not bands:
+                return
+        reasons = '; '.join(f'band {band.index}: {failures[band.index]}' for band in bands)
+        raise TreadaStallError(f'Frequency bands failed - {reasons}', attempts_number)
+
+    @staticmethod
+    def band_failure_reason(supervised_run: SupervisedRun) -> Union[str, None]:
+        """
+        :return: reason of the band process failure or None if the process finished cleanly
+        """
+        capturer = supervised_run.capturer
+        if capturer.failure_reason is not None:
+            return capturer.failure_reason
+        if not capturer.running_flag:
+            return 'Band process was interrupted'
+        if supervised_run.returncode != 0:
+            return f'Treada process ended with code {supervised_run.returncode}'
+        return None
+
+    def run(self, stage_data: StageData) -> pd.DataFrame:
+        """
+        Runs band processes (not more than max_workers at once) and merges their small signal tables.
+        :return: small signal dataframe of the whole frequency range sorted by frequency
+        """
+        bands = self.split_bands()
+        max_workers = self.settings.max_workers or len(bands)
+        exe_command = build_exe_command(os.path.abspath(self.config.paths.treada_core.exe))
+        start_time = time.time()
+        with tracer.span('FrequencyBandsRunner.run', stage=stage_data.name, bands=len(bands)):
+            for batch_start in range(0, len(bands), max_workers):
+                self.run_batch(bands[batch_start:batch_start + max_workers], stage_data, exe_command)
+            dataframes = [VectorizedSmallSignalInfoOutputParser(find_raw_output_path(band.raw_output_path))
+                          .get_prepared_dataframe() for band in bands]
+        print(f'Frequency bands: {len(bands)}, computed in {time.time() - start_time:.2f} s')
+        return merge_band_dataframes(dataframes)
@@ -0,0 +1,87 @@
+"""
+Memory-lean transient analysis.
+All dataframe cols are stored in one preallocated 2-D block, dataframe and result dataframe are views of the block,
+so the first current is not inserted by copying, result cols are not copied and custom col is calculated in place.
+Cols can be stored as float32 to halve memory (results are rounded to float32 precision).
+"""
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from wrapper.config.config_build import ResultPaths
+from wrapper.core.data_management import TransientResultDataCollector, transient_cols
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tracing import traced
+
+
+class LeanTransientResultDataCollector(TransientResultDataCollector):
+    """
+    TransientResultDataCollector which keeps dataframe cols in one block.
+
+    Attributes:
+        block: 2-D array of cols (one row per col): time, source current, current density, extra cols, custom col
+        dtype: np.float64 or np.float32
+    """
+    def __init__(self, mtut_file_path, result_paths: ResultPaths, relative_time: float,
+                 all_currents_columns=False, currents_array: Union[np.ndarray, None] = None, float32=False):
+        """
+        :param float32: store cols as float32
+        """
+        super().__init__(mtut_file_path, result_paths, relative_time, all_currents_columns, currents_array)
+        self.dtype = np.float32 if float32 else np.float64
+        self.block: Union[np.ndarray, None] = None
+
+    @traced()
+    def prepare_result_data(self, stage: StageData,
+                            prev_stage_last_current: Union[float, None],
+                            custom_df_col_params: dict):
+        first_current = self.get_first_df_current(prev_stage_last_current)
+        custom_col = self.get_custom_transient_col(custom_df_col_params)
+        self.build_block(first_current, custom_col, stage.skip_initial_time_step)
+        self.transient.time = self.find_transient_time()
+        self.correct_transient_time(window_size=self.transient.window_size)
+
+        self.last_mean_time, self.last_mean_current_density = (
+            self.mean_dataframe[[transient_cols.time, transient_cols.current_density]].tail(50).mean()
+        )
+        self.ww_data_indexes = self.set_distributions_indexes(stage.name)
+
+    def build_block(self, first_current: Union[float, None], custom_col: Union[tuple, None],
+                    skip_initial_time_step=False):
+        """
+        Fills the block by parsed currents and replaces dataframe by the view of the block.
+        Result dataframe is the same dataframe, because the block has only result cols.
+        """
+        parsed_df = self.dataframe
+        first_row = int(first_current is not None)
+        rows_number = len(parsed_df) + first_row
+        extra_cols = super().get_extra_currents_cols()
+        col_names = [transient_cols.time, transient_cols.source_current, transient_cols.current_density] + extra_cols
+        if custom_col:
+            col_names.append(custom_col[0])
+        self.block = np.empty((len(col_names), rows_number), dtype=self.dtype)
+        cols = dict(zip(col_names, self.block))
+
+        steps = np.empty(rows_number, dtype=np.int64)
+        steps[first_row:] = parsed_df.index.values + first_row
+        for col_name in [transient_cols.source_current] + extra_cols:
+            cols[col_name][first_row:] = parsed_df[col_name].values
+        if first_row:
+            # Other currents line columns are unknown for the added current
+            steps[0] = 0
+            self.block[:, 0] = np.nan
+            cols[transient_cols.source_current][0] = first_current
+        # Parsed data is not needed anymore
+        self.dataframe = parsed_df = None
+        self.transient_parser = None
+
+        self.check_initial_steps_number(rows_number, skip_initial_time_step)
+        cols[transient_cols.time][:] = self.calculate_time_values(steps, skip_initial_time_step)
+        np.divide(cols[transient_cols.source_current], self.get_current_density_divider(),
+                  out=cols[transient_cols.current_density])
+        if custom_col:
+            np.multiply(cols[transient_cols.source_current], custom_col[1], out=cols[custom_col[0]])
+        # Transposed block is the layout of pandas block, so dataframe is created without copying
+        self.dataframe = pd.DataFrame(self.block.T, index=steps, columns=col_names, copy=False)
+        self.result_dataframe = self.dataframe
@@ -0,0 +1,166 @@
+"""
+Publishes live (step, time, current) records of "Treada" transient stages into a shared memory ring buffer.
+The single writer (StdoutCapturer) never waits for readers: it overwrites the oldest records.
+Any number of out-of-process readers (launcher --monitor mode) can attach to the buffer by its name.
+
+Buffer layout:
+    header: int64[4] = [write_index, generation, capacity, reserved]
+    records: float64[capacity, 3] = (step, time_ps, current)
+write_index is the total number of published records, it is incremented after a record is written.
+generation is incremented on each new stage, so readers can split records of different stages.
+"""
+import atexit
+import os
+from multiprocessing import shared_memory
+from typing import Union, Tuple
+
+import numpy as np
+
+HEADER_SIZE = 4
+RECORD_FIELDS = 3
+_ITEM_SIZE = np.dtype(np.float64).itemsize
+# Names of buffers created by publishers of the current process
+_owned_buffers = set()
+
+
+def buffer_size(capacity: int) -> int:
+    return (HEADER_SIZE + capacity * RECORD_FIELDS) * _ITEM_SIZE
+
+
+class LiveCurrentsPublisher:
+    """
+    Writer side of live currents ring buffer.
+
+    Attributes:
+        enabled: is publishing enabled
+    Methods:
+        configure(enable: bool, name: str, capacity: int)
+        start_stage()
+        publish(step: int, time_ps: float, current: float)
+        close()
+    """
+    def __init__(self):
+        self.enabled = False
+        self.shm: Union[shared_memory.SharedMemory, None] = None
+        self.header: Union[np.ndarray, None] = None
+        self.records: Union[np.ndarray, None] = None
+        self.capacity = 0
+        self._write_index = 0
+
+    def configure(self, enable: bool, name: str = None, capacity: int = 100000):
+        """
+        Creates shared memory buffer with the given name. Buffer left by a crashed launcher is replaced.
+        The buffer is kept between computations of one launcher session, so attached monitors stay valid.
+        """
+        if enable and self.shm is not None and self.capacity == capacity and self.shm.name.endswith(name):
+            return
+        self.close()
+        self.enabled = enable
+        if not enable:
+            return
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=buffer_size(capacity))
+        except FileExistsError:
+            stale_shm = shared_memory.SharedMemory(name=name)
+            stale_shm.close()
+            stale_shm.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=buffer_size(capacity))
+        _owned_buffers.add(self.shm.name)
+        self.capacity = capacity
+        self.header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray((capacity, RECORD_FIELDS), dtype=np.float64,
+                                  buffer=self.shm.buf, offset=HEADER_SIZE * _ITEM_SIZE)
+        self.header[:] = (0, 0, capacity, 0)
+        self._write_index = 0
+        atexit.register(self.close)
+
+    def start_stage(self):
+        if self.enabled:
+            self.header[1] += 1
+
+    def publish(self, step: int, time_ps: float, current: float):
+        write_index = self._write_index
+        self.records[write_index % self.capacity] = (step, time_ps, current)
+        self._write_index = write_index + 1
+        # Index is published after the record, so readers never see a not written record
+        self.header[0] = self._write_index
+
+    def close(self):
+        """
+        Releases and removes shared memory buffer. Attached readers keep their mapping until they detach.
+        """
+        if self.shm is None:
+            return
+        self.header = None
+        self.records = None
+        self.shm.close()
+        _owned_buffers.discard(self.shm.name)
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = None
+        self.enabled = False
+
+
+class LiveCurrentsReader:
+    """
+    Reader side of live currents ring buffer. Each reader keeps its own read cursor.
+
+    How to use:
+        reader = LiveCurrentsReader(name)
+        generation, records = reader.read_new()
+        reader.close()
+    """
+    def __init__(self, name: str):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self._untrack()
+        self.header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+        self.capacity = int(self.header[2])
+        self.records = np.ndarray((self.capacity, RECORD_FIELDS), dtype=np.float64,
+                                  buffer=self.shm.buf, offset=HEADER_SIZE * _ITEM_SIZE)
+        self.read_index = 0
+        self.lost_records = 0
+
+    def _untrack(self):
+        """
+        On POSIX, attached segment is registered in resource tracker, which unlinks it on reader exit.
+        Reader must not remove the buffer owned by the launcher.
+        """
+        if os.name != 'posix' or self.shm.name in _owned_buffers:
+            return
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        except (ImportError, AttributeError, KeyError):
+            pass
+
+    def generation(self) -> int:
+        return int(self.header[1])
+
+    def read_new(self) -> Tuple[int, np.ndarray]:
+        """
+        Copies records published since the previous call.
+        If the reader is lagging more than buffer capacity, the oldest records are skipped.
+        :return: current generation and array of (step, time_ps, current) records
+        """
+        write_index = int(self.header[0])
+        start_index = max(self.read_index, write_index - self.capacity)
+        self.lost_records += start_index - self.read_index
+        positions = np.arange(start_index, write_index) % self.capacity
+        records = self.records[positions]
+        # Records which were overwritten while copying are dropped
+        overwritten = int(self.header[0]) - self.capacity - start_index
+        if overwritten > 0:
+            records = records[overwritten:]
+            self.lost_records += overwritten
+        self.read_index = write_index
+        return self.generation(), records
+
+    def close(self):
+        self.header = None
+        self.records = None
+        self.shm.close()
+
+
+live_currents = LiveCurrentsPublisher()
@@ -0,0 +1,160 @@
+"""
+Contains live progress metrics of "Treada" stages and of the states sweep.
+Metrics are shown in the status suffix of console output lines and periodically flushed to JSON file,
+which other processes can poll.
+"""
+import json
+import os
+import time
+from typing import Union
+
+
+def format_eta(seconds: Union[float, None]) -> str:
+    if seconds is None:
+        return '--:--:--'
+    seconds = int(seconds)
+    return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+
+
+class ProgressMetrics:
+    """
+    Accumulates progress of the current stage and of the states sweep.
+    The module-level object is configured once per computation and updated by StdoutCapturer and states machine.
+
+    How to use:
+        1) configure(enable, metrics_path, update_interval_s)
+        2) start_state() / finish_state() from states machine
+        3) start_stage() on stage start, update_stage() on each line with currents, finish_stage() on stage end
+    """
+    def __init__(self):
+        self.enabled = False
+        self.metrics_path: Union[str, None] = None
+        self.update_interval_s = 1.
+        self.sweep = {}
+        self.stage = {}
+        self._sweep_start_time = None
+        self._state_start_time = None
+        self._stage_start_time = None
+        self._stage_start_steps = 0
+        self._timestep_constant = 0.
+        self._last_update_time = 0.
+        self.status = ''
+
+    def configure(self, enable: bool, metrics_path: Union[str, None] = None, update_interval_s=1.):
+        self.enabled = enable
+        self.metrics_path = metrics_path
+        self.update_interval_s = update_interval_s
+        self.sweep = {}
+        self.stage = {}
+        self.status = ''
+        self._sweep_start_time = time.monotonic()
+
+    def start_state(self, index: int, states_number: int):
+        if not self.enabled:
+            return
+        self._state_start_time = time.monotonic()
+        self.sweep.setdefault('completed', 0)
+        self.sweep.setdefault('failed', 0)
+        self.sweep.update(state_index=index, states_number=states_number)
+        self.flush()
+
+    def finish_state(self, is_failed=False):
+        if not self.enabled:
+            return
+        self.sweep['failed' if is_failed else 'completed'] += 1
+        elapsed_s = time.monotonic() - self._sweep_start_time
+        finished_states = self.sweep['completed'] + self.sweep['failed']
+        remaining_states = max(self.sweep['states_number'] - self.sweep['state_index'] - 1, 0)
+        self.sweep.update(elapsed_s=elapsed_s,
+                          last_state_duration_s=time.monotonic() - self._state_start_time,
+                          eta_s=elapsed_s / finished_states * remaining_states)
+        self.flush()
+
+    def start_stage(self, stage_name: str, timestep_constant: float, start_steps: int,
+                    target_time_ps: Union[float, None] = None):
+        """
+        :param stage_name: name of scenario stage
+        :param timestep_constant: simulated time of one step in ps
+        :param start_steps: initial value of steps counter
+        :param target_time_ps: fixed impulse time on which the stage will be stopped (None if not fixed)
+        """
+        if not self.enabled:
+            return
+        self._stage_start_time = self._last_update_time = time.monotonic()
+        self._stage_start_steps = start_steps
+        self._timestep_constant = timestep_constant
+        self.stage = {'name': stage_name, 'steps': start_steps, 'target_time_ps': target_time_ps}
+        self.status = ''
+        self.flush()
+
+    def update_stage(self, steps: int, transient_time_ps: float, ending_condition=None) -> bool:
+        """
+        Must be called on each line with currents. Recalculates metrics not more often than update_interval_s.
+        :param steps: current value of steps counter
+        :param transient_time_ps: simulated transient time
+        :param ending_condition: EndingCondition object if auto ending is enabled
+        :return: True if metrics were updated
+        """
+        now = time.monotonic()
+        if now - self._last_update_time < self.update_interval_s:
+            return False
+        self._last_update_time = now
+        elapsed_s = now - self._stage_start_time
+        steps_rate = (steps - self._stage_start_steps) / elapsed_s if elapsed_s else 0.
+        simulated_rate = steps_rate * self._timestep_constant
+        self.stage.update(steps=steps,
+                          transient_time_ps=transient_time_ps,
+                          elapsed_s=elapsed_s,
+                          steps_per_s=steps_rate,
+                          ps_per_s=simulated_rate)
+        target_time_ps = self.stage['target_time_ps']
+        eta_fixed_time_s = None
+        if target_time_ps is not None and simulated_rate:
+            eta_fixed_time_s = max(target_time_ps - transient_time_ps, 0.) / simulated_rate
+        eta_ending_condition_s = None
+        if ending_condition is not None:
+            self.stage['convergence_ratio'] = ending_condition.convergence_ratio()
+            if steps_rate:
+                eta_ending_condition_s = ending_condition.min_steps_to_stop() / steps_rate
+        etas = [eta for eta in (eta_fixed_time_s, eta_ending_condition_s) if eta is not None]
+        self.stage.update(eta_fixed_time_s=eta_fixed_time_s,
+                          eta_ending_condition_s=eta_ending_condition_s,
+                          eta_s=min(etas) if etas else None)
+        self.status = self.build_status()
+        self.flush()
+        return True
+
+    def finish_stage(self):
+        if not self.enabled:
+            return
+        self.stage['finished'] = True
+        self.status = ''
+        self.flush()
+
+    def build_status(self) -> str:
+        status = (f' | {self.stage["steps_per_s"]:.0f} steps/s'
+                  f' | {self.stage["ps_per_s"]:.3g} ps/s'
+                  f' | ETA {format_eta(self.stage["eta_s"])}')
+        if self.sweep:
+            status += f' | state {self.sweep["state_index"] + 1}/{self.sweep["states_number"]}'
+        return status
+
+    def as_dict(self) -> dict:
+        return {'updated': time.time(), 'sweep': self.sweep, 'stage': self.stage}
+
+    def flush(self):
+        """
+        Atomically rewrites metrics file, so readers never see a partially written file.
+        """
+        if not self.metrics_path:
+            return
+        tmp_path = f'{self.metrics_path}.tmp'
+        try:
+            with open(tmp_path, 'w') as metrics_file:
+                json.dump(self.as_dict(), metrics_file, indent=4)
+            os.replace(tmp_path, self.metrics_path)
+        except OSError:
+            pass
+
+
+progress_metrics = ProgressMetrics()
@@ -0,0 +1,98 @@
+"""
+Opening of "Treada's" raw output files, which can be compressed by a streaming compressor on the writer path.
+Compressed file is written near the configured raw output path with compression suffix:
+    treada_raw_output.txt -> treada_raw_output.txt.gz (gzip) or treada_raw_output.txt.xz (xz)
+Readers use the configured path: an existing variant is found and decompressed transparently.
+Sidecar step index of a variant (see raw_output_index module) has RAW_OUTPUT_INDEX_SUFFIX.
+"""
+import gzip
+import lzma
+import os
+from typing import IO, TextIO
+
+
+RAW_OUTPUT_SUFFIXES = {
+    'none': '',
+    'gzip': '.gz',
+    'xz': '.xz',
+}
+RAW_OUTPUT_INDEX_SUFFIX = '.idx.npz'
+_GZIP_MAGIC = b'\x1f\x8b'
+_XZ_MAGIC = b'\xfd7zXZ\x00'
+
+
+def raw_output_variants(raw_output_path: str) -> list:
+    return [raw_output_path + suffix for suffix in RAW_OUTPUT_SUFFIXES.values()]
+
+
+def find_raw_output_path(raw_output_path: str) -> str:
+    """
+    :param raw_output_path: configured path to raw output file (without compression suffix)
+    :return: path to the last written variant of raw output file or configured path if there are no variants
+    """
+    existing_paths = [path for path in raw_output_variants(raw_output_path) if os.path.isfile(path)]
+    if not existing_paths:
+        return raw_output_path
+    return max(existing_paths, key=os.path.getmtime)
+
+
+def raw_output_file_path(raw_output_path: str, compression='none') -> str:
+    return raw_output_path + RAW_OUTPUT_SUFFIXES[compression]
+
+
+def detect_compression(file_path: str) -> str:
+    """
+    :return: compression of the file detected by its signature
+    """
+    with open(file_path, 'rb') as raw_file:
+        signature = raw_file.read(len(_XZ_MAGIC))
+    if signature.startswith(_GZIP_MAGIC):
+        return 'gzip'
+    if signature.startswith(_XZ_MAGIC):
+        return 'xz'
+    return 'none'
+
+
+def open_raw_output(raw_output_path: str, binary=False) -> IO:
+    """
+    Opens raw output file for reading. Compression is detected by the file signature, so the file is read
+    as a stream of decompressed lines.
+    :param raw_output_path: configured path to raw output file (without compression suffix)
+    :param binary: open in binary mode. Offsets of binary lines are offsets in decompressed data.
+    :return: file object
+    """
+    file_path = find_raw_output_path(raw_output_path)
+    compression = detect_compression(file_path)
+    mode = 'rb' if binary else 'rt'
+    if compression == 'gzip':
+        return gzip.open(file_path, mode)
+    if compression == 'xz':
+        return lzma.open(file_path, mode)
+    return open(file_path, mode)
+
+
+def open_raw_output_for_writing(raw_output_path: str, compression='none', compression_level=1) -> TextIO:
+    """
+    Opens raw output file for writing. Variants of the file left by previous runs with other compression are
+    removed, so readers can not take a stale file.
+    :param raw_output_path: configured path to raw output file (without compression suffix)
+    :param compression: 'none', 'gzip' or 'xz'
+    :param compression_level: gzip compress level (1-9) or xz preset (0-9). Low levels are fast enough
+                              for the capture path.
+    :return: text file object
+    """
+    if compression not in RAW_OUTPUT_SUFFIXES:
+        raise ValueError(f'Unknown raw output compression: {compression}. '
+                         f'Available: {", ".join(RAW_OUTPUT_SUFFIXES)}')
+    file_path = raw_output_file_path(raw_output_path, compression)
+    for variant_path in raw_output_variants(raw_output_path):
+        if variant_path != file_path and os.path.isfile(variant_path):
+            os.remove(variant_path)
+        # Step index of the previous output is not valid anymore
+        if os.path.isfile(variant_path + RAW_OUTPUT_INDEX_SUFFIX):
+            os.remove(variant_path + RAW_OUTPUT_INDEX_SUFFIX)
+    if compression == 'gzip':
+        return gzip.open(file_path, 'wt', compresslevel=compression_level)
+    if compression == 'xz':
+        return lzma.open(file_path, 'wt', preset=compression_level)
+    return open(file_path, 'w')
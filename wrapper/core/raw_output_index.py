@@ -0,0 +1,270 @@
+"""
+Sidecar step index of "Treada's" raw output file for random access to the output printed around given steps.
+Step is an index of currents line in TransientOutputParser dataframe (steps skipped by capture reduction count).
+The index keeps byte offsets of each interval-th currents line (checkpoints) and of marker lines:
+    relative_units: "RELATIVE UNITES:" block
+    temporary_results: temporary results (distributions) dumps
+Output of a steps range is read by binary search of the nearest checkpoint and a short scan from it.
+Offsets are offsets in decompressed data, so compressed raw output is decompressed up to the checkpoint on seek.
+
+The index is built during capture (result.raw_output.index) or by the bulk indexer:
+    index = RawOutputIndex.load_or_build(config.paths.result.temporary.raw)
+    lines = index.read_steps(3400000, 3400010)
+"""
+import argparse
+import bisect
+import locale
+import os
+import sys
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from wrapper.config.config_build import Config
+from wrapper.core.capture_reduction import SKIPPED_STEPS_MARKER
+from wrapper.core.data_management import TransientOutputParser
+from wrapper.core.raw_output import RAW_OUTPUT_INDEX_SUFFIX, find_raw_output_path, open_raw_output
+
+
+RAW_OUTPUT_MARKERS = {
+    'relative_units': 'RELATIVE UNITES:',
+    'temporary_results': 'TIME STEPS WERE MADE WITH STEP LENGTH HT',
+}
+
+
+def is_currents_line(line: str) -> bool:
+    # Cheap check of the first symbol before regular expression matching
+    return line[:1] in '0123456789+-' and TransientOutputParser.find_currents_line(line)
+
+
+def count_raw_output_steps(raw_output_path: str) -> int:
+    """
+    Counts steps of raw output (steps skipped by capture reduction count) without parsing of currents lines.
+    :param raw_output_path: configured path to raw output file (without compression suffix)
+    :return: steps of valid saved index or steps of the scanned file if there is no index
+    """
+    index = RawOutputIndex.load(raw_output_path)
+    if index is not None:
+        return index.steps
+    steps = 0
+    with open_raw_output(raw_output_path) as raw_file:
+        for line in raw_file:
+            if is_currents_line(line):
+                steps += 1
+            elif line.startswith(SKIPPED_STEPS_MARKER):
+                steps += int(line.split()[1])
+    return steps
+
+
+class RawOutputIndexBuilder:
+    """
+    Builds step index while raw output lines are written or read.
+
+    How to use:
+        builder = RawOutputIndexBuilder(file_path, interval=1000, encoding=output_file.encoding)
+        builder.add_line(line)  # for each written line in order
+        builder.save()  # after raw output file is closed
+    """
+    def __init__(self, file_path: str, interval=1000, encoding: str = None, newline_size=len(os.linesep)):
+        """
+        :param file_path: path to raw output file (with compression suffix)
+        :param interval: number of steps between checkpoints
+        :param encoding: encoding of raw output file
+        :param newline_size: size of written line ending ("\n" is translated to os.linesep in text mode)
+        """
+        self.file_path = file_path
+        self.interval = interval
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.newline_extra_size = newline_size - 1
+        self.step = 0
+        self.offset = 0
+        self._next_checkpoint_step = 0
+        self.checkpoint_steps: List[int] = []
+        self.checkpoint_offsets: List[int] = []
+        self.markers: List[Tuple[str, int, int]] = []
+
+    def add_line(self, line: str, line_size: int = None):
+        """
+        :param line: raw output line
+        :param line_size: size of the line in file bytes. Calculated from the text line if not set.
+        """
+        if line_size is None:
+            line_size = len(line) if line.isascii() else len(line.encode(self.encoding, errors='replace'))
+            line_size += line.count('\n') * self.newline_extra_size
+        if is_currents_line(line):
+            if self.step >= self._next_checkpoint_step:
+                self.checkpoint_steps.append(self.step)
+                self.checkpoint_offsets.append(self.offset)
+                self._next_checkpoint_step = (self.step // self.interval + 1) * self.interval
+            self.step += 1
+        elif line.startswith(SKIPPED_STEPS_MARKER):
+            self.step += int(line.split()[1])
+        else:
+            for kind, marker in RAW_OUTPUT_MARKERS.items():
+                if marker in line:
+                    self.markers.append((kind, self.step, self.offset))
+                    break
+        self.offset += line_size
+
+    def build(self) -> 'RawOutputIndex':
+        return RawOutputIndex(self.file_path,
+                              checkpoint_steps=np.array(self.checkpoint_steps, dtype=np.int64),
+                              checkpoint_offsets=np.array(self.checkpoint_offsets, dtype=np.int64),
+                              markers=self.markers,
+                              steps=self.step,
+                              encoding=self.encoding)
+
+    def save(self) -> 'RawOutputIndex':
+        index = self.build()
+        index.save()
+        return index
+
+
+class RawOutputIndex:
+    """
+    Random access to raw output by steps.
+
+    Attributes:
+        file_path: path to indexed raw output file (with compression suffix)
+        steps: total number of steps in the file
+        markers: list of (kind, step, offset) of marker lines
+    Methods:
+        read_steps(start_step: int, stop_step: int) -> List[str]
+        find_markers(kind: str) -> List[Tuple[int, int]]
+        save()
+        load(raw_output_path: str) -> Union[RawOutputIndex, None]
+        build_from_file(raw_output_path: str, interval: int) -> RawOutputIndex
+        load_or_build(raw_output_path: str, interval: int) -> RawOutputIndex
+    """
+    def __init__(self, file_path: str, checkpoint_steps: np.ndarray, checkpoint_offsets: np.ndarray,
+                 markers: List[Tuple[str, int, int]], steps: int, encoding: str):
+        self.file_path = file_path
+        self.checkpoint_steps = checkpoint_steps
+        self.checkpoint_offsets = checkpoint_offsets
+        self.markers = markers
+        self.steps = steps
+        self.encoding = encoding
+
+    @property
+    def index_path(self) -> str:
+        return self.file_path + RAW_OUTPUT_INDEX_SUFFIX
+
+    def read_steps(self, start_step: int, stop_step: int) -> List[str]:
+        """
+        Reads raw output printed from the currents line of start_step up to the currents line of stop_step.
+        :return: raw output lines including markers and other lines between currents lines
+        """
+        if not len(self.checkpoint_steps) or stop_step <= start_step:
+            return []
+        position = max(bisect.bisect_right(self.checkpoint_steps, start_step) - 1, 0)
+        step = int(self.checkpoint_steps[position])
+        lines = []
+        with open_raw_output(self.file_path, binary=True) as raw_file:
+            raw_file.seek(int(self.checkpoint_offsets[position]))
+            for raw_line in raw_file:
+                line = raw_line.decode(self.encoding, errors='replace').replace('\r\n', '\n')
+                if is_currents_line(line):
+                    if step >= stop_step:
+                        break
+                    if step >= start_step:
+                        lines.append(line)
+                    step += 1
+                    continue
+                if line.startswith(SKIPPED_STEPS_MARKER):
+                    # Marker is returned if any of the skipped steps is in the range
+                    skipped_steps = int(line.split()[1])
+                    if step < stop_step and step + skipped_steps > start_step:
+                        lines.append(line)
+                    step += skipped_steps
+                elif start_step <= step <= stop_step:
+                    lines.append(line)
+        return lines
+
+    def find_markers(self, kind: str) -> List[Tuple[int, int]]:
+        """
+        :param kind: one of RAW_OUTPUT_MARKERS keys
+        :return: list of (step, offset) of marker lines
+        """
+        return [(step, offset) for marker_kind, step, offset in self.markers if marker_kind == kind]
+
+    def save(self):
+        markers = np.array(self.markers, dtype=object).reshape(-1, 3)
+        with open(self.index_path, 'wb') as index_file:
+            np.savez(index_file,
+                     checkpoint_steps=self.checkpoint_steps,
+                     checkpoint_offsets=self.checkpoint_offsets,
+                     marker_kinds=markers[:, 0].astype(str),
+                     marker_steps=markers[:, 1].astype(np.int64),
+                     marker_offsets=markers[:, 2].astype(np.int64),
+                     steps=self.steps,
+                     encoding=self.encoding,
+                     file_size=os.path.getsize(self.file_path))
+
+    @classmethod
+    def load(cls, raw_output_path: str) -> Union['RawOutputIndex', None]:
+        """
+        :param raw_output_path: configured path to raw output file (without compression suffix)
+        :return: index of the last written raw output variant or None if there is no valid index
+        """
+        file_path = find_raw_output_path(raw_output_path)
+        index_path = file_path + RAW_OUTPUT_INDEX_SUFFIX
+        if not os.path.isfile(index_path) or not os.path.isfile(file_path):
+            return None
+        with np.load(index_path) as index_data:
+            # Index of overwritten file is not valid
+            if int(index_data['file_size']) != os.path.getsize(file_path):
+                return None
+            markers = list(zip(index_data['marker_kinds'].tolist(),
+                               index_data['marker_steps'].tolist(),
+                               index_data['marker_offsets'].tolist()))
+            return cls(file_path,
+                       checkpoint_steps=index_data['checkpoint_steps'],
+                       checkpoint_offsets=index_data['checkpoint_offsets'],
+                       markers=markers,
+                       steps=int(index_data['steps']),
+                       encoding=str(index_data['encoding']))
+
+    @classmethod
+    def build_from_file(cls, raw_output_path: str, interval=1000) -> 'RawOutputIndex':
+        """
+        Bulk indexer of existing raw output file. Index is saved near the file.
+        """
+        file_path = find_raw_output_path(raw_output_path)
+        builder = RawOutputIndexBuilder(file_path, interval)
+        with open_raw_output(file_path, binary=True) as raw_file:
+            for raw_line in raw_file:
+                builder.add_line(raw_line.decode(builder.encoding, errors='replace'), len(raw_line))
+        return builder.save()
+
+    @classmethod
+    def load_or_build(cls, raw_output_path: str, interval=1000) -> 'RawOutputIndex':
+        return cls.load(raw_output_path) or cls.build_from_file(raw_output_path, interval)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='treada_launcher.py --raw-steps',
+                                     description='Print raw Treada output of a steps range')
+    parser.add_argument('start', type=int, nargs='?', default=None, help='first step')
+    parser.add_argument('stop', type=int, nargs='?', default=None, help='step after the last one, start + 1 by default')
+    parser.add_argument('--markers', action='store_true',
+                        help='print steps of ' + ', '.join(RAW_OUTPUT_MARKERS) + ' marker lines')
+    parser.add_argument('--raw-path', default=None, help='path to raw output file, temporary raw path by default')
+    return parser.parse_args(argv)
+
+
+def run_raw_steps_printing(config: Config, argv=None):
+    if argv is None:
+        mode_flags = [arg for arg in ('--raw-steps', '-s') if arg in sys.argv]
+        argv = sys.argv[sys.argv.index(mode_flags[0]) + 1:] if mode_flags else []
+    args = parse_args(argv)
+    raw_output_path = args.raw_path or config.paths.result.temporary.raw
+    index_interval = config.advanced_settings.result.raw_output.index_interval
+    index = RawOutputIndex.load_or_build(raw_output_path, interval=index_interval)
+    if args.markers or args.start is None:
+        print(f'Steps in {index.file_path}: {index.steps}')
+        for kind, step, offset in index.markers:
+            print(f'{kind}: step {step}, offset {offset}')
+    if args.start is not None:
+        stop = args.stop if args.stop is not None else args.start + 1
+        for line in index.read_steps(args.start, stop):
+            print(line, end='')
@@ -0,0 +1,160 @@
+"""
+Frequency-keyed store of small signal analysis results.
+Rows are appended to the store file (sidecar of the result file), so repeated "capacity_info" stages
+do not reread, compare and rewrite the whole result file. The last row of a frequency replaces previous ones.
+Opened stores are kept in memory, only rows appended by others are read on the next opening.
+The result file sorted by frequency is written on request only.
+
+How to use:
+    store = SmallSignalResultStore.open(result_path)
+    store.upsert(dataframe, skip_existing=True)  # frequencies which are already in the store are skipped
+    result_dataframe = store.to_dataframe()
+    store.export()  # writes sorted result file
+"""
+import os
+from typing import Dict, List, Iterable
+
+import numpy as np
+import pandas as pd
+
+from wrapper.misc.global_functions import create_dir
+
+
+SMALL_SIGNAL_STORE_SUFFIX = '.store'
+# Frequencies are equal if they are equal in the result file format
+FREQUENCY_KEY_FORMAT = '{:.6e}'
+
+
+class SmallSignalResultStore:
+    """
+    Append-only store of small signal analysis rows with upsert-by-frequency semantics.
+    Store file consists of header line with col names and rows of values (the first col is frequency).
+
+    Attributes:
+        result_path: path to the exported result file
+        store_path: path to the store file
+        columns: col names
+        rows: dict, where keys: frequency keys and values: rows of values
+    Methods:
+        open(result_path: str) -> SmallSignalResultStore
+        refresh()
+        reset(columns: Iterable[str])
+        upsert(dataframe: pd.DataFrame, skip_existing: bool) -> int
+        has(frequency: float) -> bool
+        to_dataframe() -> pd.DataFrame
+        export() -> str
+    """
+    _opened_stores: Dict[str, 'SmallSignalResultStore'] = {}
+
+    def __init__(self, result_path: str):
+        self.result_path = result_path
+        self.store_path = f'{result_path}{SMALL_SIGNAL_STORE_SUFFIX}'
+        self.columns: List[str] = []
+        self.rows: Dict[str, np.ndarray] = {}
+        # Size of the store file part which is loaded to rows
+        self.offset = 0
+        self.refresh()
+
+    @classmethod
+    def open(cls, result_path: str) -> 'SmallSignalResultStore':
+        store_key = os.path.abspath(result_path)
+        store = cls._opened_stores.get(store_key)
+        if store is None:
+            store = cls._opened_stores[store_key] = cls(result_path)
+        else:
+            store.refresh()
+        return store
+
+    @staticmethod
+    def frequency_key(frequency: float) -> str:
+        return FREQUENCY_KEY_FORMAT.format(frequency)
+
+    def refresh(self):
+        """
+        Loads rows which are appended to the store file after the last loading.
+        The store is loaded from the beginning if the file is truncated or removed.
+        """
+        try:
+            file_size = os.path.getsize(self.store_path)
+        except OSError:
+            file_size = 0
+        if file_size < self.offset:
+            self.columns, self.rows, self.offset = [], {}, 0
+        if file_size == self.offset:
+            return
+        with open(self.store_path, 'rb') as store_file:
+            store_file.seek(self.offset)
+            appended_data = store_file.read(file_size - self.offset)
+        # Incomplete last line is loaded on the next refresh
+        complete_size = appended_data.rfind(b'\n') + 1
+        lines = appended_data[:complete_size].decode('ascii').splitlines()
+        self.offset += complete_size
+        if not self.columns and lines:
+            self.columns = lines.pop(0).split()
+        for line in lines:
+            values = np.array(line.split(), dtype=np.float64)
+            self.rows[self.frequency_key(values[0])] = values
+
+    def reset(self, columns: Iterable[str]):
+        """
+        Removes all rows of the store.
+        """
+        columns = list(columns)
+        header_data = self._encode_lines([columns])
+        create_dir(self.store_path)
+        with open(self.store_path, 'wb') as store_file:
+            store_file.write(header_data)
+        self.columns, self.rows, self.offset = columns, {}, len(header_data)
+
+    def upsert(self, dataframe: pd.DataFrame, skip_existing=False) -> int:
+        """
+        Appends rows of dataframe to the store. Stored rows of the same frequencies are replaced.
+        :param dataframe: small signal analysis dataframe, the first col is frequency
+        :param skip_existing: skip rows of frequencies which are already in the store instead of replacing
+        :return: number of appended rows
+        """
+        self.refresh()
+        columns = dataframe.columns.tolist()
+        if not self.columns:
+            self.reset(columns)
+        elif columns != self.columns:
+            raise ValueError(f'Cols of small signal results {columns} differ from stored cols {self.columns}')
+        values = dataframe.to_numpy(dtype=np.float64)
+        keys = [self.frequency_key(frequency) for frequency in values[:, 0]]
+        positions = [position for position, key in enumerate(keys) if not (skip_existing and key in self.rows)]
+        if not positions:
+            return 0
+        appended_data = self._encode_lines([map(repr, values[position].tolist()) for position in positions])
+        with open(self.store_path, 'ab') as store_file:
+            store_file.write(appended_data)
+        self.offset += len(appended_data)
+        for position in positions:
+            self.rows[keys[position]] = values[position]
+        return len(positions)
+
+    def has(self, frequency: float) -> bool:
+        return self.frequency_key(frequency) in self.rows
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        :return: dataframe of stored rows sorted by frequency
+        """
+        if not self.rows:
+            return pd.DataFrame(columns=self.columns, dtype=np.float64)
+        values = np.vstack(list(self.rows.values()))
+        return pd.DataFrame(values[np.argsort(values[:, 0], kind='stable')], columns=self.columns)
+
+    def export(self) -> str:
+        """
+        Writes stored rows sorted by frequency to the result file.
+        :return: path to the result file
+        """
+        df_str = self.to_dataframe().to_string(index=False, float_format='{:.6e}'.format)
+        create_dir(self.result_path)
+        with open(self.result_path, 'w') as res_file:
+            res_file.write(df_str)
+        return self.result_path
+
+    @staticmethod
+    def _encode_lines(lines: Iterable[Iterable[str]]) -> bytes:
+        return ''.join(f'{"  ".join(line)}\n' for line in lines).encode('ascii')
@@ -0,0 +1,344 @@
+"""
+Out-of-core transient analysis for raw outputs which do not fit in memory.
+Raw output is parsed by chunks. Time, current density and custom cols are calculated for each chunk and spilled
+to a temporary binary file, block means are accumulated with window margins, so only mean values are kept.
+Result file is written from the spilled cols chunk by chunk in the same text format as in the in-memory path.
+"""
+import os
+from typing import Dict, List, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from wrapper.config.config_build import ResultPaths, ResultSettings
+from wrapper.core.data_management import (
+    MtutManager,
+    TransientOutputParser,
+    TransientResultBuilder,
+    TransientResultDataCollector,
+    currents_line_fields,
+    transient_cols,
+)
+from wrapper.core.raw_output_index import count_raw_output_steps
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tracing import traced
+
+
+# Values of all widths which "%.6e" formatted float can have: sign, two or three exponent digits, NaN and inf
+_WIDTH_CLASS_VALUES = {
+    'positive': 1.,
+    'negative': -1.,
+    'positive_long_exponent': 1e100,
+    'negative_long_exponent': -1e100,
+    'nan': np.nan,
+    'positive_inf': np.inf,
+    'negative_inf': -np.inf,
+}
+
+
+def float_width_classes(values: np.ndarray) -> Set[str]:
+    """
+    :return: width classes of "%.6e" formatted values, which are present in the array
+    """
+    abs_values = np.abs(values)
+    is_finite = np.isfinite(values)
+    # Negative zero is formatted with sign too
+    is_negative = np.signbit(values)
+    is_long_exponent = is_finite & ((abs_values >= 9.9999995e99) | ((abs_values < 9.9999995e-100) & (values != 0)))
+    class_masks = {
+        'positive': is_finite & ~is_negative & ~is_long_exponent,
+        'negative': is_finite & is_negative & ~is_long_exponent,
+        'positive_long_exponent': is_finite & ~is_negative & is_long_exponent,
+        'negative_long_exponent': is_finite & is_negative & is_long_exponent,
+        'nan': np.isnan(values),
+        'positive_inf': values == np.inf,
+        'negative_inf': values == -np.inf,
+    }
+    return {name for name, mask in class_masks.items() if mask.any()}
+
+
+class TextTableChunkWriter:
+    """
+    Writes dataframe by chunks exactly like DataFrame.to_string(index=False, float_format=float_format).
+    Col widths of to_string() depend on the widest values, so each chunk is formatted together with sentinel rows,
+    which have values of all width classes present in the whole table. Sentinel rows are not written.
+
+    How to use:
+        writer = TextTableChunkWriter(width_classes, float_format='%.6e')
+        writer.write(file, chunk_df)  # for each chunk in order
+    """
+    def __init__(self, width_classes: Dict[str, Set[str]], float_format='%.6e'):
+        """
+        :param width_classes: {col_name: width classes of col values in the whole table}
+        """
+        self.float_format = float_format
+        self.sentinel_values = {col_name: [_WIDTH_CLASS_VALUES[name] for name in sorted(classes)] or [np.nan]
+                                for col_name, classes in width_classes.items()}
+        self.sentinel_rows_number = max(map(len, self.sentinel_values.values()), default=0)
+        self.is_header_written = False
+
+    def write(self, file, chunk_df: pd.DataFrame):
+        sentinel_df = pd.DataFrame({
+            col_name: self.padded_sentinel_values(col_name) for col_name in chunk_df.columns
+        })
+        table_lines = (pd.concat([chunk_df, sentinel_df], ignore_index=True)
+                       .to_string(index=False, float_format=self.float_format).split('\n'))
+        table_lines = table_lines[:len(table_lines) - self.sentinel_rows_number]
+        if self.is_header_written:
+            file.write('\n')
+            table_lines = table_lines[1:]
+        self.is_header_written = True
+        file.write('\n'.join(table_lines))
+
+    def padded_sentinel_values(self, col_name: str) -> list:
+        values = self.sentinel_values[col_name]
+        return values + values[:1] * (self.sentinel_rows_number - len(values))
+
+
+class StreamingRollingMean:
+    """
+    Chunked equivalent of Series.rolling(window=window_size, step=window_size, center=True).mean().
+    Rolling is applied to parts of the series which start from a multiple of window size and have margins of
+    window size, so each mean is calculated by pandas from the same values as in the whole series.
+
+    How to use:
+        rolling_mean = StreamingRollingMean(window_size)
+        rolling_mean.push(values, steps, times)  # for each chunk
+        rolling_mean.finish()
+        rolling_mean.means, rolling_mean.steps, rolling_mean.times  # values at window centers
+    """
+    def __init__(self, window_size: int):
+        self.window_size = window_size
+        # Position of the first buffered value in the whole series
+        self.buffer_start = 0
+        self.values = np.empty(0)
+        self.buffer_steps = np.empty(0, dtype=np.int64)
+        self.buffer_times = np.empty(0)
+        # Position of the next mean
+        self.next_position = 0
+        self._means: List[np.ndarray] = []
+        self._steps: List[np.ndarray] = []
+        self._times: List[np.ndarray] = []
+
+    def push(self, values: np.ndarray, steps: np.ndarray, times: np.ndarray):
+        self.values = np.concatenate((self.values, values))
+        self.buffer_steps = np.concatenate((self.buffer_steps, steps))
+        self.buffer_times = np.concatenate((self.buffer_times, times))
+        series_end = self.buffer_start + len(self.values)
+        # Windows of means before region end must not reach the end of series
+        self._calculate(region_end=(series_end - self.window_size) // self.window_size * self.window_size)
+
+    def finish(self):
+        self._calculate(region_end=self.buffer_start + len(self.values))
+
+    def _calculate(self, region_end: int):
+        window_size = self.window_size
+        if region_end <= self.next_position:
+            return
+        part_start = max(self.next_position - window_size, 0) - self.buffer_start
+        part_end = min(region_end + window_size - self.buffer_start, len(self.values))
+        part_means = (pd.Series(self.values[part_start:part_end])
+                      .rolling(window=window_size, step=window_size, center=True).mean())
+        positions = part_means.index.values + part_start
+        is_in_region = positions >= self.next_position - self.buffer_start
+        positions = positions[is_in_region]
+        positions = positions[positions < region_end - self.buffer_start]
+        self._means.append(part_means.values[is_in_region][:len(positions)])
+        self._steps.append(self.buffer_steps[positions])
+        self._times.append(self.buffer_times[positions])
+        self.next_position = positions[-1] + self.buffer_start + window_size if len(positions) else region_end
+        # Left margin of the next region is kept
+        drop_number = max(self.next_position - window_size - self.buffer_start, 0)
+        self.values = self.values[drop_number:]
+        self.buffer_steps = self.buffer_steps[drop_number:]
+        self.buffer_times = self.buffer_times[drop_number:]
+        self.buffer_start += drop_number
+
+    @property
+    def means(self) -> np.ndarray:
+        return np.concatenate(self._means) if self._means else np.empty(0)
+
+    @property
+    def steps(self) -> np.ndarray:
+        return np.concatenate(self._steps) if self._steps else np.empty(0, dtype=np.int64)
+
+    @property
+    def times(self) -> np.ndarray:
+        return np.concatenate(self._times) if self._times else np.empty(0)
+
+
+class StreamingTransientResultDataCollector(TransientResultDataCollector):
+    """
+    TransientResultDataCollector which does not keep full dataframe and result dataframe in memory.
+    Only mean_dataframe (one row per window) is kept. Result cols are spilled to result_cols_path file
+    and written to result file by StreamingTransientResultBuilder.
+    """
+    def __init__(self, mtut_file_path, result_paths: ResultPaths, relative_time: float,
+                 all_currents_columns=False, chunk_size=1000000):
+        """
+        :param all_currents_columns: keep all numeric columns of currents lines as extra result cols
+        :param chunk_size: number of currents lines processed at once
+        """
+        self.mtut_manager = MtutManager(mtut_file_path)
+        self.mtut_manager.load_file()
+        self.relative_time = relative_time
+        self.raw_output_path = result_paths.temporary.raw
+        self.all_currents_columns = all_currents_columns
+        self.chunk_size = chunk_size
+        # Full dataframe is never loaded
+        self.transient_parser = None
+        self.dataframe = None
+        self._init_result_attributes(result_paths)
+        self.result_cols_path = os.path.join(os.path.dirname(self.raw_output_path), 'streaming_result_cols.tmp')
+        self.result_cols: List[str] = []
+        self.result_cols_width_classes: Dict[str, Set[str]] = {}
+        self.rows_number = 0
+        self.last_step_index: Union[int, None] = None
+        # Step, current density and time of the last currents line of the previous chunk
+        self._last_kept_step: Union[tuple, None] = None
+
+    @traced()
+    def prepare_result_data(self, stage: StageData,
+                            prev_stage_last_current: Union[float, None],
+                            custom_df_col_params: dict):
+        first_current = self.get_first_df_current(prev_stage_last_current)
+        window_size_denominator = self.transient.get_window_size_denominator()
+        if window_size_denominator is not None:
+            steps_number = count_raw_output_steps(self.raw_output_path) + (first_current is not None)
+            self.transient.window_size = int(steps_number / window_size_denominator)
+        print(f'transient.window_size={self.transient.window_size}', end='\n\n')
+        custom_col = self.get_custom_transient_col(custom_df_col_params)
+        rolling_mean = StreamingRollingMean(self.transient.window_size)
+        with open(self.result_cols_path, 'wb') as result_cols_file:
+            for chunk_df in self.iter_dataframe_chunks(first_current):
+                chunk_df[transient_cols.time] = self.calculate_time_values(chunk_df.index.values,
+                                                                           stage.skip_initial_time_step)
+                chunk_df[transient_cols.current_density] = (
+                        chunk_df[transient_cols.source_current] / self.get_current_density_divider()
+                )
+                self.result_cols = [transient_cols.time,
+                                    transient_cols.source_current,
+                                    transient_cols.current_density] + self.get_extra_currents_cols(chunk_df.columns)
+                result_chunk = chunk_df[self.result_cols]
+                if custom_col:
+                    name, multiplier = custom_col
+                    result_chunk = result_chunk.assign(**{name: result_chunk[transient_cols.source_current] * multiplier})
+                    self.result_cols = list(result_chunk.columns)
+                self.spill_result_chunk(result_chunk, result_cols_file)
+                steps, densities, times = self.restore_skipped_steps(chunk_df.index.values,
+                                                                     chunk_df[transient_cols.current_density].values,
+                                                                     chunk_df[transient_cols.time].values)
+                rolling_mean.push(densities, steps, times)
+                self.last_step_index = chunk_df.index[-1]
+        self.check_initial_steps_number(self.rows_number, stage.skip_initial_time_step)
+        rolling_mean.finish()
+        self.mean_dataframe = pd.DataFrame({transient_cols.current_density: rolling_mean.means},
+                                           index=rolling_mean.steps)
+        self.mean_dataframe[transient_cols.time] = rolling_mean.times
+        self.transient.time = self.find_transient_time_by_means()
+        self.correct_transient_time(window_size=self.transient.window_size)
+
+        self.last_mean_time, self.last_mean_current_density = (
+            self.mean_dataframe[[transient_cols.time, transient_cols.current_density]].tail(50).mean()
+        )
+        self.ww_data_indexes = self.set_distributions_indexes(stage.name)
+
+    def iter_dataframe_chunks(self, first_current: Union[float, None]):
+        chunks = TransientOutputParser.iter_dataframe_chunks(self.raw_output_path, self.chunk_size,
+                                                             all_columns=self.all_currents_columns)
+        for chunk_index, chunk_df in enumerate(chunks):
+            if first_current is not None:
+                if chunk_index == 0:
+                    self.dataframe = chunk_df
+                    self._add_first_df_current(first_current)
+                    chunk_df, self.dataframe = self.dataframe, None
+                else:
+                    chunk_df.index = chunk_df.index + 1
+            self.rows_number += len(chunk_df)
+            yield chunk_df
+
+    def restore_skipped_steps(self, steps: np.ndarray, densities: np.ndarray, times: np.ndarray) -> tuple:
+        """
+        Restores steps skipped by capture reduction by linear interpolation between kept steps (the last kept step
+        of the previous chunk too) like TransientResultDataCollector.get_step_current_density_seria().
+        :return: steps, densities, times of each step of the chunk
+        """
+        if not len(steps):
+            return steps, densities, times
+        kept_steps, kept_densities, kept_times = steps, densities, times
+        first_step = steps[0]
+        if self._last_kept_step is not None:
+            previous_step, previous_density, previous_time = self._last_kept_step
+            kept_steps = np.concatenate(([previous_step], steps))
+            kept_densities = np.concatenate(([previous_density], densities))
+            kept_times = np.concatenate(([previous_time], times))
+            first_step = previous_step + 1
+        self._last_kept_step = (steps[-1], densities[-1], times[-1])
+        all_steps = np.arange(first_step, steps[-1] + 1)
+        if len(all_steps) == len(steps):
+            return steps, densities, times
+        return (all_steps,
+                np.interp(all_steps, kept_steps, kept_densities),
+                np.interp(all_steps, kept_steps, kept_times))
+
+    def spill_result_chunk(self, result_chunk: pd.DataFrame, result_cols_file):
+        np.ascontiguousarray(result_chunk.values, dtype=np.float64).tofile(result_cols_file)
+        for col_name in result_chunk.columns:
+            width_classes = self.result_cols_width_classes.setdefault(col_name, set())
+            width_classes.update(float_width_classes(result_chunk[col_name].values))
+
+    def iter_result_chunks(self, col_names: List[str]):
+        """
+        :return: iterator over spilled result dataframe chunks with selected cols
+        """
+        if not self.rows_number:
+            return
+        result_cols = np.memmap(self.result_cols_path, dtype=np.float64, mode='r',
+                                shape=(self.rows_number, len(self.result_cols)))
+        col_positions = [self.result_cols.index(col_name) for col_name in col_names]
+        for chunk_start in range(0, self.rows_number, self.chunk_size):
+            chunk_values = np.array(result_cols[chunk_start:chunk_start + self.chunk_size, col_positions])
+            yield pd.DataFrame(chunk_values, columns=col_names)
+        del result_cols
+
+    def remove_result_cols(self):
+        if os.path.isfile(self.result_cols_path):
+            os.remove(self.result_cols_path)
+
+    def get_extra_currents_cols(self, columns=None) -> List[str]:
+        columns = self.result_cols if columns is None else columns
+        return [col for col in currents_line_fields[1:] if col in columns]
+
+    def get_last_step_index(self) -> int:
+        return self.last_step_index
+
+    def get_result_dataframe(self):
+        """
+        Full result dataframe is not kept in streaming mode, it is written by StreamingTransientResultBuilder.
+        """
+        return None
+
+
+class StreamingTransientResultBuilder(TransientResultBuilder):
+    """
+    Writes result of StreamingTransientResultDataCollector to the result file by chunks.
+    """
+    def __init__(self, result_collector: StreamingTransientResultDataCollector, result_paths: ResultPaths,
+                 result_settings: ResultSettings, stage_name='none_stage'):
+        super().__init__(result_collector, result_paths, result_settings, stage_name)
+
+    def _dump_dataframe_to_file(self, file_path: str):
+        if self.result_settings.select_mean_dataframe:
+            super()._dump_dataframe_to_file(file_path)
+            self.result_collector.remove_result_cols()
+            return
+        col_names_for_output = self._get_output_col_names()
+        width_classes = {col_name: self.result_collector.result_cols_width_classes.get(col_name, set())
+                         for col_name in col_names_for_output}
+        writer = TextTableChunkWriter(width_classes, float_format='%.6e')
+        try:
+            with open(file_path, 'a') as res_file:
+                for result_chunk in self.result_collector.iter_result_chunks(col_names_for_output):
+                    writer.write(res_file, result_chunk)
+        finally:
+            self.result_collector.remove_result_cols()
@@ -0,0 +1,116 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.analysis_cache import AnalysisCache, analysis_cache
+from wrapper.core.data_management import transient_cols
+from wrapper.launch.result_build import transient_result_build
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+from wrapper.ui.plotting import load_result_dataframe
+
+
+class AnalysisCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        self.cache = AnalysisCache()
+        self.cache.configure(enable=True, cache_dir=self.cache_dir, max_size_mb=1.7)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_memoized_arrays_are_not_computed_again(self):
+        computed = []
+
+        def compute():
+            computed.append(True)
+            return {'values': np.arange(10.), 'name': np.array('density')}
+
+        key = self.cache.key('analysis', {'window_size': 100})
+        self.cache.memoize(key, compute)
+        other_cache = AnalysisCache()
+        other_cache.configure(enable=True, cache_dir=self.cache_dir)
+        arrays = other_cache.memoize(key, compute)
+        self.assertEqual(len(computed), 1)
+        np.testing.assert_array_equal(arrays['values'], np.arange(10.))
+        self.assertEqual(arrays['name'].item(), 'density')
+        self.assertNotEqual(self.cache.key('analysis', {'window_size': 101}), key)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        keys = [self.cache.key('entry', index) for index in range(4)]
+        for key in keys[:3]:
+            self.cache.save(key, {'values': np.zeros(2 ** 16)})
+        os.utime(self.cache.entry_path(keys[1]), (0, 0))
+        os.utime(self.cache.entry_path(keys[2]), (1, 1))
+        os.utime(self.cache.entry_path(keys[0]), (2, 2))
+        self.cache.save(keys[3], {'values': np.zeros(2 ** 16)})
+        self.assertIsNone(self.cache.load(keys[1]))
+        for key in (keys[0], keys[2], keys[3]):
+            self.assertIsNotNone(self.cache.load(key))
+
+    def test_disabled_cache(self):
+        self.cache.configure(enable=False, cache_dir=self.cache_dir)
+        self.cache.save('key', {'values': np.zeros(1)})
+        self.assertIsNone(self.cache.load('key'))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+
+class TransientAnalysisMemoizationTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.workspace.generate_raw_output()
+        self.config.plotting.enable = False
+        self.config.advanced_settings.result.dataframe.custom = {'name': 'U', 'multiplier': 50}
+        self.config.paths.result.cache = os.path.join(self.tmp_dir.name, 'result', 'cache', '')
+        analysis_cache.configure(enable=True, cache_dir=self.config.paths.result.cache)
+
+    def tearDown(self) -> None:
+        analysis_cache.configure(enable=False, cache_dir='')
+        transient_cols.__dict__.pop('custom', None)
+        super().tearDown()
+
+    def build_result(self) -> str:
+        with redirect_stdout(io.StringIO()):
+            transient_result_build(self.config, StageData(name='light'), None, self.workspace.relative_time)
+        with open(self.result_file_path()) as result_file:
+            return result_file.read()
+
+    def result_file_path(self) -> str:
+        result_dir = os.path.dirname(self.config.paths.result.main)
+        result_names = [name for name in os.listdir(result_dir) if name.endswith('.txt')]
+        return os.path.join(result_dir, result_names[0])
+
+    def test_result_is_loaded_from_cache(self):
+        result_text = self.build_result()
+        self.assertEqual((analysis_cache.hits, len(os.listdir(self.config.paths.result.cache))), (0, 1))
+        transient_cols.__dict__.pop('custom', None)
+        self.assertEqual(self.build_result(), result_text)
+        self.assertEqual(analysis_cache.hits, 1)
+        # Changed analysis settings are not loaded from cache
+        self.config.advanced_settings.transient.window_size += 1
+        self.build_result()
+        self.assertEqual(analysis_cache.hits, 1)
+        self.assertEqual(len(os.listdir(self.config.paths.result.cache)), 2)
+
+    def test_loaded_result_dataframe_is_memoized(self):
+        self.build_result()
+        result_path = self.result_file_path()
+        expected_df = pd.read_csv(result_path, skiprows=15, header=0, sep=r'\s+')
+        pd.testing.assert_frame_equal(load_result_dataframe(result_path, 15), expected_df)
+        hits = analysis_cache.hits
+        pd.testing.assert_frame_equal(load_result_dataframe(result_path, 15), expected_df)
+        self.assertEqual(analysis_cache.hits, hits + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.capture_reduction import SwingDoorReducer, SKIPPED_STEPS_MARKER
+from wrapper.core.data_management import TransientOutputParser, TransientResultDataCollector, transient_cols
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspace
+
+
+def currents_line(current: float, step: int) -> str:
+    return ' '.join([f'{current:.6E}', f'{step}.'] + [f'{current:.6E}'] * 10) + '\n'
+
+
+class SwingDoorReducerTests(unittest.TestCase):
+    def test_plateau_is_reduced_within_tolerance(self):
+        steps = np.arange(20000)
+        currents = 1e-3 * (1 - np.exp(-steps / 300))
+        reducer = SwingDoorReducer(relative_tolerance=1e-4, max_skipped_steps=1000, warmup_steps=10)
+        lines = ['RELATIVE UNITES:\n']
+        for step, current in zip(steps, currents):
+            lines += reducer.push(currents_line(current, step), current)
+        lines += reducer.flush()
+        self.assertLess(reducer.kept_steps * 10, reducer.steps)
+        self.assertEqual(lines[0], 'RELATIVE UNITES:\n')
+        for line in lines[:11]:
+            self.assertFalse(line.startswith(SKIPPED_STEPS_MARKER))
+        pure_lines, steps_index = TransientOutputParser.restore_steps_index(lines[1:])
+        self.assertEqual(steps_index[-1], steps[-1])
+        kept_currents = np.array([float(line.split(' ', 1)[0]) for line in pure_lines])
+        np.testing.assert_allclose(kept_currents, currents[steps_index], rtol=1e-6)
+        restored_currents = np.interp(steps, steps_index, kept_currents)
+        np.testing.assert_allclose(restored_currents, currents, rtol=2e-4, atol=1e-9)
+
+    def test_other_lines_keep_their_position(self):
+        reducer = SwingDoorReducer(relative_tolerance=1e-2)
+        lines = []
+        for step in range(5):
+            lines += reducer.push(currents_line(1., step), 1.)
+        lines += reducer.push('TEMPORARY RESULTS ARE WRITTEN\n', None)
+        self.assertEqual(lines[-1], 'TEMPORARY RESULTS ARE WRITTEN\n')
+        self.assertEqual(lines[1], f'{SKIPPED_STEPS_MARKER} 3\n')
+        self.assertTrue(lines[2].startswith('1.000000E+00 4.'))
+
+
+class ReducedResultTests(unittest.TestCase):
+    def test_time_and_transient_time_are_kept(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            workspace = SyntheticWorkspace(tmp_dir, size=20000)
+            workspace.generate_raw_output()
+            full_collector = self.prepare_collector(workspace)
+            with open(workspace.raw_path) as raw_file:
+                raw_lines = raw_file.readlines()
+            reducer = SwingDoorReducer(relative_tolerance=1e-3, max_skipped_steps=1000, warmup_steps=100)
+            with open(workspace.raw_path, 'w') as raw_file:
+                for line in raw_lines:
+                    is_currents_line = TransientOutputParser.find_currents_line(line)
+                    current = TransientOutputParser.get_single_current_from_line(line) if is_currents_line else None
+                    raw_file.writelines(reducer.push(line, current))
+                raw_file.writelines(reducer.flush())
+            reduced_collector = self.prepare_collector(workspace)
+        full_df, reduced_df = full_collector.dataframe, reduced_collector.dataframe
+        self.assertLess(len(reduced_df) * 5, len(full_df))
+        np.testing.assert_allclose(reduced_df[transient_cols.time],
+                                   full_df[transient_cols.time].loc[reduced_df.index])
+        # Means are weighted by skipped steps, so transient time differs within the reduction tolerance only
+        self.assertAlmostEqual(reduced_collector.transient.corrected_time, full_collector.transient.corrected_time,
+                               delta=1e-3 * full_collector.transient.corrected_time)
+        # Window size by denominator counts steps, not kept lines
+        with redirect_stdout(io.StringIO()):
+            full_means = full_collector.get_mean_current_density_seria(window_size_denominator=20)
+            reduced_means = reduced_collector.get_mean_current_density_seria(window_size_denominator=20)
+        self.assertEqual(reduced_collector.transient.window_size, full_collector.transient.window_size)
+        pd.testing.assert_index_equal(reduced_means.index, full_means.index, exact=False)
+        np.testing.assert_allclose(reduced_means, full_means, rtol=1e-3)
+
+    @staticmethod
+    def prepare_collector(workspace: SyntheticWorkspace) -> TransientResultDataCollector:
+        config = workspace.config
+        result_collector = TransientResultDataCollector(mtut_file_path=config.paths.treada_core.mtut,
+                                                        result_paths=config.paths.result,
+                                                        relative_time=workspace.relative_time)
+        result_collector.transient.set_window_size(config.advanced_settings.transient.window_size)
+        result_collector.transient.set_criteria_calculating_df_slice(
+            config.advanced_settings.transient.criteria_calculating_df_slice
+        )
+        with redirect_stdout(io.StringIO()):
+            result_collector.prepare_result_data(StageData(name='light'), None,
+                                                 config.advanced_settings.result.dataframe.custom)
+        return result_collector
+
+
+if __name__ == '__main__':
+    unittest.main()
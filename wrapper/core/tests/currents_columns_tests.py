@@ -0,0 +1,93 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+from wrapper.core.data_management import (
+    TransientOutputParser, TransientResultDataCollector, TransientResultBuilder, currents_line_fields, transient_cols
+)
+from wrapper.core.treada_io_handling import TreadaRunner, StdoutCapturer
+from wrapper.launch.scenarios.scenario_build import StageData
+
+
+class CurrentsColumnsTests(SyntheticWorkspaceTestCase):
+    workspace_size = 2000
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.advanced_settings.result.currents_columns = True
+
+    def test_parser_and_capture_extract_the_same_columns(self):
+        runner = TreadaRunner(self.config, self.workspace.relative_time)
+        with redirect_stdout(io.StringIO()):
+            runner.run(StageData(name='light'), self.workspace.raw_path)
+        captured_currents = runner.get_captured_currents()
+        parser = TransientOutputParser(self.workspace.raw_path, all_columns=True)
+        self.assertEqual(captured_currents.dtype.names, currents_line_fields)
+        self.assertEqual(len(captured_currents), len(parser.currents_array))
+        for name in currents_line_fields[:12]:
+            np.testing.assert_allclose(captured_currents[name], parser.currents_array[name])
+        self.assertTrue(np.isnan(parser.currents_array['col_12']).all())
+        np.testing.assert_array_equal(parser.currents_array['step'][:3], [1., 2., 3.])
+        # Source current column is the same as in the default parsing mode
+        default_df = TransientOutputParser(self.workspace.raw_path).dataframe
+        pd.testing.assert_series_equal(parser.dataframe[transient_cols.source_current],
+                                       default_df[transient_cols.source_current])
+
+    def test_extra_columns_are_saved_to_result(self):
+        self.workspace.generate_raw_output()
+        parser = TransientOutputParser(self.workspace.raw_path, all_columns=True)
+        result_collector = TransientResultDataCollector(mtut_file_path=self.config.paths.treada_core.mtut,
+                                                        result_paths=self.config.paths.result,
+                                                        relative_time=self.workspace.relative_time,
+                                                        all_currents_columns=True,
+                                                        currents_array=parser.currents_array)
+        result_collector.transient.set_window_size(self.config.advanced_settings.transient.window_size)
+        result_collector.transient.set_criteria_calculating_df_slice(
+            self.config.advanced_settings.transient.criteria_calculating_df_slice
+        )
+        with redirect_stdout(io.StringIO()):
+            result_collector.prepare_result_data(StageData(name='light'), None,
+                                                 self.config.advanced_settings.result.dataframe.custom)
+            result_builder = TransientResultBuilder(result_collector, result_paths=self.config.paths.result,
+                                                    result_settings=self.config.advanced_settings.result,
+                                                    stage_name='light')
+        result_df = pd.read_csv(result_builder.result_path, skiprows=result_builder.header_length, sep=r'\s+')
+        self.assertIn('col_11', result_df.columns)
+        # Initial null current line added on the first stage has no other columns
+        self.assertTrue(np.isnan(result_df['step'].iloc[0]))
+        self.assertEqual(result_df['step'].iloc[1], 1.)
+
+    def test_capture_of_irregular_lines(self):
+        capturer = StdoutCapturer(process=None, config=self.config, relative_time=self.workspace.relative_time)
+        capturer.set_stage_data(StageData(name='light'), is_show_stage_name=False)
+        fields = ' '.join(f'{index}.0E-03' for index in range(2, 12))
+        lines = [
+            # Trailing space before line ending and Fortran overflow field
+            f'   1.5E-03 1. {fields} \n',
+            f'   2.5E-03 2. {fields.replace("5.0E-03", "*****")}\n',
+            # Short line is a currents line for the parser too
+            f'   3.5E-03 3. {fields.rsplit(" ", 2)[0]}\n',
+            ' TIME:  1.000000E+00\n',
+        ]
+        with redirect_stdout(io.StringIO()):
+            for line in lines:
+                capturer.handle_output_line(line)
+        captured_currents = capturer.currents_capture.get_array()
+        parsed_lines = [line for line in lines if TransientOutputParser.find_currents_line(line)]
+        self.assertEqual(len(captured_currents), len(parsed_lines))
+        np.testing.assert_array_equal(captured_currents['source_current'], [1.5e-3, 2.5e-3, 3.5e-3])
+        self.assertEqual(captured_currents['col_11'][0], 11e-3)
+        self.assertTrue(np.isnan(captured_currents['col_5'][1]))
+        self.assertTrue(np.isnan(captured_currents['col_10'][2]))
+        self.assertEqual(capturer.line_current_value, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from wrapper.core.data_management import MtutManager
+from wrapper.core.dump_schedule import DumpSchedule
+from wrapper.core.treada_io_handling import TreadaRunner, calculate_timestep_constant
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+
+
+def requested_dumps(schedule: DumpSchedule, dumps_number: int) -> list:
+    return [dump for dump in range(1, dumps_number + 1) if schedule.is_requested(dump * schedule.interval_time)]
+
+
+class DumpScheduleTests(unittest.TestCase):
+    def test_legacy_range(self):
+        schedule = DumpSchedule.from_config({'start': 0, 'stop': 100, 'step': 10}, timestep_constant=0.3)
+        self.assertEqual(schedule.interval_steps, int(10 / 0.3))
+        self.assertEqual(requested_dumps(schedule, 20), list(range(1, 11)))
+        # Step is limited by stop
+        schedule = DumpSchedule.from_config({'start': 0, 'stop': 10, 'step': 100}, timestep_constant=1.)
+        self.assertEqual(schedule.interval_steps, 10)
+        with self.assertRaises(ValueError):
+            DumpSchedule.from_config({'start': 10, 'stop': 10, 'step': 1}, timestep_constant=1.)
+
+    def test_multiple_ranges(self):
+        schedule = DumpSchedule.from_config([{'start': 0, 'stop': 50, 'step': 10},
+                                             {'start': 100, 'stop': 200, 'step': 50}], timestep_constant=1.)
+        self.assertEqual(schedule.interval_steps, 10)
+        self.assertEqual(requested_dumps(schedule, 30), [1, 2, 3, 4, 5, 10, 15, 20])
+
+    def test_log_spaced_times(self):
+        schedule = DumpSchedule.from_config({'log': {'start': 1, 'stop': 1000, 'number': 4}}, timestep_constant=1.)
+        self.assertEqual(schedule.interval_steps, 1)
+        self.assertEqual(requested_dumps(schedule, 2000), [1, 10, 100, 1000])
+
+    def test_explicit_times_are_rounded_to_nearest_dump(self):
+        schedule = DumpSchedule.from_config({'times': [400, 100, 270]}, timestep_constant=2.)
+        self.assertEqual(schedule.interval_steps, 50)
+        self.assertEqual(requested_dumps(schedule, 10), [1, 3, 4])
+        with self.assertRaises(ValueError):
+            DumpSchedule.from_config([], timestep_constant=1.)
+
+
+class ScheduledDumpingTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.options.preserve_distributions = True
+        self.config.advanced_settings.runtime.distributions.enable_preserving_ranges = True
+        mtut_manager = MtutManager(self.config.paths.treada_core.mtut)
+        mtut_manager.load_file()
+        self.mtut_manager = mtut_manager
+        self.stage_number = mtut_manager.get_var('CKLKRS').rstrip('.')
+        self.timestep_constant = calculate_timestep_constant(float(mtut_manager.get_var('TSTEP')),
+                                                             self.workspace.relative_time)
+
+    def tearDown(self) -> None:
+        TreadaRunner.old_mtut_time = None
+        super().tearDown()
+
+    def test_only_scheduled_dumps_are_preserved(self):
+        times = [200 * self.timestep_constant, 1000 * self.timestep_constant, 5000 * self.timestep_constant]
+        self.config.advanced_settings.runtime.distributions.preserving_ranges = {self.stage_number: {'times': times}}
+        runner = TreadaRunner(self.config, self.workspace.relative_time)
+        self.mtut_manager.load_file()
+        self.assertEqual(self.mtut_manager.get_var('TIME'), '200')
+        with redirect_stdout(io.StringIO()):
+            runner.run(StageData(name='light'), self.workspace.raw_path)
+        distributions_dir = os.path.join(self.config.paths.result.temporary.distributions, 'light')
+        self.assertEqual(len(os.listdir(distributions_dir)), len(times))
+        for dump_dir in os.listdir(distributions_dir):
+            self.assertEqual(sorted(os.listdir(os.path.join(distributions_dir, dump_dir))),
+                             sorted(self.config.distribution_filenames))
+
+
+if __name__ == '__main__':
+    unittest.main()
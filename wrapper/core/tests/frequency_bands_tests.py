@@ -0,0 +1,105 @@
+import io
+import os
+import textwrap
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.data_management import VectorizedSmallSignalInfoOutputParser, small_signal_cols
+from wrapper.core.frequency_bands import FrequencyBandsRunner, split_frequency_range, merge_band_dataframes
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.core.watchdog import TreadaStallError
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+from wrapper.misc.collections.treada_replay import treada_replay
+
+# Stand-in of Treada executable, which fails on bands above 1 GHz and replays other ones
+FAILING_STAND_IN_SCRIPT = textwrap.dedent('''
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import treada_replay
+    if float(treada_replay.load_mtut_vars('MTUT')['FMIN']) > 1.:
+        sys.exit(3)
+    sys.exit(treada_replay.main())
+''')
+
+
+class SplitFrequencyRangeTests(unittest.TestCase):
+    def test_bands_compose_whole_grid(self):
+        bands = split_frequency_range(1e-3, 1e2, bands_number=4, number=21)
+        self.assertEqual([band.number for band in bands], [6, 6, 6, 6])
+        band_grids = [treada_replay.log_space(band.start, band.stop, band.number) for band in bands]
+        self.assertEqual(bands[0].start, 1e-3)
+        self.assertEqual(bands[-1].stop, 1e2)
+        merged_df = merge_band_dataframes([pd.DataFrame({small_signal_cols.frequency: grid}) for grid in band_grids])
+        np.testing.assert_allclose(merged_df[small_signal_cols.frequency], treada_replay.log_space(1e-3, 1e2, 21),
+                                   rtol=1e-12)
+
+    def test_equal_width_bands(self):
+        bands = split_frequency_range(0., 9., bands_number=3, scale='linear')
+        self.assertEqual([(band.start, band.stop) for band in bands], [(0., 3.), (3., 6.), (6., 9.)])
+        self.assertEqual(len(split_frequency_range(1., 2., bands_number=3, number=1)), 1)
+        with self.assertRaises(ValueError):
+            split_frequency_range(1., 2., bands_number=3, scale='cubic')
+
+
+class FrequencyBandsRunnerTests(SyntheticWorkspaceTestCase):
+    workspace_size = 10
+
+    def setUp(self) -> None:
+        super().setUp()
+        treada_replay.write_synthetic_mtut(self.config.paths.treada_core.mtut, CKLKRS=4,
+                                           FMIN=1e-2, FMAX=1e3, NFREQ=41)
+        self.config.options.auto_ending = True
+        self.config.paths.result.temporary.frequency_bands = os.path.join(self.tmp_dir.name, 'frequency_bands', '')
+        self.stage_data = StageData(name='capacity_info', is_capacity_info_collecting=True)
+
+    def test_bands_equal_single_run(self):
+        self.config.advanced_settings.runtime.frequency_bands.bands_number = 3
+        self.config.advanced_settings.runtime.frequency_bands.max_workers = 2
+        self.config.advanced_settings.runtime.frequency_bands.sandbox_files = ['*.DAT']
+        # Input file and temporary distribution file of Treada's directory
+        for file_name in ('INPUT.DAT', 'MSRS'):
+            with open(os.path.join(self.workspace.core_dir, file_name), 'w') as core_file:
+                core_file.write(file_name)
+        with redirect_stdout(io.StringIO()):
+            bands_df = FrequencyBandsRunner(self.config, self.workspace.relative_time).run(self.stage_data)
+            TreadaRunner(self.config, self.workspace.relative_time).run(self.stage_data,
+                                                                        self.config.paths.result.temporary.raw)
+        single_run_df = VectorizedSmallSignalInfoOutputParser(
+            self.config.paths.result.temporary.raw).get_prepared_dataframe()
+        self.assertEqual(len(bands_df), 41)
+        pd.testing.assert_frame_equal(bands_df, single_run_df, rtol=1e-5)
+        # Only MTUT and input files are copied to band directories
+        band_dir = os.path.join(self.config.paths.result.temporary.frequency_bands, 'band_0')
+        self.assertEqual(sorted(os.listdir(band_dir)), ['INPUT.DAT', 'MTUT', 'treada_raw_output.txt'])
+        # Main MTUT is not changed
+        mtut_vars = treada_replay.load_mtut_vars(self.config.paths.treada_core.mtut)
+        self.assertEqual(int(float(mtut_vars['NFREQ'])), 41)
+
+    def test_failed_band_is_not_merged(self):
+        stand_in_path = os.path.join(self.workspace.core_dir, 'failing_stand_in.py')
+        with open(stand_in_path, 'w') as stand_in_file:
+            stand_in_file.write(FAILING_STAND_IN_SCRIPT)
+        self.config.paths.treada_core.exe = stand_in_path
+        self.config.advanced_settings.runtime.frequency_bands.bands_number = 3
+        self.config.advanced_settings.runtime.watchdog.enable = True
+        self.config.advanced_settings.runtime.watchdog.max_retries = 1
+        console_output = io.StringIO()
+        with redirect_stdout(console_output):
+            with self.assertRaises(TreadaStallError) as error_context:
+                FrequencyBandsRunner(self.config, self.workspace.relative_time).run(self.stage_data)
+        self.assertEqual(error_context.exception.attempts, 2)
+        self.assertIn('band 2: Treada process died with code 3', str(error_context.exception))
+        self.assertNotIn('band 0', str(error_context.exception))
+        # Only the failed band is retried
+        self.assertIn('Retry 1/1 of frequency bands: 2', console_output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
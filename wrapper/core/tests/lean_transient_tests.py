@@ -0,0 +1,91 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.data_management import TransientResultBuilder, TransientResultDataCollector, transient_cols
+from wrapper.core.lean_transient import LeanTransientResultDataCollector
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+from wrapper.misc.tracing import PeakMemoryReport
+
+
+class LeanTransientTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.workspace.generate_raw_output()
+        self.config.advanced_settings.result.currents_columns = True
+        self.config.advanced_settings.result.dataframe.custom = {'name': 'U', 'multiplier': 50}
+
+    def tearDown(self) -> None:
+        # Custom col name is set globally
+        transient_cols.__dict__.pop('custom', None)
+        super().tearDown()
+
+    def analyse(self, collector_class, treada_state: dict = None, prev_stage_last_current=None, **kwargs):
+        result_settings = self.config.advanced_settings.result
+        result_collector = collector_class(mtut_file_path=self.config.paths.treada_core.mtut,
+                                           result_paths=self.config.paths.result,
+                                           relative_time=self.workspace.relative_time,
+                                           all_currents_columns=result_settings.currents_columns,
+                                           **kwargs)
+        if treada_state:
+            result_collector.treada_state = treada_state
+        transient_settings = self.config.advanced_settings.transient
+        result_collector.transient.set_window_size(transient_settings.window_size)
+        result_collector.transient.set_criteria_calculating_df_slice(transient_settings.criteria_calculating_df_slice)
+        with redirect_stdout(io.StringIO()):
+            result_collector.prepare_result_data(StageData(name='light'), prev_stage_last_current,
+                                                 result_settings.dataframe.custom)
+            result_builder = TransientResultBuilder(result_collector, result_paths=self.config.paths.result,
+                                                    result_settings=result_settings, stage_name='light')
+        with open(result_builder.result_path) as result_file:
+            result_text = result_file.read()
+        return result_collector, result_text
+
+    def test_lean_result_is_identical(self):
+        for treada_state, prev_stage_last_current in ((None, None), ({'jpush': '0', 'stage': 2.}, -1.5e-3)):
+            with self.subTest(treada_state=treada_state):
+                collector, text = self.analyse(TransientResultDataCollector, treada_state, prev_stage_last_current)
+                lean_collector, lean_text = self.analyse(LeanTransientResultDataCollector, treada_state,
+                                                         prev_stage_last_current)
+                self.assertEqual(lean_text, text)
+                self.assertEqual(lean_collector.transient.corrected_time, collector.transient.corrected_time)
+                self.assertEqual(lean_collector.last_mean_current_density, collector.last_mean_current_density)
+                pd.testing.assert_frame_equal(lean_collector.mean_dataframe, collector.mean_dataframe)
+
+    def test_dataframe_is_view_of_block(self):
+        lean_collector, _ = self.analyse(LeanTransientResultDataCollector)
+        self.assertIs(lean_collector.result_dataframe, lean_collector.dataframe)
+        self.assertTrue(np.shares_memory(lean_collector.dataframe['U'].values, lean_collector.block))
+        self.assertEqual(list(lean_collector.mean_dataframe.columns),
+                         [transient_cols.current_density, transient_cols.time])
+
+    def test_float32_storage(self):
+        collector, _ = self.analyse(LeanTransientResultDataCollector)
+        float32_collector, _ = self.analyse(LeanTransientResultDataCollector, float32=True)
+        self.assertEqual(float32_collector.block.nbytes * 2, collector.block.nbytes)
+        self.assertEqual(float32_collector.dataframe[transient_cols.current_density].dtype, np.float32)
+        np.testing.assert_allclose(float32_collector.dataframe[transient_cols.time],
+                                   collector.dataframe[transient_cols.time], rtol=1e-6)
+        self.assertAlmostEqual(float32_collector.transient.corrected_time / collector.transient.corrected_time, 1.,
+                               places=4)
+
+    def test_peak_memory_is_lower(self):
+        peak_sizes = {}
+        for collector_class in (TransientResultDataCollector, LeanTransientResultDataCollector):
+            with redirect_stdout(io.StringIO()), PeakMemoryReport(collector_class.__name__) as memory_report:
+                self.analyse(collector_class)
+            peak_sizes[collector_class] = memory_report.peak_size
+        self.assertLess(peak_sizes[LeanTransientResultDataCollector], peak_sizes[TransientResultDataCollector])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import unittest
+import uuid
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+from wrapper.core.live_currents import LiveCurrentsPublisher, LiveCurrentsReader
+from wrapper.ui.live_monitor import decimate
+
+
+class LiveCurrentsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.name = f'treada_test_{uuid.uuid4().hex[:8]}'
+        self.publisher = LiveCurrentsPublisher()
+        self.publisher.configure(enable=True, name=self.name, capacity=8)
+
+    def tearDown(self) -> None:
+        self.publisher.close()
+
+    def test_readers_have_own_cursors(self):
+        first_reader, second_reader = LiveCurrentsReader(self.name), LiveCurrentsReader(self.name)
+        self.publisher.start_stage()
+        for step in range(5):
+            self.publisher.publish(step, step * 0.5, step * 1e-3)
+        generation, records = first_reader.read_new()
+        self.assertEqual(generation, 1)
+        np.testing.assert_array_equal(records[:, 0], np.arange(5))
+        self.assertEqual(len(first_reader.read_new()[1]), 0)
+        self.assertEqual(len(second_reader.read_new()[1]), 5)
+        first_reader.close()
+        second_reader.close()
+
+    def test_lagging_reader_skips_overwritten_records(self):
+        reader = LiveCurrentsReader(self.name)
+        for step in range(20):
+            self.publisher.publish(step, step, 0.)
+        _, records = reader.read_new()
+        np.testing.assert_array_equal(records[:, 0], np.arange(12, 20))
+        self.assertEqual(reader.lost_records, 12)
+        reader.close()
+
+    def test_decimate_keeps_last_row(self):
+        values = np.arange(1001)
+        decimated = decimate(values, 100)
+        self.assertLessEqual(len(decimated), 101)
+        self.assertEqual(decimated[0], 0)
+        self.assertEqual(decimated[-1], 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from wrapper.core.ending_conditions import EndingCondition
+from wrapper.core.progress_metrics import ProgressMetrics, format_eta
+
+
+class EndingConditionPredictionTests(unittest.TestCase):
+    def test_min_steps_to_stop_matches_first_check(self):
+        condition = EndingCondition(chunk_size=10, equal_values_to_stop=3, deviation_coef=1e-3)
+        predicted_steps = condition.min_steps_to_stop()
+        self.assertIsNone(condition.convergence_ratio())
+        with mock.patch.object(EndingCondition, 'is_satisfied', return_value=True) as is_satisfied:
+            steps = 0
+            while not condition.check(1.):
+                steps += 1
+            self.assertEqual(steps + 1, predicted_steps)
+            is_satisfied.assert_called_once()
+        self.assertEqual(condition.convergence_ratio(), 0.)
+
+
+class ProgressMetricsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.metrics_path = os.path.join(self.tmp_dir.name, 'metrics.json')
+        self.metrics = ProgressMetrics()
+        self.metrics.configure(enable=True, metrics_path=self.metrics_path, update_interval_s=0.)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def load_metrics(self) -> dict:
+        with open(self.metrics_path) as metrics_file:
+            return json.load(metrics_file)
+
+    def test_stage_rates_and_eta(self):
+        self.metrics.start_state(0, states_number=2)
+        with mock.patch('wrapper.core.progress_metrics.time.monotonic', side_effect=[100., 102.]):
+            self.metrics.start_stage('light', timestep_constant=0.5, start_steps=0, target_time_ps=300.)
+            self.assertTrue(self.metrics.update_stage(steps=200, transient_time_ps=100.))
+        stage = self.load_metrics()['stage']
+        self.assertEqual(stage['steps_per_s'], 100.)
+        self.assertEqual(stage['ps_per_s'], 50.)
+        self.assertEqual(stage['eta_s'], 4.)
+        self.assertIn('ETA 00:00:04', self.metrics.status)
+        self.assertIn('state 1/2', self.metrics.status)
+        self.metrics.finish_stage()
+        self.metrics.finish_state(is_failed=True)
+        metrics = self.load_metrics()
+        self.assertTrue(metrics['stage']['finished'])
+        self.assertEqual(metrics['sweep']['failed'], 1)
+        self.assertFalse(os.path.exists(f'{self.metrics_path}.tmp'))
+
+    def test_updates_are_throttled(self):
+        self.metrics.update_interval_s = 60.
+        self.metrics.start_stage('dark', timestep_constant=1., start_steps=1)
+        self.assertFalse(self.metrics.update_stage(steps=2, transient_time_ps=2.))
+        self.assertEqual(self.metrics.status, '')
+
+    def test_format_eta(self):
+        self.assertEqual(format_eta(3725.4), '01:02:05')
+        self.assertEqual(format_eta(None), '--:--:--')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+from wrapper.core.capture_reduction import SKIPPED_STEPS_MARKER
+from wrapper.core.data_management import TransientOutputParser
+from wrapper.core.raw_output import RAW_OUTPUT_INDEX_SUFFIX, find_raw_output_path, open_raw_output
+from wrapper.core.raw_output_index import (
+    RawOutputIndex, RawOutputIndexBuilder, count_raw_output_steps, run_raw_steps_printing
+)
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+
+
+class RawOutputIndexTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.advanced_settings.result.raw_output.index = True
+        self.config.advanced_settings.result.raw_output.index_interval = 100
+
+    def run_stage(self):
+        runner = TreadaRunner(self.config, self.workspace.relative_time)
+        with redirect_stdout(io.StringIO()):
+            runner.run(StageData(name='light'), self.workspace.raw_path)
+
+    def currents_lines(self) -> list:
+        with open_raw_output(self.workspace.raw_path) as raw_file:
+            return [line for line in raw_file if TransientOutputParser.find_currents_line(line)]
+
+    def test_capture_index_matches_bulk_index(self):
+        for compression in ('none', 'gzip'):
+            with self.subTest(compression=compression):
+                self.config.advanced_settings.result.raw_output.compression = compression
+                self.run_stage()
+                file_path = find_raw_output_path(self.workspace.raw_path)
+                self.assertTrue(os.path.isfile(file_path + RAW_OUTPUT_INDEX_SUFFIX))
+                capture_index = RawOutputIndex.load(self.workspace.raw_path)
+                os.remove(file_path + RAW_OUTPUT_INDEX_SUFFIX)
+                bulk_index = RawOutputIndex.build_from_file(self.workspace.raw_path, interval=100)
+                np.testing.assert_array_equal(capture_index.checkpoint_steps, bulk_index.checkpoint_steps)
+                np.testing.assert_array_equal(capture_index.checkpoint_offsets, bulk_index.checkpoint_offsets)
+                self.assertEqual(capture_index.markers, bulk_index.markers)
+                self.assertEqual(len(capture_index.find_markers('relative_units')), 1)
+                currents_lines = self.currents_lines()
+                self.assertEqual(capture_index.steps, len(currents_lines))
+                self.assertEqual(capture_index.read_steps(1234, 1240), currents_lines[1234:1240])
+                self.assertEqual(capture_index.read_steps(0, 1), currents_lines[:1])
+
+    def test_steps_are_restored_after_capture_reduction(self):
+        self.config.advanced_settings.runtime.capture_reduction.enable = True
+        self.config.advanced_settings.runtime.capture_reduction.relative_tolerance = 1e-2
+        self.run_stage()
+        index = RawOutputIndex.load(self.workspace.raw_path)
+        parser_steps = TransientOutputParser(self.workspace.raw_path).dataframe.index
+        self.assertEqual(index.steps, parser_steps[-1] + 1)
+        # Steps are counted by scan of the file without index
+        os.remove(index.index_path)
+        self.assertEqual(count_raw_output_steps(self.workspace.raw_path), index.steps)
+        # The last kept line follows skipped steps
+        step = int(parser_steps[-1])
+        lines = index.read_steps(step - 100, step + 1)
+        returned_currents_lines = [line for line in lines if TransientOutputParser.find_currents_line(line)]
+        self.assertEqual(returned_currents_lines[-1], self.currents_lines()[-1])
+        self.assertTrue(any(line.startswith(SKIPPED_STEPS_MARKER) for line in lines))
+
+    def test_stale_index_is_rebuilt(self):
+        self.run_stage()
+        stale_index = RawOutputIndex.load(self.workspace.raw_path)
+        with open(self.workspace.raw_path, 'a') as raw_file:
+            raw_file.write('APPENDED LINE\n')
+        self.assertIsNone(RawOutputIndex.load(self.workspace.raw_path))
+        index = RawOutputIndex.load_or_build(self.workspace.raw_path)
+        self.assertEqual(index.steps, stale_index.steps)
+        self.assertIsNotNone(RawOutputIndex.load(self.workspace.raw_path))
+
+    def test_builder_counts_file_bytes(self):
+        builder = RawOutputIndexBuilder('raw.txt', encoding='utf-8', newline_size=2)
+        builder.add_line('1.000000E+00 1.\n')
+        builder.add_line('RELATIVE UNITES: µ\n')
+        self.assertEqual(builder.offset, 17 + len('RELATIVE UNITES: µ'.encode('utf-8')) + 2)
+        self.assertEqual(builder.markers, [('relative_units', 1, 17)])
+
+    def test_cli_prints_steps(self):
+        self.run_stage()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_raw_steps_printing(self.config, ['10', '12'])
+        self.assertEqual(output.getvalue(), ''.join(self.currents_lines()[10:12]))
+
+
+if __name__ == '__main__':
+    unittest.main()
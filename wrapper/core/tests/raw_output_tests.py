@@ -0,0 +1,58 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pandas as pd
+
+from wrapper.core.data_management import TransientOutputParser
+from wrapper.core.raw_output import find_raw_output_path, open_raw_output, open_raw_output_for_writing
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+
+
+class RawOutputCompressionTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        super().setUp()
+
+    def run_stage(self, compression: str) -> pd.DataFrame:
+        self.config.advanced_settings.result.raw_output.compression = compression
+        runner = TreadaRunner(self.config, self.workspace.relative_time)
+        with redirect_stdout(io.StringIO()):
+            runner.run(StageData(name='light'), self.workspace.raw_path)
+        return TransientOutputParser(self.workspace.raw_path).dataframe
+
+    def test_compressed_output_is_parsed_transparently(self):
+        plain_df = self.run_stage('none')
+        plain_size = os.path.getsize(self.workspace.raw_path)
+        for compression, suffix in (('gzip', '.gz'), ('xz', '.xz')):
+            with self.subTest(compression=compression):
+                compressed_df = self.run_stage(compression)
+                compressed_path = find_raw_output_path(self.workspace.raw_path)
+                self.assertEqual(compressed_path, self.workspace.raw_path + suffix)
+                # Plain file of the previous run is removed
+                self.assertFalse(os.path.exists(self.workspace.raw_path))
+                self.assertLess(os.path.getsize(compressed_path) * 2, plain_size)
+                pd.testing.assert_frame_equal(compressed_df, plain_df)
+
+    def test_stale_variants_are_removed(self):
+        raw_path = self.workspace.raw_path
+        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+        with open_raw_output_for_writing(raw_path, compression='xz') as raw_file:
+            raw_file.write('stale\n')
+        with open_raw_output_for_writing(raw_path, compression='gzip') as raw_file:
+            raw_file.write('fresh\n')
+        self.assertFalse(os.path.exists(raw_path + '.xz'))
+        with open_raw_output(raw_path) as raw_file:
+            self.assertEqual(raw_file.readlines(), ['fresh\n'])
+        with self.assertRaises(ValueError):
+            open_raw_output_for_writing(raw_path, compression='zip')
+
+
+if __name__ == '__main__':
+    unittest.main()
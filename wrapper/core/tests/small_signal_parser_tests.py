@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pandas as pd
+
+from wrapper.core.data_management import SmallSignalInfoOutputParser, VectorizedSmallSignalInfoOutputParser
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspace
+
+
+class VectorizedSmallSignalParserTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.raw_path = os.path.join(self.tmp_dir.name, 'treada_raw_output.txt')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def assert_parsers_equal(self):
+        parser = SmallSignalInfoOutputParser(self.raw_path)
+        vectorized_parser = VectorizedSmallSignalInfoOutputParser(self.raw_path)
+        pd.testing.assert_frame_equal(vectorized_parser.get_prepared_dataframe(), parser.get_prepared_dataframe(),
+                                      check_exact=True)
+        self.assertEqual(vectorized_parser.header_data, parser.header_data)
+        return vectorized_parser.get_prepared_dataframe()
+
+    def test_replay_output(self):
+        workspace = SyntheticWorkspace(self.tmp_dir.name, size=5000)
+        workspace.generate_small_signal_output(self.raw_path)
+        dataframe = self.assert_parsers_equal()
+        self.assertEqual(dataframe.shape, (5000, 9))
+
+    def test_irregular_output(self):
+        # Repeated table, table with irregular row and the last table without ending empty line
+        with open(self.raw_path, 'w') as raw_file:
+            raw_file.write('DIFFERENTIAL OUTPUT RESISTANCE =  1.000000E+03\n'
+                           'CDOM-DOMAIN CAPACITANCE =  2.000000E-12\n'
+                           'FREQUENCY        S11                      S12\n'
+                           '1.000000E-03  1.0E+00  2.0E+00  3.0E+00  4.0E+00\n'
+                           '2.000000E-03  1.1E+00  2.1E+00  3.1E+00  4.1E+00\n'
+                           '\n'
+                           'FREQUENCY        S21                      S22\n'
+                           'PRESS ENTER\n'
+                           '1.000000E-03  5.0E+00  6.0E+00  7.0E+00  8.0E+00\n'
+                           '2.000000E-03  5.1E+00  6.1E+00   7.1E+00  8.1E+00  9.1E+00\n'
+                           '\n'
+                           'FREQUENCY        S11                      S12\n'
+                           '3.000000E-03  1.2E+00  2.2E+00  3.2E+00  4.2E+00\n'
+                           '4.000000E-03  1.3E+00  2.3E+00  3.3E+00  4.3E+00\n'
+                           '\n'
+                           'FREQUENCY        Y21                      Y22\n'
+                           '3.000000E-03  -1.0E+00  -2.0E+00  -3.0E+00  -4.0E+00\n'
+                           '4.000000E-03  -1.1E+00  -2.1E+00  -3.1E+00  -4.1E+00\n')
+        dataframe = self.assert_parsers_equal()
+        self.assertEqual(dataframe['S12.real'].tolist(), [3.2, 3.3])
+        self.assertEqual(dataframe['S22.real'].tolist(), [7., 7.1])
+
+    def test_output_without_tables(self):
+        with open(self.raw_path, 'w') as raw_file:
+            raw_file.write('DIFFERENTIAL OUTPUT RESISTANCE =  1.000000E+03\n')
+        for parser_class in (SmallSignalInfoOutputParser, VectorizedSmallSignalInfoOutputParser):
+            with self.subTest(parser_class=parser_class.__name__):
+                with self.assertRaises(ValueError):
+                    parser_class(self.raw_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
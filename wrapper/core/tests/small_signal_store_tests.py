@@ -0,0 +1,100 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.data_management import SmallSignalResultBuilder, small_signal_cols
+from wrapper.core.small_signal_store import SmallSignalResultStore
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+
+
+STAGE_NAME = 'capacity_info'
+
+
+def build_dataframe(frequencies, shift=0.) -> pd.DataFrame:
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    return pd.DataFrame({small_signal_cols.frequency: frequencies,
+                         'Y22.real': frequencies * 2 + shift,
+                         'Y22.img': -frequencies + shift})
+
+
+class SmallSignalResultStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.result_path = os.path.join(self.tmp_dir.name, 'result', 'res_capacity_info.txt')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_upsert_by_frequency(self):
+        store = SmallSignalResultStore.open(self.result_path)
+        self.assertEqual(store.upsert(build_dataframe([3., 1.])), 2)
+        self.assertEqual(store.upsert(build_dataframe([2., 3.], shift=10.), skip_existing=True), 1)
+        self.assertEqual(store.upsert(build_dataframe([1.], shift=20.)), 1)
+        expected_df = pd.concat([build_dataframe([1.], shift=20.), build_dataframe([2.], shift=10.),
+                                 build_dataframe([3.])], ignore_index=True)
+        pd.testing.assert_frame_equal(store.to_dataframe(), expected_df)
+        # Result file is written on export only
+        self.assertFalse(os.path.exists(self.result_path))
+        store.export()
+        pd.testing.assert_frame_equal(pd.read_csv(self.result_path, sep=r'\s+'), expected_df)
+
+    def test_appended_rows_are_loaded(self):
+        store = SmallSignalResultStore.open(self.result_path)
+        store.upsert(build_dataframe([1., 2.]))
+        other_store = SmallSignalResultStore(self.result_path)
+        other_store.upsert(build_dataframe([2., 4.], shift=1.))
+        reopened_store = SmallSignalResultStore.open(self.result_path)
+        self.assertIs(reopened_store, store)
+        pd.testing.assert_frame_equal(store.to_dataframe(), other_store.to_dataframe())
+        self.assertTrue(store.has(4.))
+        other_store.reset(store.columns)
+        self.assertEqual(len(SmallSignalResultStore.open(self.result_path).to_dataframe()), 0)
+
+    def test_different_cols(self):
+        store = SmallSignalResultStore.open(self.result_path)
+        store.upsert(build_dataframe([1.]))
+        with self.assertRaises(ValueError):
+            store.upsert(build_dataframe([2.]).rename(columns={'Y22.img': 'Y21.img'}))
+
+
+class SmallSignalResultBuilderTests(SyntheticWorkspaceTestCase):
+    workspace_size = 10
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.result_paths = self.workspace.config.paths.result
+
+    def build_result(self, frequencies_number: int, is_repeated_stage: bool) -> SmallSignalResultBuilder:
+        self.workspace.size = frequencies_number
+        self.workspace.generate_small_signal_output(self.result_paths.temporary.raw)
+        with redirect_stdout(io.StringIO()):
+            return SmallSignalResultBuilder(self.result_paths, stage_name=STAGE_NAME,
+                                            is_repeated_stage=is_repeated_stage)
+
+    def test_repeated_stage_skips_computed_frequencies(self):
+        first_builder = self.build_result(10, is_repeated_stage=False)
+        first_builder.export()
+        first_result_df = pd.read_csv(first_builder.result_path, sep=r'\s+')
+        # Grid of 19 frequencies contains the grid of 10 frequencies
+        repeated_builder = self.build_result(19, is_repeated_stage=True)
+        self.assertEqual(len(repeated_builder.dataframe), 19)
+        self.assertTrue(repeated_builder.dataframe[small_signal_cols.frequency].is_monotonic_increasing)
+        stored_df = repeated_builder.dataframe.iloc[::2].reset_index(drop=True)
+        pd.testing.assert_frame_equal(stored_df, first_builder.dataframe)
+        # Result file is not rewritten on repeated stage
+        pd.testing.assert_frame_equal(pd.read_csv(first_builder.result_path, sep=r'\s+'), first_result_df)
+        repeated_builder.export()
+        self.assertEqual(len(pd.read_csv(first_builder.result_path, sep=r'\s+')), 19)
+        # Not repeated stage replaces stored results
+        self.assertEqual(len(self.build_result(5, is_repeated_stage=False).dataframe), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
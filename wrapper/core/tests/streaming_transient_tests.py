@@ -0,0 +1,114 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.data_management import TransientResultBuilder, TransientResultDataCollector, transient_cols
+from wrapper.core.streaming_transient import (
+    StreamingTransientResultBuilder, StreamingTransientResultDataCollector, TextTableChunkWriter, float_width_classes
+)
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase
+
+
+class StreamingTransientTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        super().setUp()
+
+    def tearDown(self) -> None:
+        # Custom col name is set globally
+        transient_cols.__dict__.pop('custom', None)
+        super().tearDown()
+
+    def analyse(self, streaming: bool, treada_state: dict = None, prev_stage_last_current=None):
+        """
+        :return: result file text and transient results
+        """
+        result_settings = self.config.advanced_settings.result
+        collector_kwargs = dict(mtut_file_path=self.config.paths.treada_core.mtut,
+                                result_paths=self.config.paths.result,
+                                relative_time=self.workspace.relative_time,
+                                all_currents_columns=result_settings.currents_columns)
+        if streaming:
+            result_collector = StreamingTransientResultDataCollector(chunk_size=777, **collector_kwargs)
+            result_builder_class = StreamingTransientResultBuilder
+        else:
+            result_collector = TransientResultDataCollector(**collector_kwargs)
+            result_builder_class = TransientResultBuilder
+        if treada_state:
+            result_collector.treada_state = treada_state
+        transient_settings = self.config.advanced_settings.transient
+        result_collector.transient.set_window_size_denominator(transient_settings.window_size_denominator)
+        result_collector.transient.set_window_size(transient_settings.window_size)
+        result_collector.transient.set_criteria_calculating_df_slice(transient_settings.criteria_calculating_df_slice)
+        with redirect_stdout(io.StringIO()):
+            result_collector.prepare_result_data(StageData(name='light'), prev_stage_last_current,
+                                                 result_settings.dataframe.custom)
+            result_builder = result_builder_class(result_collector, result_paths=self.config.paths.result,
+                                                  result_settings=result_settings, stage_name='light')
+        with open(result_builder.result_path) as result_file:
+            result_text = result_file.read()
+        transient = result_collector.transient
+        return result_text, (transient.time, transient.corrected_time, transient.corrected_density,
+                             result_collector.last_mean_time, result_collector.last_mean_current_density,
+                             result_collector.ww_data_indexes)
+
+    def assert_streaming_result_is_identical(self, **kwargs):
+        in_memory_text, in_memory_transient = self.analyse(streaming=False, **kwargs)
+        streaming_text, streaming_transient = self.analyse(streaming=True, **kwargs)
+        self.assertEqual(streaming_text, in_memory_text)
+        self.assertEqual(streaming_transient, in_memory_transient)
+        # Spilled result cols are removed
+        self.assertEqual(os.listdir(os.path.dirname(self.workspace.raw_path)), ['treada_raw_output.txt'])
+
+    def test_first_stage_result(self):
+        self.workspace.generate_raw_output()
+        self.assert_streaming_result_is_identical()
+
+    def test_all_columns_custom_col_and_window_denominator(self):
+        self.workspace.generate_raw_output()
+        result_settings = self.config.advanced_settings.result
+        result_settings.currents_columns = True
+        result_settings.dataframe.custom = {'name': 'U', 'multiplier': 50}
+        self.config.advanced_settings.transient.window_size_denominator = 37
+        self.assert_streaming_result_is_identical()
+
+    def test_previous_stage_current_is_prepended(self):
+        self.workspace.generate_raw_output()
+        self.assert_streaming_result_is_identical(treada_state={'jpush': '0', 'stage': 2.},
+                                                  prev_stage_last_current=-1.5e-3)
+
+    def test_capture_reduction_steps(self):
+        self.config.advanced_settings.runtime.capture_reduction.enable = True
+        self.config.advanced_settings.runtime.capture_reduction.relative_tolerance = 1e-2
+        # Window size counts skipped steps too
+        self.config.advanced_settings.transient.window_size_denominator = 37
+        runner = TreadaRunner(self.config, self.workspace.relative_time)
+        with redirect_stdout(io.StringIO()):
+            runner.run(StageData(name='light'), self.workspace.raw_path)
+        self.assert_streaming_result_is_identical()
+
+    def test_chunked_table_is_equal_to_whole_table(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(300, 2)) * 10. ** rng.integers(-120, 120, size=(300, 2))
+        values[rng.integers(0, 300, 5), 0] = np.nan
+        values[7, 1] = -0.
+        df = pd.DataFrame(values, columns=['a', 'b'])
+        width_classes = {col_name: float_width_classes(df[col_name].values) for col_name in df.columns}
+        writer = TextTableChunkWriter(width_classes)
+        output = io.StringIO()
+        for chunk_start in range(0, len(df), 64):
+            writer.write(output, df.iloc[chunk_start:chunk_start + 64])
+        self.assertEqual(output.getvalue(), df.to_string(index=False, float_format='%.6e'))
+
+
+if __name__ == '__main__':
+    unittest.main()
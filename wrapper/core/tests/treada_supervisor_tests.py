@@ -0,0 +1,123 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from contextlib import redirect_stdout
+
+from dacite import from_dict
+
+from wrapper.config.config_build import Config
+from wrapper.core.treada_io_handling import StdoutCapturer
+from wrapper.core.treada_supervisor import TreadaSupervisor
+
+
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+# Stand-in of Treada executable: prints current lines and floods stderr (more than a pipe buffer)
+STAND_IN_SCRIPT = textwrap.dedent('''
+    import sys
+    lines_number = int(sys.argv[1])
+    infinite = len(sys.argv) > 2
+    step = 0
+    while infinite or step < lines_number:
+        current = 1e-3 * (1 + 1 / (step + 1))
+        print(' '.join([f'{current:.6E}'] + [f'{step + 1}.'] + [f'{0.:.6E}'] * 10), flush=True)
+        sys.stderr.write('solver diagnostic message ' * 40 + '\\n')
+        step += 1
+''')
+
+# Stand-in of Treada executable with Windows line endings and a not UTF-8 byte
+CRLF_STAND_IN_SCRIPT = textwrap.dedent('''
+    import sys
+    for step in range(3):
+        line = ' '.join([f'{1e-3:.6E}'] + [f'{step + 1}.'] + [f'{0.:.6E}'] * 10)
+        sys.stdout.buffer.write(line.encode() + b'\\r\\n')
+    sys.stdout.buffer.write(b'STEP \\xff\\r\\n')
+''')
+
+
+class TreadaSupervisorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        mtut_path = os.path.join(self.tmp_dir.name, 'MTUT')
+        with open(mtut_path, 'w') as mtut_file:
+            mtut_file.write('TSTEP   1.E-3\nILUMEN  0\nCKLKRS  1.\n')
+        self.stand_in_path = os.path.join(self.tmp_dir.name, 'stand_in.py')
+        with open(self.stand_in_path, 'w') as stand_in_file:
+            stand_in_file.write(STAND_IN_SCRIPT)
+        with open(os.path.join(project_path, 'wrapper', 'config', 'config.json.example')) as config_file:
+            self.config = from_dict(data_class=Config, data=json.load(config_file))
+        self.config.paths.treada_core.mtut = mtut_path
+        self.config.options.auto_ending = False
+        self.config.options.preserve_distributions = False
+        self.config.advanced_settings.runtime.light_impulse.consider_fixed_time = False
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def create_capturer(self) -> StdoutCapturer:
+        return StdoutCapturer(process=None, config=self.config, relative_time=1.)
+
+    def test_stderr_flood_does_not_block(self):
+        lines_number = 2000
+        capturer = self.create_capturer()
+        output_path = os.path.join(self.tmp_dir.name, 'raw_output.txt')
+        supervisor = TreadaSupervisor()
+        supervisor.add_run(capturer, exe_path=sys.executable, exe_args=[self.stand_in_path, str(lines_number)],
+                           cwd=self.tmp_dir.name, output_file_path=output_path)
+        with redirect_stdout(io.StringIO()):
+            runs = supervisor.run()
+        self.assertEqual(runs[0].returncode, 0)
+        self.assertEqual(capturer.currents_str_counter, lines_number)
+        self.assertEqual(capturer.stderr_str_counter, lines_number)
+        with open(output_path) as output_file:
+            self.assertEqual(len(output_file.readlines()), lines_number)
+
+    def test_several_processes_in_one_loop(self):
+        capturers = [self.create_capturer() for _ in range(3)]
+        supervisor = TreadaSupervisor()
+        for lines_number, capturer in enumerate(capturers, start=1):
+            supervisor.add_run(capturer, exe_path=sys.executable,
+                               exe_args=[self.stand_in_path, str(lines_number * 100)], cwd=self.tmp_dir.name)
+        with redirect_stdout(io.StringIO()):
+            supervisor.run()
+        self.assertEqual([capturer.currents_str_counter for capturer in capturers], [100, 200, 300])
+
+    def test_stopped_capturer_terminates_process(self):
+        capturer = self.create_capturer()
+        capturer.num_of_str = 50
+        supervisor = TreadaSupervisor(terminate_timeout=2.)
+        supervisor.add_run(capturer, exe_path=sys.executable, exe_args=[self.stand_in_path, '0', 'infinite'],
+                           cwd=self.tmp_dir.name)
+        with redirect_stdout(io.StringIO()):
+            runs = supervisor.run()
+        self.assertEqual(capturer.str_counter, 50)
+        self.assertIsNotNone(runs[0].returncode)
+
+    def test_crlf_output_is_normalized(self):
+        stand_in_path = os.path.join(self.tmp_dir.name, 'crlf_stand_in.py')
+        with open(stand_in_path, 'w') as stand_in_file:
+            stand_in_file.write(CRLF_STAND_IN_SCRIPT)
+        capturer = self.create_capturer()
+        output_path = os.path.join(self.tmp_dir.name, 'raw_output.txt')
+        supervisor = TreadaSupervisor()
+        supervisor.add_run(capturer, exe_path=sys.executable, exe_args=[stand_in_path],
+                           cwd=self.tmp_dir.name, output_file_path=output_path)
+        console_output = io.StringIO()
+        with redirect_stdout(console_output):
+            supervisor.run()
+        self.assertNotIn('\r', console_output.getvalue())
+        self.assertEqual(capturer.currents_str_counter, 3)
+        with open(output_path, 'rb') as output_file:
+            raw_lines = output_file.read().split(b'\n')
+        self.assertEqual(len(raw_lines), 5)
+        self.assertTrue(all(not line.endswith(b'\r') for line in raw_lines))
+        # Not UTF-8 byte is replaced instead of dropping the line
+        self.assertEqual(raw_lines[3], 'STEP \ufffd'.encode())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import io
+import json
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from dacite import from_dict
+
+from wrapper.config.config_build import Config
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.core.watchdog import StageLimits, TreadaStallError, watchdog_metrics
+from wrapper.launch.scenarios.scenario_build import StageData
+
+
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+# Stand-in of Treada executable: prints some current lines and then hangs or dies depending on its mode file
+STAND_IN_SCRIPT = textwrap.dedent(f'''\
+    #!{sys.executable}
+    import os
+    import sys
+    import time
+    mode_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mode')
+    with open(mode_path) as mode_file:
+        modes = mode_file.read().split()
+    # Each launch consumes one mode
+    with open(mode_path, 'w') as mode_file:
+        mode_file.write(' '.join(modes[1:] or modes[-1:]))
+    for step in range(20):
+        print(' '.join([f'{{1e-3:.6E}}'] + [f'{{step + 1}}.'] + [f'{{0.:.6E}}'] * 10), flush=True)
+    if modes[0] == 'hang':
+        time.sleep(60)
+    elif modes[0] == 'die':
+        sys.exit(3)
+''')
+
+
+class WatchdogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        mtut_path = os.path.join(self.tmp_dir.name, 'MTUT')
+        with open(mtut_path, 'w') as mtut_file:
+            mtut_file.write('TIME    1.\nTSTEP   1.E-3\nILUMEN  0\nCKLKRS  1.\n')
+        self.stand_in_path = os.path.join(self.tmp_dir.name, 'stand_in.py')
+        with open(self.stand_in_path, 'w') as stand_in_file:
+            stand_in_file.write(STAND_IN_SCRIPT)
+        os.chmod(self.stand_in_path, os.stat(self.stand_in_path).st_mode | stat.S_IEXEC)
+        with open(os.path.join(project_path, 'wrapper', 'config', 'config.json.example')) as config_file:
+            self.config = from_dict(data_class=Config, data=json.load(config_file))
+        self.config.paths.treada_core.mtut = mtut_path
+        self.config.paths.treada_core.exe = self.stand_in_path
+        self.config.options.auto_ending = False
+        self.config.options.preserve_distributions = False
+        self.config.advanced_settings.runtime.light_impulse.consider_fixed_time = False
+        watchdog_settings = self.config.advanced_settings.runtime.watchdog
+        watchdog_settings.enable = True
+        watchdog_settings.inactivity_timeout_s = 0.5
+        watchdog_settings.max_retries = 1
+        watchdog_metrics.reset()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def set_modes(self, *modes: str):
+        with open(os.path.join(self.tmp_dir.name, 'mode'), 'w') as mode_file:
+            mode_file.write(' '.join(modes))
+
+    def run_stage(self):
+        runner = TreadaRunner(self.config, relative_time=1.)
+        with redirect_stdout(io.StringIO()):
+            runner.run(StageData(name='dark'))
+        return runner
+
+    def test_stage_limits_override(self):
+        self.config.advanced_settings.runtime.watchdog.for_stages = {'light': {'wall_clock_limit_s': 10.}}
+        limits = StageLimits.from_settings(self.config.advanced_settings.runtime.watchdog, 'light')
+        self.assertEqual(limits, StageLimits(inactivity_timeout_s=0.5, wall_clock_limit_s=10.))
+        self.assertIsNotNone(limits.check(start_time=0., last_output_time=0., now=1.))
+        self.assertIsNone(limits.check(start_time=0., last_output_time=0.8, now=1.))
+
+    def test_hang_is_retried(self):
+        self.set_modes('hang', 'ok')
+        start_time = time.monotonic()
+        runner = self.run_stage()
+        self.assertLess(time.monotonic() - start_time, 30)
+        self.assertIsNone(runner.capturer.failure_reason)
+        self.assertEqual(runner.capturer.str_counter, 20)
+        self.assertEqual((watchdog_metrics.stalls, watchdog_metrics.retries), (1, 1))
+
+    def test_died_process_raises_after_retries(self):
+        self.set_modes('die')
+        with self.assertRaises(TreadaStallError) as error_context:
+            self.run_stage()
+        self.assertEqual(error_context.exception.attempts, 2)
+        self.assertEqual((watchdog_metrics.deaths, watchdog_metrics.retries), (2, 1))
+
+    def test_async_supervisor_kills_stalled_process(self):
+        self.config.advanced_settings.runtime.process.async_supervisor = True
+        self.config.advanced_settings.runtime.watchdog.max_retries = 0
+        self.set_modes('hang')
+        start_time = time.monotonic()
+        with self.assertRaises(TreadaStallError):
+            self.run_stage()
+        self.assertLess(time.monotonic() - start_time, 30)
+        self.assertEqual(watchdog_metrics.stalls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,31 @@
 import os
 import sys
 import subprocess
+import threading
 import time
 import shutil
-from typing import Union
+from collections import deque
+from typing import Union, List
+
+import numpy as np
+from colorama import Fore, Style
 
 from wrapper.config.config_build import Config
-from wrapper.core.ending_conditions import retrieve_current_value
+from wrapper.core.ending_conditions import split_currents_line
 from wrapper.core import ending_conditions as ec
-from wrapper.core.data_management import TransientOutputParser, MtutManager
+from wrapper.core.capture_reduction import SwingDoorReducer
+from wrapper.core.data_management import TransientOutputParser, MtutManager, CurrentsCapture
+from wrapper.core.dump_schedule import DumpSchedule
+from wrapper.core.live_currents import live_currents
+from wrapper.core.progress_metrics import progress_metrics
+from wrapper.core.raw_output import open_raw_output_for_writing, raw_output_file_path
+from wrapper.core.raw_output_index import RawOutputIndexBuilder
+from wrapper.core.treada_supervisor import TreadaSupervisor
+from wrapper.core.watchdog import (
+    StageLimits, ProcessWatchdog, TreadaStallError, watchdog_metrics, process_group_kwargs
+)
 from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tracing import tracer, traced
 
 
 def main():
@@ -25,45 +41,128 @@ class TreadaRunner:
     def __init__(self, config: Config, relative_time: float):
         self.config = config
         self.relative_time = relative_time
-        temp_range = None
+        dump_schedule = None
         if self.config.advanced_settings.runtime.distributions.enable_preserving_ranges:
             ranges = self.config.advanced_settings.runtime.distributions.preserving_ranges
-            temp_range = self.apply_ranged_temporaries_dumping(self.relative_time, ranges,
-                                                               self.config.paths.treada_core.mtut)
-        self.temp_range = temp_range
-        self.exec_process = self._exe_runner(exe_path=config.paths.treada_core.exe)
+            dump_schedule = self.apply_ranged_temporaries_dumping(self.relative_time, ranges,
+                                                                  self.config.paths.treada_core.mtut)
+        self.dump_schedule = dump_schedule
+        self.is_async_supervisor = config.advanced_settings.runtime.process.async_supervisor
+        self.watchdog_settings = config.advanced_settings.runtime.watchdog
+        self.exec_process = None
+        self.capturer = None
+        self.start_process()
+
+    def start_process(self):
+        """
+        Spawns Treada's process (if it is not spawned by TreadaSupervisor) and creates its stdout capturer.
+        """
+        if self.is_async_supervisor:
+            # Process will be spawned by TreadaSupervisor on run()
+            self.exec_process = None
+        else:
+            self.exec_process = self._exe_runner(exe_path=self.config.paths.treada_core.exe,
+                                                 new_process_group=self.watchdog_settings.enable)
         self.capturer = StdoutCapturer(process=self.exec_process,
-                                       config=config,
-                                       relative_time=relative_time,)
+                                       config=self.config,
+                                       relative_time=self.relative_time,)
 
     def run(self, stage_data: StageData, output_file_path='', is_show_stage_name=True):
         """
         Runs Treada's program working stage.
+        If watchdog is enabled, stalled or died process is killed and the stage is retried
+        up to max_retries times. TreadaStallError is raised if all attempts fail.
         :param output_file_path: path to raw Treada's program output file
         :param stage_data: Treada's working scenario stage data
         :param is_show_stage_name: Is show stage name in console
         """
+        with tracer.span('TreadaRunner.run', stage=stage_data.name):
+            self.run_with_retries(stage_data, output_file_path, is_show_stage_name)
+
+    def run_with_retries(self, stage_data: StageData, output_file_path='', is_show_stage_name=True):
+        if not self.watchdog_settings.enable:
+            self.run_attempt(stage_data, output_file_path, is_show_stage_name)
+            return
+        limits = StageLimits.from_settings(self.watchdog_settings, stage_data.name)
+        attempts_number = 1 + self.watchdog_settings.max_retries
+        failure_reason = None
+        for attempt in range(1, attempts_number + 1):
+            if attempt > 1:
+                watchdog_metrics.retries += 1
+                print(f'{Fore.YELLOW}Retry {attempt - 1}/{self.watchdog_settings.max_retries} '
+                      f'of stage "{stage_data.name}".{Style.RESET_ALL}')
+                self.start_process()
+            self.capturer.limits = limits
+            start_time = time.monotonic()
+            self.run_attempt(stage_data, output_file_path, is_show_stage_name)
+            failure_reason = self.capturer.failure_reason
+            if failure_reason is None:
+                return
+            watchdog_metrics.record_failure(is_stall=self.capturer.is_stalled,
+                                            time_lost_s=time.monotonic() - start_time)
+            print(f'{Fore.RED}Stage "{stage_data.name}" failed: {failure_reason}{Style.RESET_ALL}')
+        raise TreadaStallError(failure_reason, attempts_number)
+
+    def run_attempt(self, stage_data: StageData, output_file_path='', is_show_stage_name=True):
         self.capturer.set_stage_data(stage_data, is_show_stage_name)
-        if output_file_path:
-            self.capturer.stream_management(self.temp_range, path_to_output=output_file_path)
-        else:
-            self.capturer.stream_management(self.temp_range)
+        progress_metrics.start_stage(stage_data.name,
+                                     timestep_constant=self.capturer.timestep_constant,
+                                     start_steps=self.capturer.currents_str_counter,
+                                     target_time_ps=self.capturer.get_fixed_impulse_time())
+        live_currents.start_stage()
+        try:
+            if self.is_async_supervisor:
+                self.supervised_run(output_file_path)
+            elif output_file_path:
+                self.capturer.stream_management(self.dump_schedule, path_to_output=output_file_path)
+            else:
+                self.capturer.stream_management(self.dump_schedule)
+        finally:
+            progress_metrics.finish_stage()
+
+    def supervised_run(self, output_file_path=''):
+        """
+        Runs Treada's program working stage by asyncio based TreadaSupervisor,
+        which drains process stdout and stderr concurrently.
+        :param output_file_path: path to raw Treada's program output file
+        """
+        path_to_output = self.capturer.prepare_stream(self.dump_schedule, output_file_path)
+        exe_path = self.config.paths.treada_core.exe
+        exe_command = build_exe_command(exe_path)
+        supervisor = TreadaSupervisor()
+        supervisor.add_run(self.capturer, exe_path=exe_command[0], exe_args=exe_command[1:],
+                           cwd=os.path.split(exe_path)[0] or None, output_file_path=path_to_output)
+        start_time = time.time()
+        supervisor.run()
+        self.capturer.print_io_loop_summary(time.time() - start_time)
 
     @staticmethod
-    def _exe_runner(exe_path: str) -> subprocess.Popen:
+    def _exe_runner(exe_path: str, new_process_group=False) -> subprocess.Popen:
         """
         Runs *.exe and returns itself like subprocess.Popen object.
 
         :param exe_path: Path to the executable program file
+        :param new_process_group: Start process in its own group to be able to kill the whole process tree
         :return: subprocess.Popen
         """
+        popen_kwargs = process_group_kwargs() if new_process_group else {}
         try:
             working_directory_path = os.path.split(exe_path)[0]
-            return subprocess.Popen(exe_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                    cwd=working_directory_path, encoding='utf-8')
+            return subprocess.Popen(build_exe_command(exe_path),
+                                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    cwd=working_directory_path, encoding='utf-8', **popen_kwargs)
         except FileNotFoundError:
             print('Executable file not found, Path:', exe_path)
 
+    def get_captured_currents(self) -> Union[np.ndarray, None]:
+        """
+        Can be used only after run() function.
+        :return: structured array of all currents lines fields or None if capturing is disabled
+        """
+        if self.capturer.currents_capture is None:
+            return None
+        return self.capturer.currents_capture.get_array()
+
     def get_last_step_current(self) -> Union[float, None]:
         """
         Can be used only after run() function.
@@ -75,36 +174,41 @@ class TreadaRunner:
 
     @classmethod
     def apply_ranged_temporaries_dumping(cls, rel_time: float, ranges: dict,
-                                         mtut_file_path: str) -> Union[dict, None]:
+                                         mtut_file_path: str) -> Union[DumpSchedule, None]:
         """
         Calculate and set variable TIME in MTUT file, which responsible for period of dumping temporary results to
-        hard disk. That performs in accordance with set time range from config.json
+        hard disk. That performs in accordance with set dump schedule from config.json
         :param rel_time: previously calculated relative time
-        :param ranges: time ranges from config.json, where (start, stop, step) are set in picoseconds
+        :param ranges: dump schedules of stages from config.json (see DumpSchedule), times are set in picoseconds
         :param mtut_file_path: path to MTUT
-        :returns: corrected temp_range, old TIME variable value
+        :returns: dump schedule of the current stage or None if it is not set
         """
         mtut_manager = MtutManager(mtut_file_path)
         mtut_manager.load_file()
         stage_number = mtut_manager.get_var('CKLKRS').rstrip('.')
-        temp_range = None
+        dump_schedule = None
         if stage_number in ranges.keys():
-            temp_range = ranges[stage_number]
-            if temp_range['start'] >= temp_range['stop']:
-                raise ValueError('"stop" must be higher than "start" in "time_ps_range"')
-            if temp_range['step'] > temp_range['stop']:
-                temp_range['step'] = temp_range['stop']
             cls.old_mtut_time = mtut_manager.get_var('TIME')
             operating_timestep = float(mtut_manager.get_var('TSTEP'))
             timestep_constant = calculate_timestep_constant(operating_timestep, rel_time)
-            mtut_time = str(int(temp_range['step'] / timestep_constant))
-            mtut_manager.set_var('TIME', mtut_time)
+            dump_schedule = DumpSchedule.from_config(ranges[stage_number], timestep_constant)
+            mtut_manager.set_var('TIME', str(dump_schedule.interval_steps))
         elif cls.old_mtut_time:
             mtut_manager.set_var('TIME', cls.old_mtut_time)
         else:
             cls.old_mtut_time = mtut_manager.get_var('TIME')
         mtut_manager.save_file()
-        return temp_range
+        return dump_schedule
+
+
+def build_exe_command(exe_path: str) -> list:
+    """
+    Returns command to run Treada's executable.
+    Python scripts (e.g. replay stand-in of Treada) are run by the current interpreter.
+    """
+    if exe_path.endswith('.py'):
+        return [sys.executable, exe_path]
+    return [exe_path]
 
 
 def calculate_timestep_constant(operating_time_step: float, relative_time: float) -> float:
@@ -114,8 +218,11 @@ def calculate_timestep_constant(operating_time_step: float, relative_time: float
 
 
 class StdoutCapturer:
-    def __init__(self, process: subprocess.Popen, config: Config, relative_time: float):
-        # Running of the executable file
+    # Number of Enter button commands which are sent to Treada's stdin on "capacity_info" stage
+    automatic_input_lines_number = 100
+
+    def __init__(self, process: Union[subprocess.Popen, None], config: Config, relative_time: float):
+        # Running of the executable file (can be set later by TreadaSupervisor)
         self.process = process
         # Init auto ending prerequisites
         self.is_auto_ending = config.options.auto_ending
@@ -143,7 +250,7 @@ class StdoutCapturer:
             self.distribution_initial_path = os.path.split(config.paths.treada_core.exe)[0]
             self.distribution_destination_path = config.paths.result.temporary.distributions
             self.is_distribution_range_enabled = config.advanced_settings.runtime.distributions.enable_preserving_ranges
-            self.distribution_range = None
+            self.dump_schedule: Union[DumpSchedule, None] = None
         else:
             self.is_distribution_range_enabled = None
 
@@ -184,42 +291,82 @@ class StdoutCapturer:
             # In case if stage is not first (Because the last value from previous stage preserves on such stages' dfs)
             self.currents_str_counter = 1
         self.last_step_string = None
+        self.raw_output_settings = config.advanced_settings.result.raw_output
+        # Step index of written raw output is built if enabled (created on output file opening)
+        self.output_index_builder: Union[RawOutputIndexBuilder, None] = None
+        # Source current of the last line (None if it is not a currents line)
+        self.line_current_value: Union[float, None] = None
+        # Currents lines written to raw output file are reduced on plateaus if enabled
+        self.capture_reducer = self.create_capture_reducer(config)
+        # All numeric fields of currents lines are captured to structured array if enabled.
+        # Captured array does not replace reduced raw output, because it must keep only written lines.
+        is_currents_capture = config.advanced_settings.result.currents_columns and self.capture_reducer is None
+        self.currents_capture = CurrentsCapture() if is_currents_capture else None
+        if len(sys.argv) > 2 and sys.argv[2].isnumeric():
+            self.num_of_str = int(sys.argv[2])
+        else:
+            self.num_of_str = None
 
-    def stream_management(self, temp_range: Union[dict, None], path_to_output=None):
+        # stderr variables:
+        self.stderr_str_counter = 0
+        self.stderr_tail = deque(maxlen=config.advanced_settings.runtime.process.stderr_tail_length)
+        self.stderr_lock = threading.Lock()
+
+        # Watchdog variables (limits are set by TreadaRunner if watchdog is enabled):
+        self.limits = StageLimits()
+        self.last_output_time = time.monotonic()
+        self.failure_reason: Union[str, None] = None
+        self.is_stalled = False
+
+    def stream_management(self, dump_schedule: Union[DumpSchedule, None], path_to_output=None):
         """
         Divides data from *.exe stdout to its own stdout and file with name *_output.txt.
         Ends by KeyboardInterrupt or ending condition satisfaction
         """
-        if self.is_distribution_range_enabled and temp_range:
-            temp_range['stop'] = temp_range['stop'] + self.timestep_constant
-            self.distribution_range = temp_range
-        # Strip slashes if only file name was used as a path (for solving of powershell issues)
-        if path_to_output:
-            if path_to_output.count(os.path.sep) <= 2:
-                path_to_output = path_to_output.strip(os.path.sep)
-                path_to_output = f'{path_to_output.split(".")[0]}_raw_output.txt'
+        path_to_output = self.prepare_stream(dump_schedule, path_to_output)
+        self.start_stderr_draining()
+        watchdog = self.start_watchdog()
         self.capacity_info_stage_automatic_input()
         if not path_to_output:
             self.__io_loop()
         else:
-            # Creates output dir if it does not exist
-            create_dir(path_to_output)
-            with open(path_to_output, "w") as output_file:
+            with self.open_output_file(path_to_output) as output_file:
                 self.__io_loop(output_file)
+                self.finish_output(output_file)
+            self.save_output_index()
+        if watchdog:
+            watchdog.stop()
+        if self.is_process_ended_itself():
+            try:
+                self.check_process_death(self.process.wait(timeout=5))
+            except subprocess.TimeoutExpired:
+                pass
 
         # Terminate main executable process
         self.process.terminate()
+        self.print_stderr_tail(self.process.poll())
 
-    def __io_loop(self, output_file=None):
-        if len(sys.argv) > 2:
-            num_of_str = int(sys.argv[2])
-        else:
-            num_of_str = None
+    def prepare_stream(self, dump_schedule: Union[DumpSchedule, None], path_to_output=None) -> Union[str, None]:
+        """
+        Prepares distributions dump schedule and the path to raw output file before I/O loop starts.
+        :return: corrected path to raw output file or None if output is not saved
+        """
+        if self.is_distribution_range_enabled:
+            self.dump_schedule = dump_schedule
+        # Strip slashes if only file name was used as a path (for solving of powershell issues)
+        if path_to_output:
+            if path_to_output.count(os.path.sep) <= 2:
+                path_to_output = path_to_output.strip(os.path.sep)
+                path_to_output = f'{path_to_output.split(".")[0]}_raw_output.txt'
+            # Creates output dir if it does not exist
+            create_dir(path_to_output)
+        return path_to_output or None
 
+    def __io_loop(self, output_file=None):
         start_time = time.time()
         while self.running_flag:
             try:
-                if num_of_str and num_of_str <= self.str_counter:
+                if self.is_lines_limit_reached():
                     break
                 try:
                     # Get line from process object
@@ -230,25 +377,158 @@ class StdoutCapturer:
                 if treada_output == '' and self.process.poll() is not None:
                     break
                 if treada_output:
-                    printable_output = treada_output.strip('\n')
-                    clean_output = treada_output.lstrip(' ')
-                    self.conditional_io_loop_features(clean_output)
-                    # Copy *.exe output to its own stdout
-                    print(printable_output + self.runtime_console_info)
-                    # Write *.exe output to file
-                    if output_file:
-                        output_file.write(clean_output)
-                    self.str_counter += 1
+                    self.handle_output_line(treada_output, output_file)
             except KeyboardInterrupt:
                 self.running_flag = False
 
         end_time = time.time()
-        execution_time = end_time - start_time
+        self.print_io_loop_summary(end_time - start_time)
+
+    def handle_output_line(self, treada_output: str, output_file=None):
+        """
+        Processes a single line of Treada's stdout. Used by synchronous I/O loop and by TreadaSupervisor.
+        :param treada_output: decoded line of Treada's stdout
+        :param output_file: opened raw output file or None
+        """
+        self.last_output_time = time.monotonic()
+        printable_output = treada_output.strip('\n')
+        clean_output = treada_output.lstrip(' ')
+        self.line_current_value = None
+        self.conditional_io_loop_features(clean_output)
+        # Copy *.exe output to its own stdout
+        print(printable_output + self.runtime_console_info + progress_metrics.status)
+        # Write *.exe output to file
+        if output_file:
+            if self.capture_reducer is None:
+                self.write_output(output_file, [clean_output])
+            else:
+                self.write_output(output_file, self.capture_reducer.push(clean_output, self.line_current_value))
+        self.str_counter += 1
+
+    def open_output_file(self, path_to_output: str):
+        """
+        Opens raw output file for writing through the streaming compressor set in config.
+        """
+        settings = self.raw_output_settings
+        output_file = open_raw_output_for_writing(path_to_output,
+                                                  compression=settings.compression,
+                                                  compression_level=settings.compression_level)
+        if settings.index:
+            file_path = raw_output_file_path(path_to_output, settings.compression)
+            self.output_index_builder = RawOutputIndexBuilder(file_path, interval=settings.index_interval,
+                                                              encoding=output_file.encoding)
+        return output_file
+
+    def write_output(self, output_file, lines: List[str]):
+        output_file.writelines(lines)
+        if self.output_index_builder is not None:
+            for line in lines:
+                self.output_index_builder.add_line(line)
+
+    def finish_output(self, output_file):
+        """
+        Writes the line held by capture reducer. Must be called before raw output file closing.
+        """
+        if self.capture_reducer is not None:
+            self.write_output(output_file, self.capture_reducer.flush())
+            print(f'Currents lines written: {self.capture_reducer.kept_steps} of {self.capture_reducer.steps}')
+
+    def save_output_index(self):
+        """
+        Saves step index of raw output. Must be called after raw output file closing.
+        """
+        if self.output_index_builder is not None:
+            self.output_index_builder.save()
+            self.output_index_builder = None
+
+    @staticmethod
+    def create_capture_reducer(config: Config) -> Union[SwingDoorReducer, None]:
+        settings = config.advanced_settings.runtime.capture_reduction
+        if not settings.enable:
+            return None
+        mtut_manager = MtutManager(config.paths.treada_core.mtut)
+        mtut_manager.load_file()
+        # Initial time steps must be kept, because time column is calculated with them by row positions.
+        # The extra line is the first one of operating time step, so reduction starts after the change of time step.
+        initial_steps_number = int(mtut_manager.get_var('NMBPZ0'))
+        return SwingDoorReducer(relative_tolerance=settings.relative_tolerance,
+                                absolute_tolerance=settings.absolute_tolerance,
+                                max_skipped_steps=settings.max_skipped_steps,
+                                warmup_steps=max(settings.warmup_steps, initial_steps_number + 2))
+
+    def handle_error_line(self, treada_error_output: str):
+        """
+        Keeps the tail of Treada's stderr to show it if the process fails.
+        """
+        with self.stderr_lock:
+            self.stderr_tail.append(treada_error_output.rstrip('\n'))
+            self.stderr_str_counter += 1
+
+    def start_stderr_draining(self):
+        """
+        Drains stderr of synchronously launched process in a daemon thread to avoid of pipe buffer overflow.
+        """
+        if self.process is None or self.process.stderr is None:
+            return
+
+        def drain():
+            try:
+                for line in self.process.stderr:
+                    self.handle_error_line(line)
+            except (ValueError, OSError, UnicodeDecodeError):
+                pass
+
+        threading.Thread(target=drain, name='treada-stderr-drain', daemon=True).start()
+
+    def start_watchdog(self) -> Union[ProcessWatchdog, None]:
+        if not self.limits.is_enabled():
+            return None
+        self.last_output_time = time.monotonic()
+        watchdog = ProcessWatchdog(pid=self.process.pid,
+                                   limits=self.limits,
+                                   last_output_time=lambda: self.last_output_time,
+                                   on_violation=self.mark_stalled)
+        watchdog.start()
+        return watchdog
+
+    def mark_stalled(self, reason: str):
+        self.failure_reason = reason
+        self.is_stalled = True
+
+    def is_process_ended_itself(self) -> bool:
+        """
+        Returns True if I/O loop ended because Treada's stdout was closed, not by the launcher.
+        """
+        return self.running_flag and self.failure_reason is None and not self.is_lines_limit_reached()
+
+    def check_process_death(self, returncode: Union[int, None]):
+        """
+        Marks the stage as failed if Treada's process ended itself with an error code.
+        """
+        if returncode not in (None, 0) and self.failure_reason is None:
+            self.failure_reason = f'Treada process died with code {returncode}'
+
+    def print_stderr_tail(self, returncode: Union[int, None]):
+        if self.stderr_tail and returncode not in (None, 0) and self.running_flag:
+            print(f'Treada process ended with code {returncode}. '
+                  f'Last lines of stderr ({self.stderr_str_counter} lines total):')
+            with self.stderr_lock:
+                for line in self.stderr_tail:
+                    print(line)
+
+    def is_lines_limit_reached(self) -> bool:
+        return bool(self.num_of_str and self.num_of_str <= self.str_counter)
+
+    def print_io_loop_summary(self, execution_time: float):
         print('Number of strings:', self.str_counter)
         print(f'Execution time in I/O loop:{execution_time:.2f}s')
 
     async def keyboard_catch(self):
-        pass
+        """
+        Handles Ctrl-C (cancellation of the supervising task) in TreadaSupervisor
+        the same way as KeyboardInterrupt is handled in the synchronous I/O loop.
+        """
+        self.running_flag = False
 
     def capacity_info_stage_automatic_input(self):
         """
@@ -257,7 +537,7 @@ class StdoutCapturer:
         :return:
         """
         if self.is_capacity_info_collecting and self.is_auto_ending:
-            for _ in range(100):
+            for _ in range(self.automatic_input_lines_number):
                 try:
                     self.process.stdin.write('\n')
                     self.process.stdin.flush()
@@ -280,7 +560,11 @@ class StdoutCapturer:
             self.transient_io_loop_features(clean_decoded_output)
 
     def transient_io_loop_features(self, clean_decoded_output):
-        current_value = retrieve_current_value(currents_string=clean_decoded_output)
+        currents_list = split_currents_line(clean_decoded_output)
+        current_value = float(currents_list[0]) if currents_list is not None else None
+        self.line_current_value = current_value
+        if self.currents_capture is not None and currents_list is not None:
+            self.currents_capture.append(currents_list)
         if current_value:
             self.is_currents_line = True
         else:
@@ -302,9 +586,14 @@ class StdoutCapturer:
                                                    self.ilumen)
         # Pure current lines' indexes counting
         if self.is_currents_line:
+            if live_currents.enabled:
+                live_currents.publish(self.currents_str_counter, current_transient_time, current_value)
             self.currents_str_counter += 1  # increment must be after all additional loop conditions
             # Preserve last step's string
             self.last_step_string = clean_decoded_output
+            if progress_metrics.enabled:
+                progress_metrics.update_stage(self.currents_str_counter, current_transient_time,
+                                              self.ending_condition if self.is_auto_ending else None)
 
     def capacity_io_loop_features(self, clean_decoded_output):
         pass
@@ -314,14 +603,13 @@ class StdoutCapturer:
         Preserve distributions of several values that contain in Treada's temporary files.
         :return:
         """
-        if self.is_distribution_range_enabled and self.distribution_range:
-            if not self.distribution_range['start'] <= transient_time <= self.distribution_range['stop']:
-                return
         # Find the beginning line of temporary results dumping info
         if not self.is_currents_line:
             if (TransientOutputParser.temporary_results_line_found(output_string) and
                not self.distribution_dumping_begins):
-                self.distribution_dumping_begins = True
+                # Only dumps nearest to the scheduled times are preserved
+                self.distribution_dumping_begins = (not (self.is_distribution_range_enabled and self.dump_schedule) or
+                                                    self.dump_schedule.is_requested(transient_time))
         if self.distribution_dumping_begins:
             # Check has dumping already ended
             if self.is_currents_line:
@@ -329,6 +617,7 @@ class StdoutCapturer:
                 print(f'{self.currents_str_counter=}')
                 self.copy_distribution_files()
 
+    @traced()
     def copy_distribution_files(self):
         """
         Preserve Treada's temporary files that are generated and rewritten
@@ -366,6 +655,16 @@ class StdoutCapturer:
         }
         return mtut_vars
 
+    def get_fixed_impulse_time(self) -> Union[float, None]:
+        """
+        :return: fixed impulse time in ps on which current stage will be stopped or None if it is not considered
+        """
+        if self.is_consider_fixed_light_time and self.ilumen:
+            return self.light_impulse_time_ps
+        if self.is_consider_fixed_dark_time and not self.ilumen:
+            return self.dark_impulse_time_ps
+        return None
+
     def calculate_current_transient_time(self) -> Union[float, None]:
         # TODO: Fix the wrong calc. of current transient time for the first stage cause the initial timestep is on that
         current_transient_time = self.currents_str_counter * self.timestep_constant
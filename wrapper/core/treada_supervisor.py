@@ -0,0 +1,178 @@
+"""
+Contains asyncio based supervisor of "Treada" processes.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import List, Union, Sequence, Any
+
+from wrapper.core.watchdog import kill_process_tree, process_group_kwargs
+
+
+@dataclass
+class SupervisedRun:
+    """
+    Describes one "Treada" process supervised by TreadaSupervisor.
+
+    Attributes:
+        capturer: StdoutCapturer object, which processes lines of the process output
+        exe_path: path to the executable program file
+        exe_args: additional command line arguments of the executable
+        cwd: working directory of the process (directory of exe_path if not set)
+        output_file_path: path to raw Treada's program output file (output is not saved if not set)
+        returncode: return code of the process (available after run)
+        execution_time: time from the process start to its termination in seconds
+    """
+    capturer: Any
+    exe_path: str
+    exe_args: Sequence[str] = field(default_factory=tuple)
+    cwd: Union[str, None] = None
+    output_file_path: Union[str, None] = None
+    returncode: Union[int, None] = None
+    execution_time: Union[float, None] = None
+
+
+class TreadaSupervisor:
+    """
+    Spawns "Treada" processes via asyncio and drains their stdout and stderr concurrently,
+    so a chatty solver can not fill the stderr pipe buffer and deadlock.
+    Several processes can be supervised from one event loop.
+    How to use:
+        1) Create an instance and add processes by add_run()
+        2) Call run(), which blocks until all processes end, their capturers stop or Ctrl-C is pressed
+    """
+
+    def __init__(self, terminate_timeout: float = 5.):
+        """
+        :param terminate_timeout: time in seconds to wait for process termination before it will be killed
+        """
+        self.runs: List[SupervisedRun] = []
+        self.terminate_timeout = terminate_timeout
+
+    def add_run(self, capturer, exe_path: str, exe_args: Sequence[str] = (), cwd: Union[str, None] = None,
+                output_file_path: Union[str, None] = None) -> SupervisedRun:
+        if cwd is None:
+            cwd = os.path.split(exe_path)[0] or None
+        supervised_run = SupervisedRun(capturer=capturer,
+                                       exe_path=exe_path,
+                                       exe_args=tuple(exe_args),
+                                       cwd=cwd,
+                                       output_file_path=output_file_path)
+        self.runs.append(supervised_run)
+        return supervised_run
+
+    def run(self) -> List[SupervisedRun]:
+        """
+        Runs all added processes in one event loop.
+        Ctrl-C stops all of them like KeyboardInterrupt stops the synchronous I/O loop.
+        """
+        try:
+            asyncio.run(self.supervise_all())
+        except KeyboardInterrupt:
+            # Processes are already terminated by the cancellation of supervising tasks
+            for supervised_run in self.runs:
+                supervised_run.capturer.running_flag = False
+        return self.runs
+
+    async def supervise_all(self):
+        await asyncio.gather(*(self.supervise(supervised_run) for supervised_run in self.runs))
+
+    async def supervise(self, supervised_run: SupervisedRun):
+        capturer = supervised_run.capturer
+        popen_kwargs = process_group_kwargs() if capturer.limits.is_enabled() else {}
+        try:
+            process = await asyncio.create_subprocess_exec(supervised_run.exe_path, *supervised_run.exe_args,
+                                                           stdin=asyncio.subprocess.PIPE,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE,
+                                                           cwd=supervised_run.cwd,
+                                                           **popen_kwargs)
+        except FileNotFoundError:
+            print('Executable file not found, Path:', supervised_run.exe_path)
+            return
+        capturer.process = process
+        start_time = time.time()
+        output_file = None
+        stderr_task = asyncio.ensure_future(self.drain_stderr(capturer, process.stderr))
+        try:
+            if supervised_run.output_file_path:
+                output_file = capturer.open_output_file(supervised_run.output_file_path)
+            await self.automatic_input(capturer, process)
+            await self.drain_stdout(capturer, process, output_file)
+            if capturer.is_process_ended_itself():
+                try:
+                    capturer.check_process_death(await asyncio.wait_for(process.wait(), self.terminate_timeout))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            await capturer.keyboard_catch()
+            raise
+        finally:
+            await self.terminate(process)
+            try:
+                await asyncio.wait_for(stderr_task, timeout=self.terminate_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                stderr_task.cancel()
+            if output_file:
+                capturer.finish_output(output_file)
+                output_file.close()
+                capturer.save_output_index()
+            supervised_run.returncode = process.returncode
+            supervised_run.execution_time = time.time() - start_time
+            capturer.print_stderr_tail(process.returncode)
+
+    @staticmethod
+    async def drain_stdout(capturer, process: asyncio.subprocess.Process, output_file=None):
+        """
+        Passes process stdout lines to the capturer.
+        Kills the process tree if the capturer's watchdog limits are exceeded.
+        """
+        start_time = capturer.last_output_time = time.monotonic()
+        while capturer.running_flag and not capturer.is_lines_limit_reached():
+            timeout = capturer.limits.time_to_deadline(start_time, capturer.last_output_time, time.monotonic())
+            try:
+                line = await asyncio.wait_for(process.stdout.readline(), timeout=timeout)
+            except asyncio.TimeoutError:
+                reason = capturer.limits.check(start_time, capturer.last_output_time, time.monotonic())
+                capturer.mark_stalled(reason or 'Watchdog limit exceeded')
+                kill_process_tree(process.pid)
+                break
+            if not line:
+                break
+            # Decoded like stdout of the process launched in text mode (with universal newlines)
+            treada_output = line.decode('utf-8', errors='replace').replace('\r\n', '\n')
+            capturer.handle_output_line(treada_output, output_file)
+
+    @staticmethod
+    async def drain_stderr(capturer, stderr: asyncio.StreamReader):
+        while True:
+            line = await stderr.readline()
+            if not line:
+                break
+            capturer.handle_error_line(line.decode('utf-8', errors='replace'))
+
+    @staticmethod
+    async def automatic_input(capturer, process: asyncio.subprocess.Process):
+        """
+        Asynchronous version of StdoutCapturer.capacity_info_stage_automatic_input().
+        """
+        if capturer.is_capacity_info_collecting and capturer.is_auto_ending:
+            for _ in range(capturer.automatic_input_lines_number):
+                try:
+                    process.stdin.write(b'\n')
+                    await process.stdin.drain()
+                except (OSError, ConnectionResetError):
+                    break
+
+    async def terminate(self, process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), timeout=self.terminate_timeout)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
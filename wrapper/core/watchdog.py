@@ -0,0 +1,160 @@
+"""
+Contains features to detect stalled or died "Treada" processes.
+"""
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Union, Callable
+
+
+class TreadaStallError(RuntimeError):
+    """
+    Raised when "Treada" process stalls or dies on every allowed attempt of a stage.
+    """
+    def __init__(self, reason: str, attempts: int):
+        self.reason = reason
+        self.attempts = attempts
+        super().__init__(f'{reason} (attempts: {attempts})')
+
+
+@dataclass
+class StageLimits:
+    """
+    Watchdog limits of a single stage. None value disables the limit.
+
+    Attributes:
+        inactivity_timeout_s: maximal time without any line in Treada's stdout
+        wall_clock_limit_s: maximal duration of the stage
+    """
+    inactivity_timeout_s: Union[float, None] = None
+    wall_clock_limit_s: Union[float, None] = None
+
+    @classmethod
+    def from_settings(cls, watchdog_settings, stage_name: str) -> 'StageLimits':
+        """
+        Creates limits from config.json watchdog settings. Limits from "for_stages" override common ones.
+        :param watchdog_settings: WatchdogSettings dataclass from config
+        :param stage_name: name of scenario stage
+        """
+        limits = cls(inactivity_timeout_s=watchdog_settings.inactivity_timeout_s,
+                     wall_clock_limit_s=watchdog_settings.wall_clock_limit_s)
+        stage_limits: dict = watchdog_settings.for_stages.get(stage_name, {})
+        for key, value in stage_limits.items():
+            if hasattr(limits, key):
+                setattr(limits, key, value)
+        return limits
+
+    def is_enabled(self) -> bool:
+        return bool(self.inactivity_timeout_s or self.wall_clock_limit_s)
+
+    def check(self, start_time: float, last_output_time: float, now: float) -> Union[str, None]:
+        """
+        Returns the reason of limits violation or None if limits are not exceeded.
+        """
+        if self.inactivity_timeout_s and now - last_output_time > self.inactivity_timeout_s:
+            return f'No output from Treada for {now - last_output_time:.0f}s'
+        if self.wall_clock_limit_s and now - start_time > self.wall_clock_limit_s:
+            return f'Stage wall-clock limit {self.wall_clock_limit_s:.0f}s exceeded'
+        return None
+
+    def time_to_deadline(self, start_time: float, last_output_time: float, now: float) -> Union[float, None]:
+        """
+        Returns time in seconds until the nearest limit expires or None if limits are disabled.
+        """
+        deadlines = []
+        if self.inactivity_timeout_s:
+            deadlines.append(last_output_time + self.inactivity_timeout_s)
+        if self.wall_clock_limit_s:
+            deadlines.append(start_time + self.wall_clock_limit_s)
+        if not deadlines:
+            return None
+        return max(min(deadlines) - now, 0.)
+
+
+@dataclass
+class WatchdogMetrics:
+    """
+    Accumulates watchdog events. The module-level object is reset by states machine on each state.
+    """
+    stalls: int = 0
+    deaths: int = 0
+    retries: int = 0
+    time_lost_s: float = 0.
+
+    def record_failure(self, is_stall: bool, time_lost_s: float):
+        if is_stall:
+            self.stalls += 1
+        else:
+            self.deaths += 1
+        self.time_lost_s += time_lost_s
+
+    def reset(self):
+        self.stalls = self.deaths = self.retries = 0
+        self.time_lost_s = 0.
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+watchdog_metrics = WatchdogMetrics()
+
+
+def process_group_kwargs() -> dict:
+    """
+    Returns keyword arguments for process creation, which allow to kill the whole process tree later.
+    """
+    if sys.platform == 'win32':
+        return {}
+    return {'start_new_session': True}
+
+
+def kill_process_tree(pid: int):
+    """
+    Kills the process with all its children.
+    On Windows uses taskkill, on POSIX kills the process group created with process_group_kwargs().
+    """
+    if sys.platform == 'win32':
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        if os.getpgid(pid) == pid:
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ProcessWatchdog(threading.Thread):
+    """
+    Watches the synchronously launched process in a daemon thread.
+    Kills the process tree if there is no output for too long or if the stage is too long.
+    After the kill the blocked readline() in the I/O loop returns and the loop ends.
+    """
+    def __init__(self, pid: int, limits: StageLimits, last_output_time: Callable[[], float],
+                 on_violation: Callable[[str], None]):
+        super().__init__(name='treada-watchdog', daemon=True)
+        self.pid = pid
+        self.limits = limits
+        self.last_output_time = last_output_time
+        self.on_violation = on_violation
+        self.start_time = time.monotonic()
+        self._stop_event = threading.Event()
+        timeouts = [limit for limit in (limits.inactivity_timeout_s, limits.wall_clock_limit_s) if limit]
+        self.poll_interval = min([1.] + [timeout / 10 for timeout in timeouts])
+
+    def run(self):
+        while not self._stop_event.wait(self.poll_interval):
+            reason = self.limits.check(self.start_time, self.last_output_time(), time.monotonic())
+            if reason:
+                self.on_violation(reason)
+                kill_process_tree(self.pid)
+                break
+
+    def stop(self):
+        self._stop_event.set()
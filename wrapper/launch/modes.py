@@ -6,11 +6,18 @@ from PySide6.QtWidgets import QApplication
 
 from wrapper.config.config_build import Config
 from wrapper.launch.scenarios import launch
+from wrapper.core.analysis_cache import analysis_cache
 from wrapper.core.data_management import MtutStageConfiger
+from wrapper.core.live_currents import live_currents
+from wrapper.core.progress_metrics import progress_metrics
+from wrapper.core.raw_output_index import run_raw_steps_printing
 from wrapper.misc.collections.fields_integral.fields_integral_calculation import run_fields_integral_finding
+from wrapper.misc.collections.fields_integral.fields_integral_sweep import run_fields_integral_sweep
 from wrapper.misc.collections.ww_data_collecting.collect_ww_data import run_ww_collecting
+from wrapper.misc.tracing import tracer
 from wrapper.states import states
 from wrapper.ui.console import quit_user_warning_dialogue, ConsoleUserInteractor
+from wrapper.ui.live_monitor import run_live_monitor
 from wrapper.ui.plotting import run_res_plotting
 from wrapper.ui.user_interactors import create_main_console_interactor
 
@@ -20,7 +27,10 @@ def launcher_mode_selection(config: Config):
         (): (treada_cli_interaction_loop, config),
         ('--plot-res', '-r'): (run_res_plotting, config),
         ('--plot-fields-integral', '-f'): (run_fields_integral_finding, config),
+        ('--fields-integral-sweep', '-F'): (run_fields_integral_sweep, config),
         ('--collect-distr', '-d'): (run_ww_collecting, config),
+        ('--monitor', '-m'): (run_live_monitor, config),
+        ('--raw-steps', '-s'): (run_raw_steps_printing, config),
     }
     available_commands = '\n'.join([' or short: '.join(command) for command in commands.keys()])
     commands.update({('--help', '-h'): (print, 'Available commands:', available_commands)})
@@ -50,10 +60,28 @@ def treada_main_cli(config: Config):
     if app is None:
         app = QApplication()
     mtut_stage_configer = MtutStageConfiger(config.paths.treada_core.mtut)
+    tracer.configure(enable=config.advanced_settings.tracing.enable)
+    memoization_settings = config.advanced_settings.result.memoization
+    analysis_cache.configure(enable=memoization_settings.enable,
+                             cache_dir=config.paths.result.cache,
+                             max_size_mb=memoization_settings.max_size_mb)
+    progress_settings = config.advanced_settings.runtime.progress
+    progress_metrics.configure(enable=progress_settings.enable,
+                               metrics_path=config.paths.result.metrics,
+                               update_interval_s=progress_settings.update_interval_s)
+    live_monitor_settings = config.advanced_settings.runtime.live_monitor
+    live_currents.configure(enable=live_monitor_settings.enable,
+                            name=live_monitor_settings.shared_memory_name,
+                            capacity=live_monitor_settings.capacity)
     states_machine = states.BaseStatesMachine(config, state_dataclass=states.BaseState)
-    plot_windows = states_machine.run(call_scenario_function=launch.call_active_scenario,
-                                      mtut_stage_configer=mtut_stage_configer,
-                                      config=config)
+    try:
+        plot_windows = states_machine.run(call_scenario_function=launch.call_active_scenario,
+                                          mtut_stage_configer=mtut_stage_configer,
+                                          config=config)
+    finally:
+        trace_path = tracer.save(config.paths.result.trace)
+        if trace_path:
+            print(f'Trace saved to: {trace_path}')
     for plot in chain.from_iterable(plot_windows):
         if plot:
             plot.show()
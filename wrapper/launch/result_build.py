@@ -1,67 +1,175 @@
+from dataclasses import asdict
 from typing import Union
 from logging import Logger
 
+import numpy as np
+import pandas as pd
+
 from wrapper.config.config_build import Config
+from wrapper.core.analysis_cache import analysis_cache
 from wrapper.core.data_management import (
-    TransientResultDataCollector, TransientResultBuilder, SmallSignalResultBuilder
+    MtutManager, TransientResultDataCollector, TransientResultBuilder, SmallSignalResultBuilder
 )
+from wrapper.core.lean_transient import LeanTransientResultDataCollector
+from wrapper.core.raw_output import find_raw_output_path
+from wrapper.core.small_signal_store import SmallSignalResultStore
+from wrapper.core.streaming_transient import StreamingTransientResultDataCollector, StreamingTransientResultBuilder
 from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tracing import PeakMemoryReport, tracer
 from wrapper.ui.plotting import TransientPlotBuilder, ImpedancePlotBuilder
 
 
+# MTUT vars which transient analysis depends on
+TRANSIENT_ANALYSIS_MTUT_VARS = ('TSTEP', 'TSTEPH', 'NMBPZ0', 'WIDTH', 'HY', 'CKLKRS', 'JPUSH')
+
+
+def transient_analysis_cache_key(config: Config, stage: StageData, prev_stage_last_current: Union[float, None],
+                                 relative_time: float, currents_array: Union[np.ndarray, None] = None
+                                 ) -> Union[str, None]:
+    """
+    :return: analysis cache key of transient analysis or None if the analysis is not memoized
+    """
+    result_settings = config.advanced_settings.result
+    # Result of streaming analysis is not kept in memory
+    if not analysis_cache.enabled or result_settings.streaming_analysis.enable:
+        return None
+    if currents_array is not None and currents_array.size:
+        input_digest = analysis_cache.arrays_digest(currents_array)
+    else:
+        input_digest = analysis_cache.file_digest(find_raw_output_path(config.paths.result.temporary.raw))
+    mtut_manager = MtutManager(config.paths.treada_core.mtut)
+    mtut_manager.load_file()
+    mtut_vars = {var_name: mtut_manager.get_var(var_name) for var_name in TRANSIENT_ANALYSIS_MTUT_VARS}
+    analysis_settings = {
+        'transient': asdict(config.advanced_settings.transient),
+        'currents_columns': result_settings.currents_columns,
+        'lean_collector': asdict(result_settings.lean_collector),
+        'custom': result_settings.dataframe.custom,
+        'skip_initial_time_step': stage.skip_initial_time_step,
+        'prev_stage_last_current': prev_stage_last_current,
+        'relative_time': relative_time,
+    }
+    return analysis_cache.key('transient_analysis', input_digest, mtut_vars, analysis_settings)
+
+
+def memoized_transient_result_collector(config: Config, stage: StageData, relative_time: float,
+                                        memoized_arrays: dict) -> TransientResultDataCollector:
+    result_collector = TransientResultDataCollector.from_memoized_arrays(memoized_arrays,
+                                                                         mtut_file_path=config.paths.treada_core.mtut,
+                                                                         result_paths=config.paths.result,
+                                                                         relative_time=relative_time)
+    # Sets custom col name
+    result_collector.get_custom_transient_col(config.advanced_settings.result.dataframe.custom)
+    result_collector.ww_data_indexes = result_collector.set_distributions_indexes(stage.name)
+    return result_collector
+
+
+def transient_result_collector_build(config: Config, relative_time: float,
+                                     currents_array: Union[np.ndarray, None] = None) -> tuple:
+    """
+    Selects transient analysis implementation by the result settings.
+    :return: result collector and its result builder class
+    """
+    result_settings = config.advanced_settings.result
+    collector_params = dict(mtut_file_path=config.paths.treada_core.mtut,
+                            result_paths=config.paths.result,
+                            relative_time=relative_time,
+                            all_currents_columns=result_settings.currents_columns)
+    if result_settings.streaming_analysis.enable:
+        # Raw output is analysed by chunks, full dataframe is not loaded in memory
+        result_collector = StreamingTransientResultDataCollector(
+            chunk_size=result_settings.streaming_analysis.chunk_size, **collector_params
+        )
+        return result_collector, StreamingTransientResultBuilder
+    if result_settings.lean_collector.enable:
+        result_collector = LeanTransientResultDataCollector(
+            currents_array=currents_array, float32=result_settings.lean_collector.float32, **collector_params
+        )
+        return result_collector, TransientResultBuilder
+    return TransientResultDataCollector(currents_array=currents_array, **collector_params), TransientResultBuilder
+
+
 def transient_result_build(config: Config, stage: StageData, prev_stage_last_current: Union[float, None],
-                           relative_time: float):
-    # Collect result
-    result_collector = TransientResultDataCollector(mtut_file_path=config.paths.treada_core.mtut,
-                                                    result_paths=config.paths.result,
-                                                    relative_time=relative_time)
-    # Set transient parameters
-    result_collector.transient.set_window_size_denominator(
-        config.advanced_settings.transient.window_size_denominator
-    )
-    result_collector.transient.set_window_size(config.advanced_settings.transient.window_size)
-    result_collector.transient.set_criteria_calculating_df_slice(
-        config.advanced_settings.transient.criteria_calculating_df_slice
-    )
-    print(f'{prev_stage_last_current=}')
-    # Prepare result
-    result_collector.prepare_result_data(stage,
-                                         prev_stage_last_current,
-                                         config.advanced_settings.result.dataframe.custom)
-
-    # Save transient_result in result file and output in console
-    result_builder = TransientResultBuilder(result_collector,
-                                            result_paths=config.paths.result,
-                                            result_settings=config.advanced_settings.result,
-                                            stage_name=stage.name)
+                           relative_time: float, currents_array: Union[np.ndarray, None] = None):
+    with PeakMemoryReport(f'result collecting on {stage.name} stage',
+                          enable=config.advanced_settings.tracing.memory_report):
+        cache_key = transient_analysis_cache_key(config, stage, prev_stage_last_current, relative_time,
+                                                 currents_array)
+        memoized_arrays = analysis_cache.load(cache_key) if cache_key else None
+        if memoized_arrays is not None:
+            print('Transient analysis result is loaded from cache.')
+            result_collector = memoized_transient_result_collector(config, stage, relative_time, memoized_arrays)
+            result_builder_class = TransientResultBuilder
+        else:
+            # Collect result
+            result_collector, result_builder_class = transient_result_collector_build(config, relative_time,
+                                                                                      currents_array)
+            # Set transient parameters
+            result_collector.transient.set_window_size_denominator(
+                config.advanced_settings.transient.window_size_denominator
+            )
+            result_collector.transient.set_window_size(config.advanced_settings.transient.window_size)
+            result_collector.transient.set_criteria_calculating_df_slice(
+                config.advanced_settings.transient.criteria_calculating_df_slice
+            )
+            print(f'{prev_stage_last_current=}')
+            # Prepare result
+            result_collector.prepare_result_data(stage,
+                                                 prev_stage_last_current,
+                                                 config.advanced_settings.result.dataframe.custom)
+            if cache_key:
+                analysis_cache.save(cache_key, result_collector.get_memoized_arrays())
+
+        # Save transient_result in result file and output in console
+        result_builder = result_builder_class(result_collector,
+                                              result_paths=config.paths.result,
+                                              result_settings=config.advanced_settings.result,
+                                              stage_name=stage.name)
 
     if config.plotting.enable:
-        # Creation of plot builder object
-        plot_builder = TransientPlotBuilder(mtut_path=config.paths.treada_core.mtut,
-                                            result_path=result_builder.result_path,
-                                            dist_path=config.paths.result.temporary.distributions,
-                                            stage_name=stage.name,
-                                            runtime_result_data=result_builder.results,
-                                            skip_rows=result_builder.header_length,
-                                            y_transient_col_key=config.plotting.y_column,
-                                            is_transient_ending_point=False)
-
-        # Display advanced info
-        if config.plotting.advanced_info:
-            plot_builder.set_advanced_info()
-        else:
-            plot_builder.set_loaded_info()
+        with tracer.span('TransientPlotBuilder', stage=stage.name):
+            # Creation of plot builder object
+            plot_builder = TransientPlotBuilder(mtut_path=config.paths.treada_core.mtut,
+                                                result_path=result_builder.result_path,
+                                                dist_path=config.paths.result.temporary.distributions,
+                                                stage_name=stage.name,
+                                                runtime_result_data=result_builder.results,
+                                                skip_rows=result_builder.header_length,
+                                                y_transient_col_key=config.plotting.y_column,
+                                                is_transient_ending_point=False)
 
-        # Save plot to file
-        full_plot_path = result_builder.file_path_with_name_build(result_path=config.paths.result.plots,
-                                                                  stage_name=stage.name,
-                                                                  file_extension='png')
-        plot_builder.save_plot(full_plot_path)
+            # Display advanced info
+            if config.plotting.advanced_info:
+                plot_builder.set_advanced_info()
+            else:
+                plot_builder.set_loaded_info()
+
+            # Save plot to file
+            full_plot_path = result_builder.file_path_with_name_build(result_path=config.paths.result.plots,
+                                                                      stage_name=stage.name,
+                                                                      file_extension='png')
+            plot_builder.save_plot(full_plot_path)
         return plot_builder.plot_window, result_builder.result_path
 
 
-def impedance_result_build(config: Config, stage: StageData, is_repeated: bool):
+def impedance_result_build(config: Config, stage: StageData, is_repeated: bool,
+                           stage_dataframe: Union[pd.DataFrame, None] = None):
     result_builder = SmallSignalResultBuilder(result_paths=config.paths.result, stage_name=stage.name,
-                                              is_repeated_stage=is_repeated)
-    plot_builder = ImpedancePlotBuilder(result_path=result_builder.result_path)
+                                              is_repeated_stage=is_repeated, stage_dataframe=stage_dataframe)
+    # Results of repeated stages are kept in the store until the export is requested
+    if not is_repeated:
+        result_builder.export()
+    with tracer.span('ImpedancePlotBuilder', stage=stage.name):
+        plot_builder = ImpedancePlotBuilder(result_path=result_builder.result_path,
+                                            result_df=result_builder.dataframe)
     plot_builder.show()
+
+
+def impedance_result_export(config: Config, stage: StageData) -> str:
+    """
+    Writes all stored small signal results of the stage sorted by frequency to the result file.
+    :return: path to the result file
+    """
+    result_path = SmallSignalResultBuilder.file_path_with_name_build(result_path=config.paths.result.main,
+                                                                     stage_name=stage.name)
+    return SmallSignalResultStore.open(result_path).export()
@@ -22,21 +22,23 @@ def scenario_function(data_class):
             for var in mtut_scenario_vars.keys():
                 mtut_preserved_vars[var] = mtut_initial_manager.get_var(var)
 
-            scenario_result = scenario_func(scenario, config, *args, **kwargs)
-            # Set scenario result parameters
-            if config.plotting.join_stages:
-                joint_plot_window = plot_joint_stages_data(scenario,
-                                                           config.plotting.join_stages,
-                                                           config.paths.treada_core.mtut,
-                                                           config.plotting.y_column,
-                                                           scenario_result['paths'])
-                scenario_result['plots'].append(joint_plot_window)
-            # Recover preserved mtut vars
-            mtut_after_manager = MtutManager(config.paths.treada_core.mtut)
-            mtut_after_manager.load_file()
-            for var, value in mtut_preserved_vars.items():
-                mtut_after_manager.set_var(var, value)
-            mtut_after_manager.save_file()
+            try:
+                scenario_result = scenario_func(scenario, config, *args, **kwargs)
+                # Set scenario result parameters
+                if config.plotting.join_stages:
+                    joint_plot_window = plot_joint_stages_data(scenario,
+                                                               config.plotting.join_stages,
+                                                               config.paths.treada_core.mtut,
+                                                               config.plotting.y_column,
+                                                               scenario_result['paths'])
+                    scenario_result['plots'].append(joint_plot_window)
+            finally:
+                # Recover preserved mtut vars (also if a stage was failed)
+                mtut_after_manager = MtutManager(config.paths.treada_core.mtut)
+                mtut_after_manager.load_file()
+                for var, value in mtut_preserved_vars.items():
+                    mtut_after_manager.set_var(var, value)
+                mtut_after_manager.save_file()
             return scenario_result
         return scenario_wrapper
     return scenario_decorator_wrapper
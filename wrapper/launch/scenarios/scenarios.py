@@ -77,6 +77,8 @@ def capacity_scenario(scenario, config: Config, mtut_stage_configer: MtutStageCo
         stage.impedance_info_collecting(config, scenario.stages.capacity_info, is_repeated=True)
 
     def exit_action():
+        # Results of repeated stages are exported once before exit
+        stage.impedance_result_export(config, scenario.stages.capacity_info)
         raise SystemExit
 
     user_interactor = create_impedance_console_interactor(actions=[
@@ -2,8 +2,9 @@ from typing import Union
 
 from wrapper.config.config_build import Config
 from wrapper.core.data_management import MtutStageConfiger
+from wrapper.core.frequency_bands import FrequencyBandsRunner
 from wrapper.core.treada_io_handling import TreadaRunner
-from wrapper.launch.result_build import transient_result_build, impedance_result_build
+from wrapper.launch.result_build import transient_result_build, impedance_result_build, impedance_result_export
 from wrapper.launch.scenarios.scenario_build import StageData
 
 
@@ -27,7 +28,8 @@ class Stage:
             # Collect data and build result
             plot_window, result_path = transient_result_build(config, scenario_stage_data,
                                                               self.previous_stage_last_current,
-                                                              self.relative_time)
+                                                              self.relative_time,
+                                                              currents_array=treada.get_captured_currents())
             self.transient_result['plots'].append(plot_window)
             self.transient_result['paths'].append(result_path)
         else:
@@ -39,16 +41,32 @@ class Stage:
         from wrapper.misc.collections.fields_integral.fields_integral_calculation import (
             load_mtut_vars,
             perform_fields_integral_finding,
-            save_integral_results)
+            perform_fields_integral_series_finding,
+            save_integral_results,
+            save_integral_series_results)
         mtut_vars = load_mtut_vars(config.paths.treada_core.mtut)
         results_data = perform_fields_integral_finding(scenario, config, mtut_vars)
         save_integral_results(results_data, mtut_vars)
+        # Times of all preserved snapshots
+        series_data = perform_fields_integral_series_finding(scenario, config, mtut_vars)
+        save_integral_series_results(series_data, mtut_vars)
 
     def impedance_info_collecting(self, config: Config, scenario_stage_data: StageData, is_repeated: bool):
+        if config.advanced_settings.runtime.frequency_bands.enable:
+            # Frequency bands are computed by parallel Treada's processes
+            band_runner = FrequencyBandsRunner(config, self.relative_time)
+            stage_dataframe = band_runner.run(scenario_stage_data)
+            impedance_result_build(config, scenario_stage_data, is_repeated, stage_dataframe=stage_dataframe)
+            return
         treada = TreadaRunner(config, self.relative_time)
         treada.run(scenario_stage_data, config.paths.result.temporary.raw, is_show_stage_name=False)
         impedance_result_build(config, scenario_stage_data, is_repeated)
 
+    @staticmethod
+    def impedance_result_export(config: Config, scenario_stage_data: StageData):
+        result_path = impedance_result_export(config, scenario_stage_data)
+        print(f'Small signal results are saved to: {result_path}')
+
 
 class SmallSignalInfoStage:
     """
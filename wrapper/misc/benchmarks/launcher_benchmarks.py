@@ -0,0 +1,318 @@
+"""
+End-to-end benchmarks of the launcher hot paths on synthetic data.
+Time and peak memory (by tracemalloc) of each benchmark stage are saved to JSON file,
+so the results of performance work can be compared between commits and machines.
+
+How to use:
+    python -m wrapper.misc.benchmarks.launcher_benchmarks --sizes 1e4 1e5 1e6 --output benchmarks.json
+    Available stages are listed in BENCHMARK_STAGES, all of them are run by default (--stages to select).
+
+Sizes are numbers of transient steps (lines with currents in Treada's raw output)
+or numbers of frequencies in small signal tables for small signal stages.
+Treada executable is replaced by the replay stand-in, so benchmarks can be run on Linux.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Tuple, Dict, Any
+
+import numpy as np
+import pandas as pd
+from PySide6.QtWidgets import QApplication
+
+# Add path to "project" directory in environ variable - PYTHONPATH (for independent script launch)
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.sep.join([".."] * 3)))
+sys.path.append(project_path)
+
+from wrapper.core.data_management import (
+    TransientOutputParser, TransientResultDataCollector, TransientResultBuilder, transient_cols,
+    SmallSignalInfoOutputParser, VectorizedSmallSignalInfoOutputParser
+)
+from wrapper.core.ending_conditions import EndingCondition
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspace, STAGE_NAME, WW_FIELDS_INDEX
+# Plotting module must be imported before fields integral module, which changes matplotlib backend
+from wrapper.ui.plotting import TransientPlotBuilder
+import matplotlib.pyplot as plt
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
+from wrapper.misc.collections.fields_integral.fields_integral_calculation import (
+    find_fields_integral, load_mtut_vars
+)
+
+
+BENCHMARK_STAGES = (
+    'io_loop',
+    'clean_data',
+    'ending_condition',
+    'prepare_result_data',
+    'result_builder',
+    'plot',
+    'ww_load',
+    'fields_integral',
+    'small_signal_clean_data',
+    'small_signal_vectorized',
+)
+DEFAULT_SIZES = (10**4, 10**5, 10**6)
+
+
+def main():
+    args = parse_args()
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmarks = LauncherBenchmarks(sizes=args.sizes, stages=args.stages, is_measure_memory=not args.no_memory)
+    report = benchmarks.run()
+    save_report(report, args.output)
+    print(f'Benchmark results saved to: {args.output}')
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmarks of treada_launcher hot paths')
+    parser.add_argument('--sizes', nargs='+', type=lambda size: int(float(size)), default=list(DEFAULT_SIZES),
+                        help='numbers of transient steps (e.g. 1e4 1e7)')
+    parser.add_argument('--stages', nargs='+', choices=BENCHMARK_STAGES, default=list(BENCHMARK_STAGES))
+    parser.add_argument('--output', default=os.path.join(project_path, 'data', 'result', 'benchmarks',
+                                                         'launcher_benchmarks.json'))
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not measure peak memory (saves the second run of each stage)')
+    return parser.parse_args(argv)
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Result of one benchmark stage.
+
+    Attributes:
+        stage: name of benchmark stage
+        size: number of transient steps
+        items: number of processed items (lines, steps, points or snapshots)
+        time_s: wall time of the stage
+        items_per_s: throughput
+        peak_memory_mb: peak of memory allocated by Python during the stage (None if not measured)
+    """
+    stage: str
+    size: int
+    items: int
+    time_s: float
+    items_per_s: float
+    peak_memory_mb: Any = None
+
+
+class LauncherBenchmarks:
+    """
+    Runs benchmark stages for each size.
+    Each stage method prepares its input and returns (measured function, number of processed items).
+    """
+    def __init__(self, sizes: List[int], stages: List[str], is_measure_memory=True):
+        self.sizes = sizes
+        self.stages = [stage for stage in BENCHMARK_STAGES if stage in stages]
+        self.is_measure_memory = is_measure_memory
+        self.workspace = None
+        self.result_collector = None
+        self.result_builder = None
+        self.ww_data = None
+        self.app = None
+
+    def run(self) -> dict:
+        results = []
+        for size in self.sizes:
+            with tempfile.TemporaryDirectory() as root_dir:
+                self.workspace = SyntheticWorkspace(root_dir, size)
+                with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                    self.workspace.generate_raw_output()
+                for stage in self.stages:
+                    result = self.run_stage(stage, size)
+                    results.append(result)
+                    print(f'{stage:>20} size={size:<9} time={result.time_s:10.4f} s '
+                          f'{result.items_per_s:14.1f} items/s  peak_memory={result.peak_memory_mb} MB')
+            self.result_collector = self.result_builder = self.ww_data = None
+        return {'environment': environment_info(), 'results': [asdict(result) for result in results]}
+
+    def run_stage(self, stage: str, size: int) -> BenchmarkResult:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            func, items = getattr(self, f'prepare_{stage}')()
+            gc.collect()
+            start_time = time.perf_counter()
+            func()
+            stage_time = time.perf_counter() - start_time
+            peak_memory_mb = None
+            if self.is_measure_memory:
+                gc.collect()
+                tracemalloc.start()
+                try:
+                    func()
+                    peak_memory_mb = round(tracemalloc.get_traced_memory()[1] / 2**20, 3)
+                finally:
+                    tracemalloc.stop()
+        return BenchmarkResult(stage=stage, size=size, items=items, time_s=stage_time,
+                               items_per_s=items / stage_time if stage_time else float('inf'),
+                               peak_memory_mb=peak_memory_mb)
+
+    def prepare_io_loop(self) -> Tuple[Callable, int]:
+        def run_stage():
+            # Number of replay steps is passed to the replay process by its environment
+            previous_steps = os.environ.get('TREADA_REPLAY_STEPS')
+            os.environ['TREADA_REPLAY_STEPS'] = str(self.workspace.size)
+            try:
+                runner = TreadaRunner(self.workspace.config, self.workspace.relative_time)
+                runner.run(StageData(name=STAGE_NAME), self.workspace.raw_path)
+            finally:
+                if previous_steps is None:
+                    del os.environ['TREADA_REPLAY_STEPS']
+                else:
+                    os.environ['TREADA_REPLAY_STEPS'] = previous_steps
+        return run_stage, self.workspace.size
+
+    def prepare_clean_data(self) -> Tuple[Callable, int]:
+        data_list = TransientOutputParser.load_raw_file(self.workspace.raw_path)
+        parser = TransientOutputParser.__new__(TransientOutputParser)
+        return lambda: parser.clean_data(data_list), len(data_list)
+
+    def prepare_ending_condition(self) -> Tuple[Callable, int]:
+        currents = TransientOutputParser(self.workspace.raw_path).dataframe[transient_cols.source_current].tolist()
+        condition_settings = self.workspace.config.advanced_settings.runtime.ending_condition
+
+        def check_all():
+            ending_condition = EndingCondition(chunk_size=condition_settings.chunk_size,
+                                               equal_values_to_stop=condition_settings.equal_values_to_stop,
+                                               deviation_coef=condition_settings.deviation)
+            for current in currents:
+                ending_condition.check(current)
+        return check_all, len(currents)
+
+    def create_result_collector(self) -> TransientResultDataCollector:
+        """
+        Creates result collector like transient_result_build() does.
+        """
+        config = self.workspace.config
+        result_collector = TransientResultDataCollector(mtut_file_path=config.paths.treada_core.mtut,
+                                                        result_paths=config.paths.result,
+                                                        relative_time=self.workspace.relative_time)
+        result_collector.transient.set_window_size_denominator(
+            config.advanced_settings.transient.window_size_denominator
+        )
+        result_collector.transient.set_window_size(config.advanced_settings.transient.window_size)
+        result_collector.transient.set_criteria_calculating_df_slice(
+            config.advanced_settings.transient.criteria_calculating_df_slice
+        )
+        return result_collector
+
+    def prepare_prepare_result_data(self) -> Tuple[Callable, int]:
+        parsed_dataframe = TransientOutputParser(self.workspace.raw_path).dataframe
+        custom_col_params = self.workspace.config.advanced_settings.result.dataframe.custom
+
+        def prepare():
+            # Parsing of raw output is measured by clean_data stage
+            self.result_collector = self.create_result_collector()
+            self.result_collector.dataframe = parsed_dataframe.copy()
+            self.result_collector.prepare_result_data(StageData(name=STAGE_NAME), None, custom_col_params)
+        return prepare, len(parsed_dataframe)
+
+    def ensure_result_collector(self):
+        if self.result_collector is None:
+            self.result_collector = self.create_result_collector()
+            self.result_collector.prepare_result_data(StageData(name=STAGE_NAME), None,
+                                                      self.workspace.config.advanced_settings.result.dataframe.custom)
+
+    def prepare_result_builder(self) -> Tuple[Callable, int]:
+        self.ensure_result_collector()
+        config = self.workspace.config
+
+        def build():
+            self.result_builder = TransientResultBuilder(self.result_collector,
+                                                         result_paths=config.paths.result,
+                                                         result_settings=config.advanced_settings.result,
+                                                         stage_name=STAGE_NAME)
+        return build, len(self.result_collector.get_result_dataframe())
+
+    def prepare_plot(self) -> Tuple[Callable, int]:
+        self.app = QApplication.instance() or QApplication([])
+        if self.result_builder is None:
+            self.ensure_result_collector()
+            self.prepare_result_builder()[0]()
+        config = self.workspace.config
+        plot_path = self.result_builder.file_path_with_name_build(result_path=config.paths.result.plots,
+                                                                  stage_name=STAGE_NAME, file_extension='png')
+        os.makedirs(os.path.dirname(plot_path), exist_ok=True)
+
+        def load_and_render():
+            plot_builder = TransientPlotBuilder(mtut_path=config.paths.treada_core.mtut,
+                                                result_path=self.result_builder.result_path,
+                                                dist_path=config.paths.result.temporary.distributions,
+                                                stage_name=STAGE_NAME,
+                                                runtime_result_data=self.result_builder.results,
+                                                skip_rows=self.result_builder.header_length,
+                                                y_transient_col_key=config.plotting.y_column)
+            plot_builder.set_loaded_info()
+            plot_builder.save_plot(plot_path)
+            plt.close('all')
+        return load_and_render, len(self.result_builder.results.full_df)
+
+    def prepare_ww_load(self) -> Tuple[Callable, int]:
+        ww_indexes = self.workspace.generate_ww_data()
+        distributions_path = self.workspace.config.paths.result.temporary.distributions
+
+        def load():
+            self.ww_data = WWDataCollector.load_ww_data(abs_res_path=distributions_path,
+                                                        stage_dir_name=STAGE_NAME,
+                                                        ww_dir_indexes=ww_indexes,
+                                                        ww_aliases={WW_FIELDS_INDEX: 'fields'})
+        return load, len(ww_indexes)
+
+    def prepare_fields_integral(self) -> Tuple[Callable, int]:
+        if self.ww_data is None:
+            self.prepare_ww_load()[0]()
+        mtut_vars = load_mtut_vars(self.workspace.config.paths.treada_core.mtut)
+        dx_const = mtut_vars.hx[1]['step'] * 1e-4  # cm
+        fields = [snapshot[WW_FIELDS_INDEX]['fields'] for snapshot in self.ww_data.values()]
+
+        def integrate():
+            for field in fields:
+                find_fields_integral(field, dx_const=dx_const, q_mobility=mtut_vars.e_mobility)
+                find_fields_integral(field, dx_const=dx_const, q_mobility=mtut_vars.h_mobility)
+        return integrate, len(fields)
+
+    def prepare_small_signal_parser(self, parser_class) -> Tuple[Callable, int]:
+        raw_path = os.path.join(os.path.dirname(self.workspace.raw_path), 'small_signal_raw_output.txt')
+        if not os.path.isfile(raw_path):
+            self.workspace.generate_small_signal_output(raw_path)
+        # Parser reads and cleans raw output on creation
+        return lambda: parser_class(raw_path), self.workspace.size
+
+    def prepare_small_signal_clean_data(self) -> Tuple[Callable, int]:
+        return self.prepare_small_signal_parser(SmallSignalInfoOutputParser)
+
+    def prepare_small_signal_vectorized(self) -> Tuple[Callable, int]:
+        return self.prepare_small_signal_parser(VectorizedSmallSignalInfoOutputParser)
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def save_report(report: dict, output_path: str):
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w') as report_file:
+        json.dump(report, report_file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
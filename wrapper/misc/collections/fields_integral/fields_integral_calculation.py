@@ -1,8 +1,9 @@
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -13,7 +14,7 @@ import matplotlib
 from wrapper.misc.global_functions import create_dir
 from wrapper.ui.console import quit_user_warning_dialogue
 
-matplotlib.use('TkAgg')
+matplotlib.use('TkAgg', force=False)
 import matplotlib.pyplot as plt
 
 
@@ -21,7 +22,7 @@ import matplotlib.pyplot as plt
 project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.sep.join([".."] * 4)))
 sys.path.append(project_path)
 
-from wrapper.core.data_management import MtutManager
+from wrapper.core.data_management import MtutManager, find_relative_time
 from wrapper.config.config_build import load_config, Config
 from wrapper.launch.scenarios.scenario_build import DarkToLightScenario, load_scenario
 from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
@@ -37,6 +38,7 @@ def run_fields_integral_finding(config: Config):
     scenario = load_scenario(config.paths.scenarios, config.scenario.active_name, DarkToLightScenario)
     mtut_vars = load_mtut_vars(config.paths.treada_core.mtut)
     perform_fields_integral_finding(scenario, config, mtut_vars, is_plot=True)
+    save_integral_series_results(perform_fields_integral_series_finding(scenario, config, mtut_vars), mtut_vars)
     quit_user_warning_dialogue()
 
 
@@ -48,6 +50,8 @@ class MtutVars:
     udrm: str
     # layer_material_number_1: List[float]
     # layer_material_number_2: List[float]
+    tstep: Union[float, None] = None
+    relative_time: Union[float, None] = None
 
 
 def load_mtut_vars(mtut_file_path: str) -> MtutVars:
@@ -67,11 +71,13 @@ def load_mtut_vars(mtut_file_path: str) -> MtutVars:
         udrm=udrm,
         # layer_material_number_1=layer_material_number_1,
         # layer_material_number_2=layer_material_number_2,
+        tstep=float(mtut_manager.get_var('TSTEP')),
+        relative_time=find_relative_time(mtut_manager),
     )
 
 
 def is_ww_data_exists(stage_folder_path: str):
-    index_path = next(iter(os.listdir(stage_folder_path)))
+    index_path = next(filter(str.isdigit, os.listdir(stage_folder_path)))
     ww_path = os.path.join(stage_folder_path, index_path)
     file_names = os.listdir(ww_path)
     for file_name in file_names:
@@ -83,8 +89,8 @@ def is_ww_data_exists(stage_folder_path: str):
 def extract_stages_ww_data(distributions_path: str):
     for stage_folder_path in os.listdir(distributions_path):
         stage_folder_path = os.path.join(distributions_path, stage_folder_path)
-        if not is_ww_data_exists(stage_folder_path):
-            WWDataCollector.extract_ww_data(stage_folder_path)
+        # Only missing or stale snapshots are extracted
+        WWDataCollector.extract_ww_data(stage_folder_path)
 
 
 def load_fields_data(distributions_path: str, scenario) -> dict:
@@ -95,7 +101,7 @@ def load_fields_data(distributions_path: str, scenario) -> dict:
     for stage in scenario.stages.__dict__.values():
         stage_name = stage.name
         stage_data_path = os.path.join(distributions_path, stage_name)
-        stage_data_indexes: list = sorted(os.listdir(stage_data_path), key=int)
+        stage_data_indexes: list = sorted(filter(str.isdigit, os.listdir(stage_data_path)), key=int)
         last_index_list = stage_data_indexes[-1:]
         print(f'{stage.name}: {stage_data_indexes=}')
 
@@ -167,9 +173,136 @@ def find_fields_integral(fields_seria: pd.Series, dx_const: float, q_mobility: f
     return time
 
 
-def save_integral_results(results: dict, mtut_vars: MtutVars):
+def find_between_peaks_field_ranges(fields: np.ndarray, height: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched find_between_peaks_field_range() for all rows of fields matrix.
+    Strict peaks are found by NumPy for all rows at once, rows with a single peak or a flat peak
+    are processed by scipy like the single field.
+    :param fields: matrix (snapshots, x points) of electrical fields
+    :param height: required height of peaks
+    :return: low and high (exclusive) indexes of ranges, -1 for fields without 1 or 2 peaks
+    """
+    inner = fields[:, 1:-1]
+    is_rise = inner > fields[:, :-2]
+    is_high = inner >= height
+    peaks = is_rise & (inner > fields[:, 2:]) & is_high
+    peaks_numbers = peaks.sum(axis=1)
+    # Index of the first peak and the next index after the last peak (+1 for inner slice shift)
+    low = np.argmax(peaks, axis=1) + 1
+    high = fields.shape[1] - 1 - np.argmax(peaks[:, ::-1], axis=1)
+    is_valid = peaks_numbers == 2
+    low[~is_valid] = -1
+    high[~is_valid] = -1
+    flat_peak_rows = np.any(is_rise & (inner == fields[:, 2:]) & is_high, axis=1)
+    for row in np.flatnonzero((peaks_numbers == 1) | flat_peak_rows):
+        low[row], high[row] = _field_range(fields[row], height)
+    return low, high
+
+
+def _field_range(field: np.ndarray, height: float) -> Tuple[int, int]:
+    """
+    :return: find_between_peaks_field_range() result as (low, high) or (-1, -1) if there are no 1 or 2 peaks
+    """
+    field_peaks, _ = find_peaks(field, height=height)
+    if len(field_peaks) == 2:
+        return field_peaks[0], field_peaks[1] + 1
+    if len(field_peaks) == 1:
+        peak_width = peak_widths(field, peaks=field_peaks)[0][0]
+        return (max(round(field_peaks[0] - peak_width/2), 0),
+                round(field_peaks[0] + peak_width/2 + 1))
+    return -1, -1
+
+
+def fields_integrals_calculation(fields: np.ndarray, low: np.ndarray, high: np.ndarray,
+                                 dx_const: float, q_mobility: float) -> np.ndarray:
+    """
+    Batched field_integral_calculation() for ranges of all rows of fields matrix.
+    :return: full times (ps) of rows, NaN for rows without range
+    """
+    columns = np.arange(fields.shape[1])
+    in_range = (columns >= low[:, np.newaxis]) & (columns < high[:, np.newaxis])
+    # Carries' velocity restriction
+    velocity = np.minimum(q_mobility * fields * 1e3, 1e7)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        times = np.where(in_range, (dx_const / velocity) * 1e12, 0.)
+    full_times = times.sum(axis=1)
+    full_times[low < 0] = np.nan
+    return full_times
+
+
+def load_stage_fields(stage_folder_path: str, fields_ind=6) -> Tuple[List[int], np.ndarray]:
+    """
+    :return: snapshot steps and matrix (snapshots, x points) of fields of all snapshots of the stage
+    """
+    ww_dataset = WWDataCollector.consolidate_ww_data(stage_folder_path)
+    if ww_dataset is None or fields_ind not in ww_dataset.ww_positions:
+        raise ValueError(f'There is no fields data in "{stage_folder_path}"')
+    return ww_dataset.steps, np.asarray(ww_dataset.profiles(ww_dataset.steps, fields_ind))
+
+
+def find_stage_fields_integral_series(stage_folder_path: str, dx_const: float, mtut_vars: MtutVars,
+                                      timestep_constant: Union[float, None] = None, height=1) -> dict:
+    """
+    Calculates electrons and holes times for each preserved snapshot of the stage.
+    :param timestep_constant: time of one step (ps) to convert snapshot steps to time
+    :return: time series of the stage
+    """
+    steps, fields = load_stage_fields(stage_folder_path)
+    low, high = find_between_peaks_field_ranges(fields, height=height)
+    e_times = fields_integrals_calculation(fields, low, high, dx_const, mtut_vars.e_mobility)
+    h_times = fields_integrals_calculation(fields, low, high, dx_const, mtut_vars.h_mobility)
+    series = {
+        'steps': steps,
+        'e_time': [None if np.isnan(e_time) else e_time for e_time in e_times.tolist()],
+        'h_time': [None if np.isnan(h_time) else h_time for h_time in h_times.tolist()],
+    }
+    if timestep_constant:
+        series['time'] = [step * timestep_constant for step in steps]
+    return series
+
+
+def perform_fields_integral_series_finding(scenario, config: Config, mtut_vars: MtutVars,
+                                           max_workers: Union[int, None] = None) -> dict:
+    """
+    Calculates time series of electrons and holes times for all stages of the scenario in parallel.
+    Time of snapshot is counted from the beginning of its stage.
+    """
+    distributions_path = config.paths.result.temporary.distributions
+    dx_const = mtut_vars.hx[1]['step'] * 1e-4  # cm
+    stages = list(scenario.stages.__dict__.values())
+
+    def stage_series(stage) -> dict:
+        stage_mtut_vars = stage.mtut_vars or {}
+        tstep = float(stage_mtut_vars.get('TSTEP', mtut_vars.tstep or 0.))
+        timestep_constant = tstep * mtut_vars.relative_time if mtut_vars.relative_time else None
+        return find_stage_fields_integral_series(os.path.join(distributions_path, stage.name), dx_const, mtut_vars,
+                                                 timestep_constant=timestep_constant)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as executor:
+        stages_series = list(executor.map(stage_series, stages))
+    results = {
+        "e_mobility": mtut_vars.e_mobility,
+        "h_mobility": mtut_vars.h_mobility,
+    }
+    for stage, series in zip(stages, stages_series):
+        results[stage.name] = series
+    return results
+
+
+def integral_results_path(mtut_vars: MtutVars, suffix='') -> str:
     script_path = os.path.dirname((os.path.abspath(__file__)))
-    res_file_path = os.path.join(script_path, 'results', f'res_u({mtut_vars.udrm}).json')
+    return os.path.join(script_path, 'results', f'res_u({mtut_vars.udrm}){suffix}.json')
+
+
+def save_integral_series_results(results: dict, mtut_vars: MtutVars):
+    res_file_path = integral_results_path(mtut_vars, suffix='_series')
+    create_dir(res_file_path)
+    with open(res_file_path, 'w') as fields_result_file:
+        json.dump(results, fields_result_file, indent=4)
+
+
+def save_integral_results(results: dict, mtut_vars: MtutVars):
+    res_file_path = integral_results_path(mtut_vars)
     create_dir(res_file_path)
     with open(res_file_path, 'w') as fields_result_file:
         json.dump(results, fields_result_file, indent=4)
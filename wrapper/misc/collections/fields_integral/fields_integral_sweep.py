@@ -0,0 +1,161 @@
+"""
+Fields integral for all points of a sweep.
+If "keep_sweep_points" is enabled in "distributions" runtime settings, the preserved distributions tree and MTUT
+of each computed point are moved to the sweep directory ("paths.result.temporary.sweep"):
+    sweep/u(<UDRM>)/MTUT
+    sweep/u(<UDRM>)/distributions/<stage>/<step>/
+Sweep mode walks all stored points and calculates electrons and holes times of the last snapshot of each stage
+in a process pool. Points whose MTUT and distribution files are not changed are taken from the manifest.
+
+Results in the sweep directory:
+    fields_integral_manifest.json - input digests and results of points
+    fields_integral_sweep.csv - table of e_time, h_time vs UDRM and stage
+"""
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from wrapper.config.config_build import Config
+from wrapper.core.data_management import MtutManager
+from wrapper.misc.collections.fields_integral.fields_integral_calculation import (
+    load_mtut_vars, load_stage_fields, find_between_peaks_field_ranges, fields_integrals_calculation
+)
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
+from wrapper.misc.collections.ww_data_collecting.ww_extraction import WWExtractor
+from wrapper.misc.global_functions import create_dir
+
+
+SWEEP_MANIFEST_NAME = 'fields_integral_manifest.json'
+SWEEP_TABLE_NAME = 'fields_integral_sweep.csv'
+SWEEP_TABLE_COLUMNS = ['udrm', 'stage', 'step', 'e_time', 'h_time']
+POINT_MTUT_NAME = 'MTUT'
+POINT_DISTRIBUTIONS_NAME = 'distributions'
+
+
+def store_sweep_point(config: Config) -> Union[str, None]:
+    """
+    Moves preserved distributions and copies MTUT of the computed point to the sweep directory.
+    :return: path to the point directory or None if there are no preserved distributions
+    """
+    distributions_path = config.paths.result.temporary.distributions
+    if not os.path.isdir(distributions_path) or not os.listdir(distributions_path):
+        return None
+    mtut_manager = MtutManager(config.paths.treada_core.mtut)
+    mtut_manager.load_file()
+    point_path = os.path.join(config.paths.result.temporary.sweep, f'u({mtut_manager.get_var("UDRM")})')
+    point_distributions_path = os.path.join(point_path, POINT_DISTRIBUTIONS_NAME)
+    # Results of the repeated point are replaced
+    if os.path.isdir(point_distributions_path):
+        shutil.rmtree(point_distributions_path)
+    os.makedirs(point_path, exist_ok=True)
+    shutil.copy(config.paths.treada_core.mtut, os.path.join(point_path, POINT_MTUT_NAME))
+    shutil.move(os.path.normpath(distributions_path), point_distributions_path)
+    os.makedirs(distributions_path, exist_ok=True)
+    return point_path
+
+
+def list_sweep_points(sweep_path: str) -> List[str]:
+    if not os.path.isdir(sweep_path):
+        return []
+    return sorted(entry.path for entry in os.scandir(sweep_path)
+                  if entry.is_dir() and os.path.isfile(os.path.join(entry.path, POINT_MTUT_NAME)))
+
+
+def sweep_point_digest(point_path: str) -> str:
+    """
+    :return: digest of MTUT and source distribution files (names, sizes and mtimes) of the point
+    """
+    point_hash = hashlib.blake2b(digest_size=16)
+    with open(os.path.join(point_path, POINT_MTUT_NAME), 'rb') as mtut_file:
+        point_hash.update(mtut_file.read())
+    distributions_path = os.path.join(point_path, POINT_DISTRIBUTIONS_NAME)
+    for root, dir_names, file_names in os.walk(distributions_path):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            # Extracted WW data is derived from source files
+            if file_name.startswith(('WW', 'ww_dataset')):
+                continue
+            file_path = os.path.join(root, file_name)
+            file_stat = os.stat(file_path)
+            point_hash.update(f'{os.path.relpath(file_path, distributions_path)}:{file_stat.st_size}:'
+                              f'{file_stat.st_mtime_ns};'.encode())
+    return point_hash.hexdigest()
+
+
+def calculate_sweep_point(point_path: str) -> List[dict]:
+    """
+    Extracts WW data of the point (if it is needed) and calculates times of the last snapshot of each stage.
+    :return: rows of the sweep table
+    """
+    mtut_vars = load_mtut_vars(os.path.join(point_path, POINT_MTUT_NAME))
+    dx_const = mtut_vars.hx[1]['step'] * 1e-4  # cm
+    distributions_path = os.path.join(point_path, POINT_DISTRIBUTIONS_NAME)
+    rows = []
+    for stage_entry in sorted(os.scandir(distributions_path), key=lambda entry: entry.name):
+        if not stage_entry.is_dir():
+            continue
+        # Points are calculated in parallel, so each one runs a single extractor process
+        WWDataCollector.extract_ww_data(stage_entry.path, extractor=WWExtractor(max_workers=1))
+        steps, fields = load_stage_fields(stage_entry.path)
+        last_fields = fields[-1:]
+        low, high = find_between_peaks_field_ranges(last_fields, height=1)
+        e_time, = fields_integrals_calculation(last_fields, low, high, dx_const, mtut_vars.e_mobility).tolist()
+        h_time, = fields_integrals_calculation(last_fields, low, high, dx_const, mtut_vars.h_mobility).tolist()
+        rows.append({
+            'udrm': float(mtut_vars.udrm),
+            'stage': stage_entry.name,
+            'step': steps[-1],
+            'e_time': None if np.isnan(e_time) else e_time,
+            'h_time': None if np.isnan(h_time) else h_time,
+        })
+    return rows
+
+
+def load_sweep_manifest(manifest_path: str) -> Dict[str, dict]:
+    try:
+        with open(manifest_path) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def perform_fields_integral_sweep(sweep_path: str, max_workers: Union[int, None] = None) -> pd.DataFrame:
+    """
+    Calculates fields integrals of changed or new points of the sweep in a process pool.
+    :return: consolidated table of all points
+    """
+    manifest_path = os.path.join(sweep_path, SWEEP_MANIFEST_NAME)
+    manifest = load_sweep_manifest(manifest_path)
+    point_paths = list_sweep_points(sweep_path)
+    point_digests = {os.path.basename(point_path): sweep_point_digest(point_path) for point_path in point_paths}
+    changed_point_paths = [point_path for point_path in point_paths
+                           if manifest.get(os.path.basename(point_path), {}).get('digest') !=
+                           point_digests[os.path.basename(point_path)]]
+    print(f'Sweep points: {len(point_paths)}, to calculate: {len(changed_point_paths)}')
+    if changed_point_paths:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for point_path, rows in zip(changed_point_paths, executor.map(calculate_sweep_point, changed_point_paths)):
+                point_name = os.path.basename(point_path)
+                # Digest is updated after calculation in case extractor leaves derived files in the point
+                point_digests[point_name] = sweep_point_digest(point_path)
+                manifest[point_name] = {'digest': point_digests[point_name], 'rows': rows}
+    # Removed points are not kept
+    manifest = {point_name: manifest[point_name] for point_name in point_digests}
+    create_dir(manifest_path)
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    rows = [row for point in manifest.values() for row in point['rows']]
+    sweep_table = pd.DataFrame(rows, columns=SWEEP_TABLE_COLUMNS).sort_values(['udrm', 'stage'], ignore_index=True)
+    sweep_table.to_csv(os.path.join(sweep_path, SWEEP_TABLE_NAME), index=False)
+    return sweep_table
+
+
+def run_fields_integral_sweep(config: Config):
+    sweep_table = perform_fields_integral_sweep(config.paths.result.temporary.sweep)
+    print(sweep_table.to_string())
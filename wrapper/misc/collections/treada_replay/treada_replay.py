@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Replay stand-in of "TreadaTx_C.exe", which allows to run and benchmark the launcher without the real solver
+(for example on Linux). Set the path to this file as "exe" in config.json ("paths": {"treada_core": ...}).
+
+Like the real program it works in its own directory: reads MTUT file from there and writes
+temporary distribution files there. Behaviour depends on MTUT variables:
+    1) CKLKRS equal to small signal info stage number (4 by default) - small signal info stage.
+       Header data and tables of S and Y parameters are printed after each Enter command from stdin.
+       Log-spaced frequencies are set by FMIN, FMAX (GHz) and NFREQ variables if MTUT contains them
+    2) Otherwise - transient stage. Synthetic source current lines are printed (current relaxes to
+       a dark or light level depending on ILUMEN). Each TIME steps the distribution files are rewritten
+       and the temporary results marker is printed.
+If a recording of raw Treada output is set, it is replayed instead of synthetic transient output.
+
+Options can be passed by command line arguments or by environment variables
+(the launcher runs the executable without arguments):
+    TREADA_REPLAY_RECORDING - path to recorded raw output file
+    TREADA_REPLAY_RATE - output lines per second (0 - as fast as possible)
+    TREADA_REPLAY_STEPS - number of transient steps (0 - infinite)
+    TREADA_REPLAY_SEED - seed of synthetic noise
+    TREADA_REPLAY_INFO_STAGE - CKLKRS value of small signal info stage
+    TREADA_REPLAY_FREQUENCIES - number of frequencies in small signal tables
+
+Only the standard library is used to keep the startup time of the stand-in small.
+"""
+import argparse
+import cmath
+import math
+import os
+import random
+import sys
+import time
+from typing import Dict, Iterable, Union
+
+
+DUMP_MARKER = 'TIME STEPS WERE MADE WITH STEP LENGTH HT'
+DISTRIBUTION_FILENAMES = ('MSRS', 'MTDRIV', 'MTOKI', 'MTOV')
+# MTUT variables of small signal frequencies: range (GHz) and number of frequencies
+FREQUENCY_RANGE_VARS = ('FMIN', 'FMAX', 'NFREQ')
+DEFAULT_FREQUENCY_RANGE = (1e-3, 1e2)
+# Titles of small signal tables. Each row consists of frequency and real, imaginary parts of two parameters
+SMALL_SIGNAL_TABLES = (('S11', 'S12'), ('S21', 'S22'), ('Y21', 'Y22'))
+
+# Synthetic device model
+DARK_CURRENT = 1.2e-4
+LIGHT_CURRENT = 3.4e-2
+RELAXATION_STEPS = 2000
+NOISE_LEVEL = 1e-7
+OUTPUT_RESISTANCE = 1.5e3
+CAPACITANCE = 2.5e-12
+WAVE_RESISTANCE = 50.
+
+
+def main():
+    args = parse_args()
+    working_dir = os.path.abspath(args.working_dir or os.getcwd())
+    mtut_vars = load_mtut_vars(os.path.join(working_dir, 'MTUT'))
+    replay = TreadaReplay(working_dir, mtut_vars, rate=args.rate, seed=args.seed)
+    try:
+        if stage_number(mtut_vars) == args.info_stage:
+            replay.small_signal_info(args.frequencies)
+        elif args.recording:
+            replay.recorded(args.recording)
+        else:
+            replay.transient(args.steps)
+        replay.flush()
+    except (BrokenPipeError, KeyboardInterrupt):
+        # Launcher stopped reading the output
+        sys.stderr.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Replay stand-in of TreadaTx_C.exe')
+    parser.add_argument('--recording', default=os.environ.get('TREADA_REPLAY_RECORDING'),
+                        help='path to recorded raw Treada output, which is replayed instead of synthetic one')
+    parser.add_argument('--rate', type=float, default=float(os.environ.get('TREADA_REPLAY_RATE', 0)),
+                        help='output lines per second, 0 - as fast as possible')
+    parser.add_argument('--steps', type=int, default=int(os.environ.get('TREADA_REPLAY_STEPS', 20000)),
+                        help='number of synthetic transient steps, 0 - infinite')
+    parser.add_argument('--seed', type=int, default=int(os.environ.get('TREADA_REPLAY_SEED', 0)))
+    parser.add_argument('--info-stage', type=int, default=int(os.environ.get('TREADA_REPLAY_INFO_STAGE', 4)),
+                        help='CKLKRS value of small signal info stage')
+    parser.add_argument('--frequencies', type=int, default=int(os.environ.get('TREADA_REPLAY_FREQUENCIES', 20)),
+                        help='number of frequencies in small signal tables')
+    parser.add_argument('--working-dir', default=None,
+                        help='directory with MTUT file, current working directory by default')
+    return parser.parse_args(argv)
+
+
+def load_mtut_vars(mtut_path: str) -> Dict[str, str]:
+    """
+    Loads "NAME value" lines of MTUT file to a dictionary. Values are not cast.
+    """
+    mtut_vars = dict()
+    with open(mtut_path, 'r') as mtut_file:
+        for line in mtut_file:
+            parts = line.split(None, 1)
+            if len(parts) == 2 and not line[0].isspace() and not line.startswith('*'):
+                mtut_vars.setdefault(parts[0], parts[1].strip('\n =').strip())
+    return mtut_vars
+
+
+def write_synthetic_mtut(mtut_path: str, **mtut_vars):
+    """
+    Writes a minimal MTUT file that is enough for the launcher and the replay stand-in.
+    :param mtut_path: path to new MTUT file
+    :param mtut_vars: variables that override defaults
+    """
+    default_vars = {
+        'TIME': '1000',
+        'TSTEP': '1.E-3',
+        'ILUMEN': '0',
+        'CKLKRS': '1.',
+        'KEY': '1',
+        'JPUSH': '0',
+        'UDRM': '10.',
+        'RTEMP': '300.',
+        'RIMPUR': '1.E15',
+        'REPSI': '12.9',
+        'RMOB': '8500.',
+        'CMOB2IL': '8500., 400.',
+        'TSTEPH': '1.E-4',
+        'NMBPZ0': '10',
+        'WIDTH': '100.',
+        'HY': '1(0.5)',
+        'EMINI': '1.42',
+        'EMAXI': '1.6',
+        'DRSTP': '0.1',
+        # Multiline variable, which is ended by "*" line
+        'HX': ['100(0.1)', '500(0.01)'],
+    }
+    default_vars.update(mtut_vars)
+    with open(mtut_path, 'w') as mtut_file:
+        for name, value in default_vars.items():
+            if isinstance(value, (list, tuple)):
+                mtut_file.write(f'{name:<8}{value[0]}\n')
+                mtut_file.writelines(f'{"":<8}{line_value}\n' for line_value in value[1:])
+                mtut_file.write('*\n')
+            else:
+                mtut_file.write(f'{name:<8}{value}\n')
+
+
+def stage_number(mtut_vars: Dict[str, str]) -> Union[int, None]:
+    try:
+        return int(float(mtut_vars['CKLKRS']))
+    except (KeyError, ValueError):
+        return None
+
+
+def relative_time(mtut_vars: Dict[str, str]) -> float:
+    """
+    Calculates relative time (ps) the same way as data_management.calculate_relative_time().
+    Returns 1. if MTUT does not contain relative units.
+    """
+    try:
+        temperature, concentration, permittivity, mobility = (
+            float(mtut_vars[name]) for name in ('RTEMP', 'RIMPUR', 'REPSI', 'RMOB')
+        )
+    except (KeyError, ValueError):
+        return 1.
+    rp = -1.380662e-4 * temperature / 1.6021892
+    relative_l = math.sqrt(permittivity * temperature * 1.380662e12 / (4 * math.pi * 4.803242**2 * concentration))
+    relative_e = -rp / relative_l * 10
+    relative_v = relative_e * mobility * 1e3
+    return 1e8 * relative_l / relative_v
+
+
+class LinePacer:
+    """
+    Keeps the output line rate. Sleeps only when the output is ahead of the schedule,
+    so the rate is kept on average without a sleep call on each line.
+    """
+    def __init__(self, rate: float):
+        self.period = 1 / rate if rate > 0 else 0.
+        self.start_time = time.perf_counter()
+        self.lines_number = 0
+
+    def wait(self) -> bool:
+        """
+        Must be called before each output line. Returns True if the output must be flushed (pacer slept).
+        """
+        self.lines_number += 1
+        if not self.period:
+            return False
+        ahead_time = self.start_time + self.lines_number * self.period - time.perf_counter()
+        if ahead_time > 0.01:
+            time.sleep(ahead_time)
+            return True
+        return False
+
+
+class TreadaReplay:
+    """
+    Prints Treada-like output to stdout.
+
+    Attributes:
+        working_dir: directory, where distribution files are written
+        mtut_vars: loaded MTUT variables
+    Methods:
+        transient(steps_number)
+        recorded(recording_path)
+        small_signal_info(frequencies_number)
+    """
+    def __init__(self, working_dir: str, mtut_vars: Dict[str, str], rate: float = 0., seed: int = 0):
+        self.working_dir = working_dir
+        self.mtut_vars = mtut_vars
+        self.pacer = LinePacer(rate)
+        self.random = random.Random(seed)
+        self.dumps_number = 0
+
+    def emit(self, line: str):
+        if self.pacer.wait():
+            sys.stdout.write(line + '\n')
+            self.flush()
+        else:
+            sys.stdout.write(line + '\n')
+
+    @staticmethod
+    def flush():
+        sys.stdout.flush()
+
+    def header(self):
+        self.emit(' TREADA REPLAY STAND-IN')
+        self.emit(f' STAGE NUMBER: {self.mtut_vars.get("CKLKRS", "")}')
+        self.emit('RELATIVE UNITES:')
+        self.emit(f'TIME:  {relative_time(self.mtut_vars):.6E}')
+
+    def transient(self, steps_number: int):
+        """
+        Prints synthetic transient output.
+        :param steps_number: number of steps, 0 - infinite
+        """
+        self.header()
+        time_step = float(self.mtut_vars.get('TSTEP', 1e-3))
+        dump_interval = int(float(self.mtut_vars.get('TIME', 0)))
+        is_light = bool(float(self.mtut_vars.get('ILUMEN', 0)))
+        target_current, initial_current = (LIGHT_CURRENT, DARK_CURRENT) if is_light else (DARK_CURRENT, LIGHT_CURRENT)
+        step = 0
+        while not steps_number or step < steps_number:
+            step += 1
+            current = (target_current + (initial_current - target_current) * math.exp(-step / RELAXATION_STEPS) +
+                       self.random.gauss(0., NOISE_LEVEL))
+            self.emit(self.currents_line(current, step))
+            if dump_interval > 0 and step % dump_interval == 0:
+                self.dump_distributions(step, step * time_step)
+                self.emit(f' {step} {DUMP_MARKER}= {time_step:.4E}')
+                self.emit(' TEMPORARY RESULTS ARE WRITTEN')
+
+    def currents_line(self, source_current: float, step: int) -> str:
+        """
+        Builds the line of currents in the format of Treada output (12 columns separated by single spaces).
+        """
+        other_currents = [source_current * (0.1 * column + self.random.random() * 1e-3) for column in range(10)]
+        return ' ' + ' '.join([f'{source_current:.6E}', f'{step}.'] + [f'{value:.6E}' for value in other_currents])
+
+    def recorded(self, recording_path: str):
+        """
+        Replays recorded raw output. Distribution files are rewritten before each temporary results marker.
+        """
+        with open(recording_path, 'r') as recording_file:
+            for line in recording_file:
+                if DUMP_MARKER in line:
+                    self.dump_distributions(self.dumps_number, 0.)
+                self.emit(line.rstrip('\n'))
+
+    def dump_distributions(self, step: int, transient_time: float):
+        """
+        Rewrites fake distribution files in working directory like Treada does with temporary results.
+        """
+        self.dumps_number += 1
+        for file_name in DISTRIBUTION_FILENAMES:
+            with open(os.path.join(self.working_dir, file_name), 'w') as distribution_file:
+                distribution_file.write(f'{file_name} REPLAY DUMP {self.dumps_number}\n'
+                                        f'STEP {step}\nTIME {transient_time:.6E}\n')
+
+    def small_signal_info(self, frequencies_number: int):
+        """
+        Prints small signal info stage output. Tables are printed after Enter command,
+        the program exits after the next Enter command or when stdin is closed.
+        """
+        self.header()
+        self.emit(f' DIFFERENTIAL OUTPUT RESISTANCE =  {OUTPUT_RESISTANCE:.6E}')
+        self.emit(f' CDOM-DOMAIN CAPACITANCE =  {CAPACITANCE:.6E}')
+        self.emit(' PRESS ENTER TO CONTINUE')
+        self.flush()
+        if not sys.stdin.readline():
+            return
+        frequencies = self.frequencies(frequencies_number)
+        for title in SMALL_SIGNAL_TABLES:
+            self.emit(f'    FREQUENCY        {title[0]}                      {title[1]}')
+            for frequency in frequencies:
+                values = small_signal_params(frequency)
+                row = [frequency]
+                for param in title:
+                    row += [values[param].real, values[param].imag]
+                self.emit('  '.join(f'{value:.6E}' for value in row))
+            self.emit('')
+        self.emit(' PRESS ENTER TO EXIT')
+        self.flush()
+        sys.stdin.readline()
+
+    def frequencies(self, frequencies_number: int) -> Iterable[float]:
+        """
+        :param frequencies_number: number of frequencies, which is used if it is not set in MTUT
+        """
+        start_name, stop_name, number_name = FREQUENCY_RANGE_VARS
+        start = float(self.mtut_vars.get(start_name, DEFAULT_FREQUENCY_RANGE[0]))
+        stop = float(self.mtut_vars.get(stop_name, DEFAULT_FREQUENCY_RANGE[1]))
+        number = int(float(self.mtut_vars.get(number_name, frequencies_number)))
+        return log_space(start, stop, number)
+
+
+def log_space(start: float, stop: float, number: int) -> Iterable[float]:
+    if number < 2:
+        return [start]
+    ratio = (stop / start) ** (1 / (number - 1))
+    return [start * ratio**index for index in range(number)]
+
+
+def small_signal_params(frequency: float) -> Dict[str, complex]:
+    """
+    Parameters of parallel RC circuit, which is used as a synthetic device.
+    :param frequency: frequency in GHz (like in Treada output)
+    """
+    impedance = OUTPUT_RESISTANCE / complex(1, 2 * math.pi * frequency * 1e9 * OUTPUT_RESISTANCE * CAPACITANCE)
+    admittance = 1 / impedance
+    reflection = (impedance - WAVE_RESISTANCE) / (impedance + WAVE_RESISTANCE)
+    transmission = 2 * cmath.sqrt(impedance * WAVE_RESISTANCE) / (impedance + WAVE_RESISTANCE)
+    return {
+        'S11': reflection, 'S22': reflection,
+        'S12': transmission, 'S21': transmission,
+        'Y21': -admittance, 'Y22': admittance,
+    }
+
+
+if __name__ == '__main__':
+    main()
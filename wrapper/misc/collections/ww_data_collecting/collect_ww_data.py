@@ -5,8 +5,8 @@ import time
 import weakref
 from time import sleep
 from typing import Dict, Union, List
-import subprocess
 
+import numpy as np
 import pandas as pd
 from PySide6.QtCore import QObject, Slot, Signal, QThread
 from PySide6.QtWidgets import QApplication
@@ -16,8 +16,12 @@ project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.s
 sys.path.append(project_path)
 
 from wrapper.config.config_build import load_config, Config
-from wrapper.ui.plotting import WWDataPlotter
+from wrapper.ui.plotting import WWDataPlotter, WWDataOverlayPlotter, WWDataAnimationPlotter, WWGridPlotter
 from wrapper.misc.collections.ww_data_collecting.ui.main_window import MainWindow
+from wrapper.misc.collections.ww_data_collecting.ww_dataset import WWDataset
+from wrapper.misc.collections.ww_data_collecting.ww_extraction import WWExtractor
+from wrapper.misc.collections.ww_data_collecting.ww_file_cache import ww_file_cache
+from wrapper.misc.collections.ww_data_collecting.ww_grid import WWGridSeries
 
 
 def main():
@@ -28,6 +32,11 @@ def main():
 def run_ww_collecting(config: Config):
     ww_descriptions_path = os.path.join(config.paths.resources, 'ww_descriptions.csv')
     ww_data_collector = WWDataCollector(ww_descriptions_path, config.paths.result.temporary.distributions)
+    # Parsed WW files are also kept on disk if memoization of analysis results is enabled
+    memoization_settings = config.advanced_settings.result.memoization
+    ww_file_cache.configure(cache_dir=(os.path.join(config.paths.result.cache, 'ww')
+                                       if memoization_settings.enable else None),
+                            disk_max_size_mb=memoization_settings.max_size_mb)
     if len(sys.argv) < 3:
         user_interactor = WWDataCmdUserInteractor(ww_data_collector)
     elif '--gui' in sys.argv:
@@ -52,18 +61,33 @@ class WWDataCollector:
         return df
 
     @staticmethod
-    def extract_ww_data(data_folder_path: str):
-        script_path = os.path.dirname((os.path.abspath(__file__)))
-
-        cwd_paths = [os.path.join(data_folder_path, index_path) for index_path in os.listdir(data_folder_path)]
-        exe_path = os.path.join(script_path, 'SplViewLQ.exe')
+    def extract_ww_data(data_folder_path: str, ignore_existence=False,
+                        extractor: Union[WWExtractor, None] = None, consolidate=True) -> int:
+        """
+        Extracts WW data of missing or stale snapshots of the stage in parallel.
+        :param data_folder_path: path to the stage folder of distributions
+        :param ignore_existence: extract all snapshots, even fresh ones
+        :param extractor: configured extractor (number of workers, progress callback)
+        :param consolidate: pack WW data of the stage to the consolidated dataset after extraction
+        :return: number of extracted snapshots
+        """
+        extractor = extractor or WWExtractor()
+        extracted_number = extractor.extract_stage(data_folder_path, ignore_existence=ignore_existence)
+        if consolidate:
+            WWDataCollector.consolidate_ww_data(data_folder_path)
+        return extracted_number
 
-        for working_directory_path in cwd_paths:
-            try:
-                subprocess.run(exe_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                               cwd=working_directory_path)
-            except FileNotFoundError:
-                print('Executable file not found, Path:', exe_path)
+    @staticmethod
+    def consolidate_ww_data(data_folder_path: str) -> Union[WWDataset, None]:
+        """
+        Packs WW data of the stage to the consolidated dataset if it does not exist or it is stale.
+        :return: dataset or None if there is no WW data in the stage folder
+        """
+        try:
+            return WWDataset.load_or_consolidate(data_folder_path)
+        except ValueError as error:
+            print(error)
+            return None
 
     @staticmethod
     def _construct_ww_folder_path(stage_dir_name: str, ww_dir_index: int, ww_file_ind: int) -> str:
@@ -73,24 +97,25 @@ class WWDataCollector:
 
     @classmethod
     def load_ww_data(cls, abs_res_path: str, stage_dir_name: str, ww_dir_indexes: list, ww_aliases: Dict[int, str]) -> dict:
-        ww_data_dict = {}
-        for ww_dir_index in ww_dir_indexes:
-            ww_dir_index = int(ww_dir_index)
-            ww_data_dict[ww_dir_index] = {}
-            for ww_file_ind, ww_name in ww_aliases.items():
-                relative_ww_data_path = cls._construct_ww_folder_path(stage_dir_name, ww_dir_index, ww_file_ind)
-                full_ww_path = os.path.join(abs_res_path, relative_ww_data_path)
-                # Index in extracted from data_folder paths list
-                ww_dataframe = pd.read_csv(full_ww_path, sep='\s+')
-                ww_dataframe.columns = ['x', 'y', ww_name]
-                # Discard tail
-                ww_dataframe = ww_dataframe.loc[ww_dataframe['y'] == 0.]
-                ww_data_dict[ww_dir_index][ww_file_ind] = ww_dataframe
+        # Slices of consolidated dataset are read without parsing of WW files.
+        # WW files are checked on extraction, which consolidates stale dataset, so only snapshots are checked here
+        ww_dataset = WWDataset.open(os.path.join(abs_res_path, stage_dir_name), check_freshness=False)
+        if ww_dataset and ww_dataset.has(ww_dir_indexes, list(ww_aliases)):
+            return ww_dataset.to_ww_dict(ww_dir_indexes, ww_aliases)
+        ww_files = [(int(ww_dir_index), ww_file_ind, ww_name)
+                    for ww_dir_index in ww_dir_indexes for ww_file_ind, ww_name in ww_aliases.items()]
+        full_ww_paths = [os.path.join(abs_res_path, cls._construct_ww_folder_path(stage_dir_name, *ww_file[:2]))
+                         for ww_file in ww_files]
+        # Parsed files are cached, missed ones are parsed in parallel
+        ww_arrays = ww_file_cache.get_many(full_ww_paths)
+        ww_data_dict = {int(ww_dir_index): {} for ww_dir_index in ww_dir_indexes}
+        for (ww_dir_index, ww_file_ind, ww_name), (x, values) in zip(ww_files, ww_arrays):
+            ww_data_dict[ww_dir_index][ww_file_ind] = pd.DataFrame({'x': x, 'y': np.zeros_like(x), ww_name: values})
         return ww_data_dict
 
     @staticmethod
     def is_ww_data_exists(stage_folder_path: str):
-        index_path = next(iter(os.listdir(stage_folder_path)))
+        index_path = next(filter(str.isdigit, os.listdir(stage_folder_path)))
         ww_path = os.path.join(stage_folder_path, index_path)
         file_names = os.listdir(ww_path)
         for file_name in file_names:
@@ -101,15 +126,12 @@ class WWDataCollector:
     def extract_stages_ww_data(self, distributions_path: str, ignore_existence=False):
         for stage_folder_path in os.listdir(distributions_path):
             stage_folder_path = os.path.join(distributions_path, stage_folder_path)
-            if ignore_existence:
-                self.extract_ww_data(stage_folder_path)
-            else:
-                if not self.is_ww_data_exists(stage_folder_path):
-                    self.extract_ww_data(stage_folder_path)
+            # Only missing or stale snapshots are extracted if existence is not ignored
+            self.extract_ww_data(stage_folder_path, ignore_existence=ignore_existence)
 
     def list_stage_dir_indexes(self, stage_name: str) -> list:
         stage_folder_path = os.path.join(self.distributions_path, stage_name)
-        stage_data_index_strings: list = sorted(os.listdir(stage_folder_path), key=int)
+        stage_data_index_strings: list = sorted(filter(str.isdigit, os.listdir(stage_folder_path)), key=int)
         stage_data_indexes = [int(index_string) for index_string in stage_data_index_strings]
         return stage_data_indexes
 
@@ -122,6 +144,11 @@ class WWDataUserInteractor:
         self.data_collector = ww_data_collector
         self.is_add_to_exists = False
         self.is_log_scale = False
+        # 'lines' - line with legend per snapshot, 'overlay' - single colored collection, 'animation' - animation,
+        # 'grid' - heatmap of 2-D data
+        self.plot_mode = 'lines'
+        # Maximum (y points, x points) of heatmap on the screen
+        self.grid_screen_shape = (400, 800)
 
     def _input_stage_name(self, stage_name=''):
         if stage_name in os.listdir(self.data_collector.distributions_path):
@@ -142,22 +169,39 @@ class WWDataUserInteractor:
              ww_number: int,
              df_col_name: str,
              backend='TkAgg') -> dict:
+        if self.plot_mode == 'grid':
+            # Heatmap is always plotted in a new window
+            self.plot_mode = 'lines'
+            self.is_add_to_exists = False
+            self.plot_grid(stage_name, ww_dir_numbers_list, ww_number, df_col_name, backend)
+            return {}
         ww_dict = self.data_collector.load_ww_data(abs_res_path=self.data_collector.distributions_path,
                                                    stage_dir_name=stage_name,
                                                    ww_dir_indexes=ww_dir_numbers_list,
                                                    ww_aliases={ww_number: df_col_name})
 
         ww_description = self.data_collector.descriptions['description'].loc[ww_number]
-        if self.is_add_to_exists:
+        plot_mode, self.plot_mode = self.plot_mode, 'lines'
+        if self.is_add_to_exists and plot_mode != 'animation':
             self.is_add_to_exists = False
-            if hasattr(self, 'ww_data_plotter'):
-                self.ww_data_plotter.interactive_mode_enable()
-                legends_list = self.ww_data_plotter.add_bulk_plots(ww_dict, stage_name)
-                self.ww_data_plotter.legend(legends_list)
+            ww_data_plotter = getattr(self, 'ww_data_plotter', None)
+            if isinstance(ww_data_plotter, WWDataOverlayPlotter):
+                WWDataPlotter.interactive_mode_enable()
+                ww_data_plotter.add_bulk_plots(ww_dict, stage_name)
+            elif isinstance(ww_data_plotter, WWDataPlotter):
+                ww_data_plotter.interactive_mode_enable()
+                legends_list = ww_data_plotter.add_bulk_plots(ww_dict, stage_name)
+                ww_data_plotter.legend(legends_list)
+            elif ww_data_plotter is not None:
+                # Animation and heatmap do not support adding of data
+                print('Plot object does not support adding. Adding unavailable.')
             else:
                 print('Plot object not exists. Adding unavailable.')
         else:
-            self.ww_data_plotter = WWDataPlotter(ww_dict, stage_name, backend=backend)
+            self.is_add_to_exists = False
+            plotter_class = {'overlay': WWDataOverlayPlotter,
+                             'animation': WWDataAnimationPlotter}.get(plot_mode, WWDataPlotter)
+            self.ww_data_plotter = plotter_class(ww_dict, stage_name, backend=backend)
             self.ww_data_plotter.set_plot_axes_labels(x_label='x', y_label=ww_description)
             if df_col_name:
                 self.ww_data_plotter.set_plot_title(df_col_name)
@@ -168,6 +212,21 @@ class WWDataUserInteractor:
             self.ww_data_plotter.show(block=False)
         return ww_dict
 
+    def plot_grid(self, stage_name: str, ww_dir_numbers_list: list, ww_number: int, df_col_name: str,
+                  backend='TkAgg'):
+        """
+        Plots heatmap of 2-D WW data with a slider for scrubbing through selected snapshots.
+        """
+        ww_grids = WWGridSeries.load(os.path.join(self.data_collector.distributions_path, stage_name),
+                                     steps=ww_dir_numbers_list, ww_number=ww_number)
+        values, x, y = ww_grids.downsampled(self.grid_screen_shape)
+        self.ww_data_plotter = WWGridPlotter(values, x, y, ww_grids.steps, stage_name, backend=backend)
+        self.ww_data_plotter.set_plot_axes_labels(x_label='x', y_label='y')
+        self.ww_data_plotter.fig.suptitle(self.data_collector.descriptions['description'].loc[ww_number])
+        if df_col_name:
+            self.ww_data_plotter.fig.canvas.manager.set_window_title(df_col_name)
+        self.ww_data_plotter.show(block=False)
+
     def run(self):
         """
         Method to run user interactor application in cmd or interface mode.
@@ -292,12 +351,25 @@ class WWDataCmdUserInteractor(WWDataUserInteractor):
                 ww_folder_path = self._input_ww_folder_path()
                 self.data_collector.extract_ww_data(ww_folder_path)
                 return 1
+            elif input_string == '--consolidate':
+                ww_folder_path = self._input_ww_folder_path()
+                self.data_collector.consolidate_ww_data(ww_folder_path)
+                return 1
             elif input_string == '--add':
                 self.is_add_to_exists = True
                 return 1
             elif input_string == '--log':
                 self.is_log_scale = True
                 return 1
+            elif input_string == '--overlay':
+                self.plot_mode = 'overlay'
+                return 1
+            elif input_string == '--animate':
+                self.plot_mode = 'animation'
+                return 1
+            elif input_string == '--grid':
+                self.plot_mode = 'grid'
+                return 1
             else:
                 print('Wrong command.', end='\n\n')
                 return -1
@@ -321,8 +393,12 @@ class WWDataCmdUserInteractor(WWDataUserInteractor):
     def _print_help():
         print(f'--help     Справка по всем командам.\n'
               f'--extract  Извлечь WW-файлы распределений из файлов промежуточных результатов.\n'
+              f'--consolidate  Упаковать WW-файлы этапа в единый набор данных для быстрой загрузки.\n'
               f'--add      Добавить данные на существующий график.\n'
               f'--log      Установить логарифмическую шкалу по оси - y при создании графика.\n'
+              f'--overlay  Отобразить множество снимков одной цветной коллекцией линий (цвет - номер шага).\n'
+              f'--animate  Показать анимацию распределения по снимкам.\n'
+              f'--grid     Показать двумерное распределение (тепловую карту) с прокруткой по снимкам.\n'
               f'--ww       Просмотр доступных номеров WW-файлов (распределений) и их описаний.', end='\n\n')
 
     @staticmethod
@@ -351,8 +427,14 @@ class ExtractWorker(QObject):
     @Slot(list)
     def extract_slot(self, extracting_paths_list):
         self.statusbar_message_signal.emit(f'Extracting...')
+        extractor = WWExtractor()
         for path in extracting_paths_list:
-            WWDataCollector.extract_ww_data(data_folder_path=path)
+            stage_name = os.path.basename(os.path.normpath(path))
+            extractor.progress_callback = (
+                lambda done, total, name=stage_name:
+                self.statusbar_message_signal.emit(f'Extracting {name}: {done}/{total}')
+            )
+            WWDataCollector.extract_ww_data(data_folder_path=path, extractor=extractor)
         self.statusbar_message_signal.emit('Extraction done!')
         time.sleep(3)
         self.statusbar_message_signal.emit('')
@@ -375,11 +457,13 @@ class InterfaceDataManager(QObject):
         # Set plot flags
         self.user_interactor.is_add_to_exists = plot_settings['is_add']
         self.user_interactor.is_log_scale = plot_settings['is_log']
+        plot_mode = plot_settings.get('mode', 'lines')
         # Unpack plot variables
         ww_number = plot_settings['ww_number']
         df_col_name = self.user_interactor.data_collector.descriptions['df_col_name'].loc[ww_number]
         # Plot data
         for stage_name, ww_dir_list in plot_settings['dirs'].items():
+            self.user_interactor.plot_mode = plot_mode
             self.user_interactor.plot(stage_name=stage_name,
                                       ww_dir_numbers_list=ww_dir_list,
                                       ww_number=ww_number,
@@ -0,0 +1,198 @@
+"""
+Consolidated WW dataset of a stage.
+WW data of all snapshots of a stage (rows with y == 0 of each WW<n>.DAT file) is packed once into a single
+memory-mapped array of shape (snapshots, WW numbers, x points) with a small JSON metadata sidecar,
+so slices are read without parsing of text files.
+
+Files in the stage folder ("distributions/<stage>/"):
+    ww_dataset.npy - values array (NaN if WW file of a snapshot is missing)
+    ww_dataset.json - snapshot steps, WW numbers, x coordinates and the newest source WW file mtime
+
+Dataset is stale if the set of snapshots is changed or any WW file is newer than the dataset.
+WW files are stated only by the full freshness check, which is done on extraction (consolidation) of the stage.
+Loads check the set of snapshots only, it is a single directory listing.
+
+How to use:
+    dataset = WWDataset.load_or_consolidate(stage_folder_path)
+    fields = dataset.profile(step=1000, ww_number=6)
+"""
+import json
+import os
+import re
+import tempfile
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+WW_DATASET_VERSION = 1
+WW_DATASET_ARRAY_NAME = 'ww_dataset.npy'
+WW_DATASET_META_NAME = 'ww_dataset.json'
+_WW_FILE_PATTERN = re.compile(r'^WW(\d+)\.DAT$')
+
+
+def read_ww_file(ww_file_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :return: x and values of the rows with y == 0 of WW file
+    """
+    ww_dataframe = pd.read_csv(ww_file_path, sep=r'\s+')
+    ww_data = ww_dataframe.values
+    ww_data = ww_data[ww_data[:, 1] == 0.]
+    return ww_data[:, 0], ww_data[:, 2]
+
+
+def scan_snapshot_steps(stage_folder_path: str) -> List[int]:
+    """
+    :return: sorted snapshot steps (names of snapshot directories)
+    """
+    return sorted(int(entry.name) for entry in os.scandir(stage_folder_path)
+                  if entry.is_dir() and entry.name.isdigit())
+
+
+def scan_stage_folder(stage_folder_path: str) -> Tuple[List[int], Dict[int, List[int]], float]:
+    """
+    :return: sorted snapshot steps, WW numbers of each snapshot, the newest WW file mtime
+    """
+    snapshot_ww_numbers = {}
+    newest_mtime = 0.
+    for snapshot_entry in os.scandir(stage_folder_path):
+        if not (snapshot_entry.is_dir() and snapshot_entry.name.isdigit()):
+            continue
+        ww_numbers = []
+        for entry in os.scandir(snapshot_entry.path):
+            ww_match = _WW_FILE_PATTERN.match(entry.name)
+            if ww_match:
+                ww_numbers.append(int(ww_match.group(1)))
+                newest_mtime = max(newest_mtime, entry.stat().st_mtime)
+        snapshot_ww_numbers[int(snapshot_entry.name)] = sorted(ww_numbers)
+    return sorted(snapshot_ww_numbers), snapshot_ww_numbers, newest_mtime
+
+
+class WWDataset:
+    """
+    Attributes:
+        stage_folder_path: path to the stage folder of distributions
+        steps: snapshot steps (names of snapshot directories)
+        ww_numbers: numbers of WW files
+        x: x coordinates of profiles
+        values: memory-mapped array (snapshots, WW numbers, x points)
+    Methods:
+        consolidate(stage_folder_path: str) -> WWDataset
+        open(stage_folder_path: str, check_freshness=True) -> Union[WWDataset, None]
+        load_or_consolidate(stage_folder_path: str) -> WWDataset
+        has(steps: list, ww_numbers: list) -> bool
+        profile(step: int, ww_number: int) -> np.ndarray
+        profiles(steps: list, ww_number: int) -> np.ndarray
+        to_ww_dict(steps: list, ww_aliases: Dict[int, str]) -> dict
+    """
+    def __init__(self, stage_folder_path: str, meta: dict, values: np.ndarray):
+        self.stage_folder_path = stage_folder_path
+        self.steps: List[int] = meta['steps']
+        self.ww_numbers: List[int] = meta['ww_numbers']
+        self.x = np.asarray(meta['x'], dtype=np.float64)
+        self.source_mtime: float = meta['source_mtime']
+        self.values = values
+        self.step_positions = {step: position for position, step in enumerate(self.steps)}
+        self.ww_positions = {ww_number: position for position, ww_number in enumerate(self.ww_numbers)}
+
+    @staticmethod
+    def paths(stage_folder_path: str) -> Tuple[str, str]:
+        return (os.path.join(stage_folder_path, WW_DATASET_ARRAY_NAME),
+                os.path.join(stage_folder_path, WW_DATASET_META_NAME))
+
+    @classmethod
+    def consolidate(cls, stage_folder_path: str) -> 'WWDataset':
+        """
+        Packs WW files of all snapshots of the stage to the dataset.
+        :raises ValueError: if there are no WW files or x points of WW files are different
+        """
+        steps, snapshot_ww_numbers, source_mtime = scan_stage_folder(stage_folder_path)
+        ww_numbers = sorted(set().union(*snapshot_ww_numbers.values()))
+        if not ww_numbers:
+            raise ValueError(f'There are no WW files in "{stage_folder_path}"')
+        array_path, meta_path = cls.paths(stage_folder_path)
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=stage_folder_path)
+        os.close(file_descriptor)
+        values = x = None
+        try:
+            for step_position, step in enumerate(steps):
+                for ww_number in snapshot_ww_numbers[step]:
+                    ww_file_path = os.path.join(stage_folder_path, str(step), f'WW{ww_number}.DAT')
+                    ww_x, ww_values = read_ww_file(ww_file_path)
+                    if values is None:
+                        x = ww_x
+                        values = np.lib.format.open_memmap(temporary_path, mode='w+', dtype=np.float64,
+                                                           shape=(len(steps), len(ww_numbers), len(x)))
+                        values[:] = np.nan
+                    if len(ww_x) != len(x):
+                        raise ValueError(f'Number of x points of "{ww_file_path}" differs from the dataset')
+                    values[step_position, ww_numbers.index(ww_number)] = ww_values
+            values.flush()
+            del values
+            os.replace(temporary_path, array_path)
+        except BaseException:
+            values = None
+            os.remove(temporary_path)
+            raise
+        meta = {'version': WW_DATASET_VERSION, 'steps': steps, 'ww_numbers': ww_numbers, 'x': x.tolist(),
+                'source_mtime': source_mtime}
+        with open(meta_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        return cls(stage_folder_path, meta, np.load(array_path, mmap_mode='r'))
+
+    @classmethod
+    def open(cls, stage_folder_path: str, check_freshness=True) -> Union['WWDataset', None]:
+        """
+        :param check_freshness: check that WW files are not changed after consolidation (each file is stated).
+        The set of snapshots is checked anyway.
+        :return: dataset or None if it does not exist or it is stale
+        """
+        array_path, meta_path = cls.paths(stage_folder_path)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            values = np.load(array_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != WW_DATASET_VERSION:
+            return None
+        if check_freshness:
+            steps, _, source_mtime = scan_stage_folder(stage_folder_path)
+            if steps != meta['steps'] or source_mtime > meta['source_mtime']:
+                return None
+        elif scan_snapshot_steps(stage_folder_path) != meta['steps']:
+            return None
+        return cls(stage_folder_path, meta, values)
+
+    @classmethod
+    def load_or_consolidate(cls, stage_folder_path: str) -> 'WWDataset':
+        return cls.open(stage_folder_path) or cls.consolidate(stage_folder_path)
+
+    def has(self, steps: list, ww_numbers: list) -> bool:
+        return (all(int(step) in self.step_positions for step in steps) and
+                all(int(ww_number) in self.ww_positions for ww_number in ww_numbers))
+
+    def profile(self, step: int, ww_number: int) -> np.ndarray:
+        return self.values[self.step_positions[int(step)], self.ww_positions[int(ww_number)]]
+
+    def profiles(self, steps: list, ww_number: int) -> np.ndarray:
+        """
+        :return: array (steps, x points) of WW profiles
+        """
+        step_positions = [self.step_positions[int(step)] for step in steps]
+        return self.values[step_positions, self.ww_positions[int(ww_number)]]
+
+    def to_ww_dict(self, steps: list, ww_aliases: Dict[int, str]) -> dict:
+        """
+        :return: WW data in the format of WWDataCollector.load_ww_data()
+        """
+        ww_data_dict = {}
+        y = np.zeros_like(self.x)
+        for step in steps:
+            step = int(step)
+            ww_data_dict[step] = {}
+            for ww_number, ww_name in ww_aliases.items():
+                ww_data_dict[step][ww_number] = pd.DataFrame({'x': self.x, 'y': y,
+                                                              ww_name: self.profile(step, ww_number)})
+        return ww_data_dict
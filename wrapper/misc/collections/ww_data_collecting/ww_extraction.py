@@ -0,0 +1,96 @@
+"""
+Incremental extraction of WW data (WW*.DAT files) from distribution snapshots by SplViewLQ.exe.
+Snapshot is a directory of preserved Treada's temporary files ("distributions/<stage>/<step>/").
+Snapshot is fresh if it has WW files which are not older than its source distribution files,
+so only missing or stale snapshots are extracted. Extractor processes are run by a bounded pool.
+
+How to use:
+    extractor = WWExtractor(max_workers=4, progress_callback=lambda done, total: print(done, total))
+    extractor.extract_stage(stage_folder_path)
+"""
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Union
+
+from wrapper.core.treada_io_handling import build_exe_command
+
+
+EXTRACTOR_EXE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SplViewLQ.exe')
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class WWExtractor:
+    """
+    Attributes:
+        exe_path: path to SplViewLQ.exe (or to its python stand-in)
+        max_workers: maximum number of simultaneously running extractor processes
+        progress_callback: is called by (extracted snapshots number, snapshots to extract number)
+    Methods:
+        is_snapshot_fresh(snapshot_path: str) -> bool
+        list_stale_snapshots(stage_folder_path: str) -> List[str]
+        extract_stage(stage_folder_path: str, ignore_existence=False) -> int
+        extract_snapshots(snapshot_paths: List[str]) -> int
+    """
+    def __init__(self, exe_path=EXTRACTOR_EXE_PATH, max_workers=DEFAULT_MAX_WORKERS,
+                 progress_callback: Union[Callable[[int, int], None], None] = None):
+        self.exe_path = exe_path
+        self.max_workers = max(int(max_workers), 1)
+        self.progress_callback = progress_callback
+
+    @staticmethod
+    def list_snapshots(stage_folder_path: str) -> List[str]:
+        return [entry.path for entry in os.scandir(stage_folder_path) if entry.is_dir()]
+
+    @staticmethod
+    def is_snapshot_fresh(snapshot_path: str) -> bool:
+        """
+        :return: are there WW files which are not older than source distribution files in the snapshot
+        """
+        ww_mtimes = []
+        source_mtimes = []
+        for entry in os.scandir(snapshot_path):
+            if entry.is_file():
+                mtimes = ww_mtimes if entry.name.startswith('WW') else source_mtimes
+                mtimes.append(entry.stat().st_mtime)
+        return bool(ww_mtimes) and min(ww_mtimes) >= max(source_mtimes, default=0.)
+
+    def list_stale_snapshots(self, stage_folder_path: str) -> List[str]:
+        return [snapshot_path for snapshot_path in self.list_snapshots(stage_folder_path)
+                if not self.is_snapshot_fresh(snapshot_path)]
+
+    def extract_stage(self, stage_folder_path: str, ignore_existence=False) -> int:
+        """
+        :param ignore_existence: extract all snapshots, even fresh ones
+        :return: number of extracted snapshots
+        """
+        if ignore_existence:
+            snapshot_paths = self.list_snapshots(stage_folder_path)
+        else:
+            snapshot_paths = self.list_stale_snapshots(stage_folder_path)
+        return self.extract_snapshots(snapshot_paths)
+
+    def extract_snapshots(self, snapshot_paths: List[str]) -> int:
+        """
+        Runs extractor in each snapshot directory, not more than max_workers processes at once.
+        :return: number of extracted snapshots
+        """
+        total = len(snapshot_paths)
+        if not total:
+            return 0
+        if not os.path.isfile(self.exe_path):
+            print('Executable file not found, Path:', self.exe_path)
+            return 0
+        exe_command = build_exe_command(self.exe_path)
+        done = 0
+        # Threads only wait for extractor processes, so they are enough to run processes in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(subprocess.run, exe_command, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.DEVNULL, cwd=snapshot_path)
+                       for snapshot_path in snapshot_paths]
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                if self.progress_callback:
+                    self.progress_callback(done, total)
+        return done
@@ -0,0 +1,167 @@
+"""
+Cache of parsed WW files.
+Parsed WW file is the array (2, x points) of x and values of the rows with y == 0 (see read_ww_file()).
+Arrays are kept in memory and optionally on disk as npy files, both with LRU bound of total size.
+Entries are keyed by file path, mtime and size, so re-extracted files are parsed again.
+Missed files of one request are parsed in a thread pool.
+
+How to use:
+    ww_file_cache.configure(max_size_mb=256, cache_dir=os.path.join(config.paths.result.cache, 'ww'),
+                            disk_max_size_mb=1024)
+    x_and_values_list = ww_file_cache.get_many(ww_file_paths)
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from wrapper.core.analysis_cache import evict_least_recently_used
+from wrapper.misc.collections.ww_data_collecting.ww_dataset import read_ww_file
+
+
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+_DISK_ENTRY_SUFFIX = '.npy'
+
+
+class WWFileCache:
+    """
+    Attributes:
+        max_size: maximum total size of arrays in memory (bytes)
+        cache_dir: directory of npy entries on disk or None if disk cache is disabled
+        disk_max_size: maximum total size of npy entries on disk (bytes)
+        max_workers: maximum number of threads which parse missed files
+        hits, misses: numbers of cached and parsed files
+    Methods:
+        configure(max_size_mb: float, cache_dir: Union[str, None], max_workers: int, disk_max_size_mb: float)
+        get(ww_file_path: str) -> np.ndarray
+        get_many(ww_file_paths: List[str]) -> List[np.ndarray]
+        clear()
+        evict_disk_entries()
+    """
+    def __init__(self, max_size_mb=256., cache_dir: Union[str, None] = None, max_workers=DEFAULT_MAX_WORKERS,
+                 disk_max_size_mb=1024.):
+        self.entries: OrderedDict = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.configure(max_size_mb, cache_dir, max_workers, disk_max_size_mb)
+
+    def configure(self, max_size_mb=256., cache_dir: Union[str, None] = None, max_workers=DEFAULT_MAX_WORKERS,
+                  disk_max_size_mb=1024.):
+        self.max_size = int(max_size_mb * 2 ** 20)
+        self.cache_dir = cache_dir
+        self.disk_max_size = int(disk_max_size_mb * 2 ** 20)
+        self.max_workers = max(int(max_workers), 1)
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    @staticmethod
+    def key(ww_file_path: str) -> Tuple[str, int, int]:
+        """
+        :raises FileNotFoundError: if WW file does not exist
+        """
+        file_stat = os.stat(ww_file_path)
+        return os.path.abspath(ww_file_path), file_stat.st_mtime_ns, file_stat.st_size
+
+    def disk_entry_path(self, key: Tuple[str, int, int]) -> str:
+        key_digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, key_digest + _DISK_ENTRY_SUFFIX)
+
+    def get(self, ww_file_path: str) -> np.ndarray:
+        return self.get_many([ww_file_path])[0]
+
+    def get_many(self, ww_file_paths: List[str]) -> List[np.ndarray]:
+        """
+        :return: arrays (2, x points) of x and values of WW files in the same order
+        """
+        keys = [self.key(ww_file_path) for ww_file_path in ww_file_paths]
+        arrays = [self.lookup(key) for key in keys]
+        missed = [position for position, array in enumerate(arrays) if array is None]
+        if len(missed) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missed))) as executor:
+                loaded = list(executor.map(self.load, [keys[position] for position in missed]))
+        else:
+            loaded = [self.load(keys[position]) for position in missed]
+        for position, array in zip(missed, loaded):
+            arrays[position] = array
+        if missed and self.cache_dir:
+            self.evict_disk_entries()
+        return arrays
+
+    def lookup(self, key: Tuple[str, int, int]) -> Union[np.ndarray, None]:
+        with self.lock:
+            array = self.entries.get(key)
+            if array is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            return array
+
+    def load(self, key: Tuple[str, int, int]) -> np.ndarray:
+        """
+        Loads array from disk cache or parses WW file and stores it to cache.
+        """
+        array = None
+        if self.cache_dir:
+            disk_entry_path = self.disk_entry_path(key)
+            try:
+                array = np.load(disk_entry_path, allow_pickle=False)
+                # Access time of the entry for eviction
+                os.utime(disk_entry_path)
+            except (OSError, ValueError):
+                array = None
+        if array is None:
+            array = np.vstack(read_ww_file(key[0]))
+            with self.lock:
+                self.misses += 1
+            if self.cache_dir:
+                self.save_to_disk(key, array)
+        else:
+            with self.lock:
+                self.hits += 1
+        self.store(key, array)
+        return array
+
+    def save_to_disk(self, key: Tuple[str, int, int], array: np.ndarray):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Entry is written to temporary file and renamed, so readers never see a partial entry
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(file_descriptor, 'wb') as entry_file:
+                np.save(entry_file, array)
+            os.replace(temporary_path, self.disk_entry_path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def evict_disk_entries(self):
+        """
+        Removes least recently used npy entries while their total size is more than disk_max_size.
+        """
+        if os.path.isdir(self.cache_dir):
+            evict_least_recently_used(self.cache_dir, _DISK_ENTRY_SUFFIX, self.disk_max_size)
+
+    def store(self, key: Tuple[str, int, int], array: np.ndarray):
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = array
+            self.size += array.nbytes
+            # Least recently used entries are evicted (the new one is kept even if it is bigger than max_size)
+            while self.size > self.max_size and len(self.entries) > 1:
+                _, evicted_array = self.entries.popitem(last=False)
+                self.size -= evicted_array.nbytes
+
+
+ww_file_cache = WWFileCache()
@@ -0,0 +1,93 @@
+"""
+Full 2-D WW data (the whole grid of WW<n>.DAT files instead of y == 0 cut).
+Grid of a WW file is stored as compact float32 array (y points, x points) with x and y coordinate vectors.
+Points which are absent in the file are NaN.
+
+How to use:
+    grids = WWGridSeries.load(stage_folder_path, steps=[1000, 2000], ww_number=6)
+    screen_values, screen_x, screen_y = grids.downsampled(max_shape=(400, 800))
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+@dataclass
+class WWGrid:
+    x: np.ndarray
+    y: np.ndarray
+    # Array (y points, x points)
+    values: np.ndarray
+
+
+def read_ww_grid(ww_file_path: str) -> WWGrid:
+    """
+    Reads the whole grid of WW file. Rows of the file can be in any order.
+    """
+    ww_data = pd.read_csv(ww_file_path, sep=r'\s+', dtype=np.float64).values
+    x, x_positions = np.unique(ww_data[:, 0], return_inverse=True)
+    y, y_positions = np.unique(ww_data[:, 1], return_inverse=True)
+    values = np.full((len(y), len(x)), np.nan, dtype=np.float32)
+    values[y_positions, x_positions] = ww_data[:, 2]
+    return WWGrid(x=x, y=y, values=values)
+
+
+def decimation_steps(shape: Tuple[int, int], max_shape: Tuple[int, int]) -> Tuple[int, int]:
+    return tuple(max(-(-points // max_points), 1) for points, max_points in zip(shape, max_shape))
+
+
+class WWGridSeries:
+    """
+    Grids of one WW number for several snapshots of a stage on the common (x, y) grid.
+
+    Attributes:
+        steps: snapshot steps
+        x, y: coordinate vectors
+        values: float32 array (snapshots, y points, x points)
+    Methods:
+        load(stage_folder_path: str, steps: List[int], ww_number: int, max_workers: int) -> WWGridSeries
+        downsampled(max_shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    def __init__(self, steps: List[int], x: np.ndarray, y: np.ndarray, values: np.ndarray):
+        self.steps = steps
+        self.x = x
+        self.y = y
+        self.values = values
+
+    @classmethod
+    def load(cls, stage_folder_path: str, steps: List[int], ww_number: int,
+             max_workers=DEFAULT_MAX_WORKERS) -> 'WWGridSeries':
+        """
+        Reads grids of snapshots in a thread pool and packs them into one float32 array.
+        :raises ValueError: if there are no steps or grids of snapshots are different
+        """
+        steps = [int(step) for step in steps]
+        if not steps:
+            raise ValueError(f'There are no snapshot steps to load WW{ww_number} grids of "{stage_folder_path}"')
+        ww_file_paths = [os.path.join(stage_folder_path, str(step), f'WW{ww_number}.DAT') for step in steps]
+        with ThreadPoolExecutor(max_workers=max(min(int(max_workers), len(steps)), 1)) as executor:
+            grids_iter = executor.map(read_ww_grid, ww_file_paths)
+            first_grid = next(grids_iter)
+            values = np.empty((len(steps),) + first_grid.values.shape, dtype=np.float32)
+            values[0] = first_grid.values
+            for position, grid in enumerate(grids_iter, start=1):
+                if grid.values.shape != first_grid.values.shape:
+                    raise ValueError(f'Grid of "{ww_file_paths[position]}" differs from the first snapshot grid')
+                values[position] = grid.values
+        return cls(steps, first_grid.x, first_grid.y, values)
+
+    def downsampled(self, max_shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Decimates grids to not more than max_shape (y points, x points) for the screen.
+        Values are views of the grids array, so all snapshots are downsampled without copying.
+        :return: values (snapshots, y points, x points), x, y
+        """
+        y_step, x_step = decimation_steps(self.values.shape[1:], max_shape)
+        return self.values[:, ::y_step, ::x_step], self.x[::x_step], self.y[::y_step]
@@ -0,0 +1,99 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.core.data_management import MtutManager
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase, STAGE_NAME, WW_FIELDS_INDEX
+from wrapper.misc.collections.fields_integral.fields_integral_calculation import (
+    find_fields_integral, load_mtut_vars
+)
+from wrapper.misc.collections.fields_integral.fields_integral_sweep import (
+    POINT_MTUT_NAME, SWEEP_TABLE_NAME, store_sweep_point, list_sweep_points, perform_fields_integral_sweep
+)
+
+
+UDRM_VALUES = [1.5, 3.0]
+SOURCE_FILE_NAME = 'MSRS'
+
+
+def set_mtut_udrm(mtut_path: str, udrm: float):
+    mtut_manager = MtutManager(mtut_path)
+    mtut_manager.load_file()
+    mtut_manager.set_var('UDRM', str(udrm))
+    mtut_manager.save_file()
+
+
+class FieldsIntegralSweepTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5 * 10**4
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.config.paths.result.temporary.sweep = os.path.join(self.tmp_dir.name, 'result', 'temp', 'sweep', '')
+        for udrm in UDRM_VALUES:
+            self.ww_indexes = self.workspace.generate_ww_data()
+            stage_path = os.path.join(self.config.paths.result.temporary.distributions, STAGE_NAME)
+            for ww_index in self.ww_indexes:
+                source_path = os.path.join(stage_path, str(ww_index), SOURCE_FILE_NAME)
+                with open(source_path, 'w') as source_file:
+                    source_file.write('source distribution')
+                # Extracted WW files are not older than sources, so extraction is not needed
+                ww_mtime = os.stat(os.path.join(stage_path, str(ww_index), f'WW{WW_FIELDS_INDEX}.DAT')).st_mtime
+                os.utime(source_path, (ww_mtime - 10., ww_mtime - 10.))
+            set_mtut_udrm(self.config.paths.treada_core.mtut, udrm)
+            store_sweep_point(self.config)
+
+    def last_snapshot_times(self, point_path: str):
+        mtut_vars = load_mtut_vars(os.path.join(point_path, POINT_MTUT_NAME))
+        ww_path = os.path.join(point_path, 'distributions', STAGE_NAME, str(self.ww_indexes[-1]),
+                               f'WW{WW_FIELDS_INDEX}.DAT')
+        field = pd.read_csv(ww_path, sep=r'\s+').query('Y == 0')['W'].reset_index(drop=True)
+        dx_const = mtut_vars.hx[1]['step'] * 1e-4
+        with redirect_stdout(io.StringIO()):
+            return (find_fields_integral(field, dx_const=dx_const, q_mobility=mtut_vars.e_mobility),
+                    find_fields_integral(field, dx_const=dx_const, q_mobility=mtut_vars.h_mobility))
+
+    def run_sweep(self) -> (pd.DataFrame, str):
+        sweep_output = io.StringIO()
+        with redirect_stdout(sweep_output):
+            sweep_table = perform_fields_integral_sweep(self.config.paths.result.temporary.sweep, max_workers=2)
+        return sweep_table, sweep_output.getvalue()
+
+    def test_points_are_stored(self):
+        point_paths = list_sweep_points(self.config.paths.result.temporary.sweep)
+        self.assertEqual([os.path.basename(point_path) for point_path in point_paths], ['u(1.5)', 'u(3.0)'])
+        self.assertEqual(os.listdir(self.config.paths.result.temporary.distributions), [])
+        for point_path, udrm in zip(point_paths, UDRM_VALUES):
+            self.assertEqual(float(load_mtut_vars(os.path.join(point_path, POINT_MTUT_NAME)).udrm), udrm)
+
+    def test_sweep_table(self):
+        sweep_table, _ = self.run_sweep()
+        self.assertEqual(sweep_table['udrm'].tolist(), UDRM_VALUES)
+        self.assertEqual(sweep_table['stage'].tolist(), [STAGE_NAME] * len(UDRM_VALUES))
+        self.assertEqual(sweep_table['step'].tolist(), [self.ww_indexes[-1]] * len(UDRM_VALUES))
+        for point_path, (_, row) in zip(list_sweep_points(self.config.paths.result.temporary.sweep),
+                                        sweep_table.iterrows()):
+            np.testing.assert_allclose([row['e_time'], row['h_time']], self.last_snapshot_times(point_path),
+                                       rtol=1e-12)
+        saved_table = pd.read_csv(os.path.join(self.config.paths.result.temporary.sweep, SWEEP_TABLE_NAME))
+        pd.testing.assert_frame_equal(saved_table, sweep_table)
+
+    def test_unchanged_points_are_skipped(self):
+        first_table, _ = self.run_sweep()
+        second_table, sweep_output = self.run_sweep()
+        self.assertIn('to calculate: 0', sweep_output)
+        pd.testing.assert_frame_equal(second_table, first_table)
+        changed_point_path = list_sweep_points(self.config.paths.result.temporary.sweep)[1]
+        set_mtut_udrm(os.path.join(changed_point_path, POINT_MTUT_NAME), 4.5)
+        third_table, sweep_output = self.run_sweep()
+        self.assertIn('to calculate: 1', sweep_output)
+        self.assertEqual(third_table['udrm'].tolist(), [1.5, 4.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
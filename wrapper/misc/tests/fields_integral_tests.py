@@ -0,0 +1,70 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase, STAGE_NAME, WW_FIELDS_INDEX
+from wrapper.misc.collections.fields_integral.fields_integral_calculation import (
+    find_between_peaks_field_ranges, fields_integrals_calculation, find_fields_integral, load_mtut_vars,
+    perform_fields_integral_series_finding
+)
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
+
+
+class FieldsIntegralSeriesTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5 * 10**4
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ww_indexes = self.workspace.generate_ww_data()
+        self.mtut_vars = load_mtut_vars(self.config.paths.treada_core.mtut)
+        self.dx_const = self.mtut_vars.hx[1]['step'] * 1e-4
+        ww_data = WWDataCollector.load_ww_data(abs_res_path=self.config.paths.result.temporary.distributions,
+                                               stage_dir_name=STAGE_NAME, ww_dir_indexes=self.ww_indexes,
+                                               ww_aliases={WW_FIELDS_INDEX: 'fields'})
+        self.fields = np.vstack([ww_data[ww_index][WW_FIELDS_INDEX]['fields'].values
+                                 for ww_index in self.ww_indexes])
+
+    def scalar_times(self, field: np.ndarray, q_mobility: float) -> float:
+        with redirect_stdout(io.StringIO()):
+            return find_fields_integral(pd.Series(field), dx_const=self.dx_const, q_mobility=q_mobility)
+
+    def test_batched_times_equal_single_field_times(self):
+        x = np.linspace(0., 10., self.fields.shape[1])
+        single_peak = 50. * np.exp(-((x - 5.) / 0.5) ** 2) + 0.1
+        flat_peaks = np.round(self.fields[0], 0)
+        fields = np.vstack([self.fields, single_peak, flat_peaks])
+        low, high = find_between_peaks_field_ranges(fields, height=1)
+        for q_mobility in (self.mtut_vars.e_mobility, self.mtut_vars.h_mobility):
+            times = fields_integrals_calculation(fields, low, high, self.dx_const, q_mobility)
+            expected_times = [self.scalar_times(field, q_mobility) for field in fields]
+            np.testing.assert_allclose(times, expected_times, rtol=1e-12)
+
+    def test_fields_without_two_peaks(self):
+        x = np.linspace(0., 10., self.fields.shape[1])
+        three_peaks = sum(np.exp(-((x - center) / 0.3) ** 2) * 10. for center in (2., 5., 8.))
+        fields = np.vstack([np.full_like(x, 0.5), three_peaks])
+        low, _ = find_between_peaks_field_ranges(fields, height=1)
+        np.testing.assert_array_equal(low, [-1, -1])
+        self.assertTrue(np.isnan(fields_integrals_calculation(fields, low, low, self.dx_const, 1e3)).all())
+
+    def test_series_of_all_snapshots(self):
+        scenario = SimpleNamespace(stages=SimpleNamespace(light=StageData(name=STAGE_NAME)))
+        results = perform_fields_integral_series_finding(scenario, self.config, self.mtut_vars)
+        series = results[STAGE_NAME]
+        self.assertEqual(series['steps'], self.ww_indexes)
+        self.assertEqual(len(series['time']), len(self.ww_indexes))
+        self.assertAlmostEqual(series['time'][0],
+                               self.ww_indexes[0] * self.mtut_vars.tstep * self.mtut_vars.relative_time)
+        self.assertAlmostEqual(series['e_time'][-1], self.scalar_times(self.fields[-1], self.mtut_vars.e_mobility))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from wrapper.misc.benchmarks.launcher_benchmarks import LauncherBenchmarks, BENCHMARK_STAGES, save_report
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspace
+
+
+class LauncherBenchmarksTests(unittest.TestCase):
+    def test_all_stages_are_reported(self):
+        benchmarks = LauncherBenchmarks(sizes=[2000], stages=list(BENCHMARK_STAGES))
+        with redirect_stdout(io.StringIO()):
+            report = benchmarks.run()
+        self.assertEqual([result['stage'] for result in report['results']], list(BENCHMARK_STAGES))
+        # Replay environment of I/O loop stage is not kept after the stage
+        self.assertNotIn('TREADA_REPLAY_STEPS', os.environ)
+        for result in report['results']:
+            self.assertGreater(result['time_s'], 0)
+            self.assertIsNotNone(result['peak_memory_mb'])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            report_path = os.path.join(tmp_dir, 'benchmarks', 'report.json')
+            save_report(report, report_path)
+            with open(report_path) as report_file:
+                self.assertEqual(json.load(report_file), report)
+
+    def test_raw_output_is_streamed_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            workspace = SyntheticWorkspace(tmp_dir, size=2 * 10**5)
+            tracemalloc.start()
+            try:
+                workspace.generate_raw_output()
+                peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            raw_output_size = os.path.getsize(workspace.raw_path)
+            with open(workspace.raw_path) as raw_file:
+                self.assertFalse(raw_file.readline().startswith(' '))
+        self.assertLess(peak_memory, raw_output_size / 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
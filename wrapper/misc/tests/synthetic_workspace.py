@@ -0,0 +1,151 @@
+"""
+Synthetic workspace for tests and benchmarks: temporary directory with replay stand-in of Treada,
+MTUT file, config and synthetic data of a given size.
+
+How to use:
+    class SomeTests(SyntheticWorkspaceTestCase):
+        workspace_size = 5000
+
+        def test_something(self):
+            self.workspace.generate_raw_output()
+"""
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from typing import List
+
+import numpy as np
+from dacite import from_dict
+
+from wrapper.config.config_build import Config
+from wrapper.misc.collections.treada_replay import treada_replay
+
+
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+STAGE_NAME = 'benchmark'
+# Synthetic distributions: number of x points, number of y rows and steps per distributions snapshot
+WW_X_POINTS = 1000
+WW_Y_ROWS = 5
+WW_FIELDS_INDEX = 6
+STEPS_PER_SNAPSHOT = 10**4
+MAX_SNAPSHOTS = 100
+
+
+class LeftStrippedLinesWriter:
+    """
+    Writes lines of replay output to file stripped from the left like StdoutCapturer does.
+    Replay writes each line by a single write() call.
+    """
+    def __init__(self, output_file):
+        self.output_file = output_file
+
+    def write(self, line: str) -> int:
+        return self.output_file.write(line.lstrip(' '))
+
+    def flush(self):
+        self.output_file.flush()
+
+
+class SyntheticWorkspace:
+    """
+    Temporary directory with replay stand-in of Treada, MTUT file, config and synthetic data of a given size.
+    """
+    def __init__(self, root_dir: str, size: int):
+        self.size = size
+        self.core_dir = os.path.join(root_dir, 'TreadaTx_C')
+        os.makedirs(self.core_dir)
+        exe_path = os.path.join(self.core_dir, 'treada_replay.py')
+        shutil.copy(treada_replay.__file__, exe_path)
+        mtut_path = os.path.join(self.core_dir, 'MTUT')
+        treada_replay.write_synthetic_mtut(mtut_path)
+        self.relative_time = treada_replay.relative_time(treada_replay.load_mtut_vars(mtut_path))
+        self.config = self.build_config(root_dir, exe_path, mtut_path)
+        self.raw_path = self.config.paths.result.temporary.raw
+        os.makedirs(os.path.dirname(self.raw_path))
+
+    @staticmethod
+    def build_config(root_dir: str, exe_path: str, mtut_path: str) -> Config:
+        with open(os.path.join(project_path, 'wrapper', 'config', 'config.json.example')) as config_file:
+            config = from_dict(data_class=Config, data=json.load(config_file))
+        config.paths.treada_core.exe = exe_path
+        config.paths.treada_core.mtut = mtut_path
+        config.paths.result.main = os.path.join(root_dir, 'result', 'res.txt')
+        config.paths.result.plots = os.path.join(root_dir, 'result', 'plots', 'res_.txt')
+        config.paths.result.temporary.raw = os.path.join(root_dir, 'result', 'temp', 'raw', 'treada_raw_output.txt')
+        config.paths.result.temporary.distributions = os.path.join(root_dir, 'result', 'temp', 'distributions', '')
+        config.options.auto_ending = False
+        config.options.preserve_distributions = False
+        config.advanced_settings.runtime.light_impulse.consider_fixed_time = False
+        config.advanced_settings.runtime.dark_impulse.consider_fixed_time = False
+        config.advanced_settings.runtime.distributions.enable_preserving_ranges = False
+        config.advanced_settings.result.dataframe.custom = {'name': '', 'multiplier': None}
+        config.plotting.y_column = 'current_density'
+        return config
+
+    def generate_raw_output(self):
+        """
+        Writes synthetic raw Treada's output with the workspace size of steps.
+        Lines are stripped from the left like StdoutCapturer does.
+        """
+        mtut_vars = treada_replay.load_mtut_vars(self.config.paths.treada_core.mtut)
+        replay = treada_replay.TreadaReplay(self.core_dir, mtut_vars)
+        # Replay output is streamed to file, so large sizes are not kept in memory
+        with open(self.raw_path, 'w') as raw_file, redirect_stdout(LeftStrippedLinesWriter(raw_file)):
+            replay.transient(self.size)
+
+    def generate_small_signal_output(self, output_path: str):
+        """
+        Writes synthetic raw output of small signal info stage with the workspace size of frequencies.
+        """
+        mtut_vars = treada_replay.load_mtut_vars(self.config.paths.treada_core.mtut)
+        replay = treada_replay.TreadaReplay(self.core_dir, mtut_vars)
+        # Tables are printed after the first Enter command, the replay exits after the second one
+        stdin = sys.stdin
+        sys.stdin = io.StringIO('\n\n')
+        try:
+            with open(output_path, 'w') as raw_file, redirect_stdout(LeftStrippedLinesWriter(raw_file)):
+                replay.small_signal_info(self.size)
+        finally:
+            sys.stdin = stdin
+
+    def generate_ww_data(self) -> List[int]:
+        """
+        Writes synthetic extracted distributions (WW*.DAT files) of the electric field with two peaks.
+        :return: indexes of distributions directories
+        """
+        snapshots_number = int(np.clip(self.size // STEPS_PER_SNAPSHOT, 1, MAX_SNAPSHOTS))
+        ww_indexes = [(index + 1) * STEPS_PER_SNAPSHOT for index in range(snapshots_number)]
+        x = np.linspace(0., 10., WW_X_POINTS)
+        for snapshot, ww_index in enumerate(ww_indexes):
+            ww_dir = os.path.join(self.config.paths.result.temporary.distributions, STAGE_NAME, str(ww_index))
+            os.makedirs(ww_dir, exist_ok=True)
+            shift = 0.5 * snapshot / snapshots_number
+            field = (50. * np.exp(-((x - 2. - shift) / 0.3)**2) + 80. * np.exp(-((x - 7. + shift) / 0.5)**2) +
+                     0.1 * (1 + x / 10))
+            grid = np.column_stack([np.tile(x, WW_Y_ROWS),
+                                    np.repeat(np.arange(WW_Y_ROWS, dtype=float), WW_X_POINTS),
+                                    np.tile(field, WW_Y_ROWS)])
+            np.savetxt(os.path.join(ww_dir, f'WW{WW_FIELDS_INDEX}.DAT'), grid, fmt='%.6E', header='X Y W',
+                       comments='')
+        return ww_indexes
+
+
+class SyntheticWorkspaceTestCase(unittest.TestCase):
+    """
+    Test case with a synthetic workspace of workspace_size created in a temporary directory for each test.
+    """
+    workspace_size = 5000
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.workspace = SyntheticWorkspace(self.tmp_dir.name, size=self.workspace_size)
+        self.config = self.workspace.config
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
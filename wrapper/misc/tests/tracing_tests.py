@@ -0,0 +1,79 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+
+from wrapper.misc.tracing import PeakMemoryReport, Tracer, tracer, traced
+
+
+@traced()
+def traced_function(value):
+    return value * 2
+
+
+class TracingTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        tracer.configure(enable=False)
+
+    def test_disabled_tracer_collects_nothing(self):
+        disabled_tracer = Tracer()
+        with disabled_tracer.span('stage'):
+            pass
+        self.assertEqual(disabled_tracer.events, [])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(disabled_tracer.save(os.path.join(tmp_dir, 'trace.json')))
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+    def test_nested_spans_and_decorator(self):
+        tracer.configure(enable=True)
+        with tracer.span('outer', stage='dark'):
+            self.assertEqual(traced_function(2), 4)
+        inner, outer = tracer.events
+        self.assertEqual(outer['name'], 'outer')
+        self.assertEqual(outer['args'], {'stage': 'dark'})
+        self.assertEqual(inner['name'], 'traced_function')
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+
+    def test_exception_is_recorded(self):
+        tracer.configure(enable=True)
+        with self.assertRaises(ValueError):
+            with tracer.span('failed'):
+                raise ValueError
+        self.assertEqual(tracer.events[0]['args']['exception'], 'ValueError')
+
+    def test_saved_trace_format(self):
+        tracer.configure(enable=True)
+        thread = threading.Thread(target=traced_function, args=(1,), name='worker')
+        thread.start()
+        thread.join()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_path = tracer.save(os.path.join(tmp_dir, 'result', 'trace.json'))
+            with open(trace_path) as trace_file:
+                trace = json.load(trace_file)
+        phases = [event['ph'] for event in trace['traceEvents']]
+        self.assertEqual(phases.count('X'), 1)
+        thread_names = [event['args']['name'] for event in trace['traceEvents'] if event['name'] == 'thread_name']
+        self.assertEqual(thread_names, ['worker'])
+
+    def test_peak_memory_report(self):
+        tracer.configure(enable=True)
+        output = io.StringIO()
+        with redirect_stdout(output), PeakMemoryReport('allocation') as memory_report:
+            block = bytearray(8 * 2 ** 20)
+            del block
+        self.assertGreaterEqual(memory_report.peak_size, 8 * 2 ** 20)
+        self.assertIn('Peak memory of allocation: 8.', output.getvalue())
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(tracer.events[0]['args']['peak_size'], memory_report.peak_size)
+        with PeakMemoryReport('disabled', enable=False) as disabled_report:
+            pass
+        self.assertEqual(disabled_report.peak_size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
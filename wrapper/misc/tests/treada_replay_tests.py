@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from dacite import from_dict
+
+from wrapper.config.config_build import Config
+from wrapper.core.data_management import TransientOutputParser, SmallSignalInfoOutputParser
+from wrapper.core.treada_io_handling import TreadaRunner
+from wrapper.launch.scenarios.scenario_build import StageData
+from wrapper.misc.collections.treada_replay import treada_replay
+
+
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+
+class TreadaReplayTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.core_dir = os.path.join(self.tmp_dir.name, 'core')
+        os.mkdir(self.core_dir)
+        exe_path = os.path.join(self.core_dir, 'treada_replay.py')
+        shutil.copy(treada_replay.__file__, exe_path)
+        self.mtut_path = os.path.join(self.core_dir, 'MTUT')
+        with open(os.path.join(project_path, 'wrapper', 'config', 'config.json.example')) as config_file:
+            self.config = from_dict(data_class=Config, data=json.load(config_file))
+        self.config.paths.treada_core.exe = exe_path
+        self.config.paths.treada_core.mtut = self.mtut_path
+        self.config.paths.result.temporary.raw = os.path.join(self.tmp_dir.name, 'raw_output.txt')
+        self.config.paths.result.temporary.distributions = os.path.join(self.tmp_dir.name, 'distributions', '')
+        self.config.advanced_settings.runtime.light_impulse.consider_fixed_time = False
+        self.config.advanced_settings.runtime.distributions.enable_preserving_ranges = False
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def run_stage(self, stage: StageData):
+        runner = TreadaRunner(self.config, relative_time=treada_replay.relative_time(
+            treada_replay.load_mtut_vars(self.mtut_path)))
+        with redirect_stdout(io.StringIO()):
+            runner.run(stage, self.config.paths.result.temporary.raw)
+        return runner
+
+    def test_transient_stage(self):
+        treada_replay.write_synthetic_mtut(self.mtut_path, TIME=1000)
+        self.config.options.auto_ending = False
+        with mock.patch.dict(os.environ, {'TREADA_REPLAY_STEPS': '3000'}):
+            runner = self.run_stage(StageData(name='dark'))
+        self.assertEqual(runner.capturer.currents_str_counter, 3000)
+        parser = TransientOutputParser(self.config.paths.result.temporary.raw)
+        self.assertEqual(len(parser.dataframe), 3000)
+        relative_time = TransientOutputParser.find_relative_time(
+            TransientOutputParser.load_raw_file(self.config.paths.result.temporary.raw))
+        self.assertAlmostEqual(relative_time, runner.relative_time, places=5)
+        # Distributions are dumped each 1000 steps, the last dump is not followed by a currents line
+        stage_distributions = os.listdir(os.path.join(self.config.paths.result.temporary.distributions, 'dark'))
+        self.assertEqual(sorted(stage_distributions, key=int), ['1000', '2000'])
+
+    def test_small_signal_info_stage(self):
+        treada_replay.write_synthetic_mtut(self.mtut_path, CKLKRS=4, JPUSH=1)
+        self.config.options.auto_ending = True
+        self.config.options.preserve_distributions = False
+        with mock.patch.dict(os.environ, {'TREADA_REPLAY_FREQUENCIES': '15'}):
+            self.run_stage(StageData(name='capacity_info', is_capacity_info_collecting=True))
+        parser = SmallSignalInfoOutputParser(self.config.paths.result.temporary.raw)
+        self.assertEqual(parser.dataframe.shape[0], 15)
+        self.assertTrue(all(parser.header_data.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase, STAGE_NAME, WW_FIELDS_INDEX
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector, WWDataUserInteractor
+from wrapper.ui.plotting import WWDataPlotter, WWDataAnimationPlotter, WWGridPlotter
+import matplotlib.pyplot as plt
+
+
+project_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+
+class WWDataUserInteractorTests(SyntheticWorkspaceTestCase):
+    workspace_size = 10**4
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Plotters of the interactor require Qt based matplotlib backend
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ww_indexes = self.workspace.generate_ww_data()
+        data_collector = WWDataCollector(os.path.join(project_path, 'wrapper', 'resources', 'ww_descriptions.csv'),
+                                         self.config.paths.result.temporary.distributions)
+        self.user_interactor = WWDataUserInteractor(data_collector)
+
+    def tearDown(self) -> None:
+        plt.close('all')
+        super().tearDown()
+
+    def plot(self) -> str:
+        console_output = io.StringIO()
+        with redirect_stdout(console_output):
+            self.user_interactor.plot(STAGE_NAME, self.ww_indexes[:2], WW_FIELDS_INDEX, 'W', backend='QtAgg')
+        return console_output.getvalue()
+
+    def test_adding_to_animation_is_unavailable(self):
+        self.user_interactor.plot_mode = 'animation'
+        self.plot()
+        self.user_interactor.is_add_to_exists = True
+        self.assertIn('Adding unavailable', self.plot())
+        self.assertIsInstance(self.user_interactor.ww_data_plotter, WWDataAnimationPlotter)
+        self.assertFalse(self.user_interactor.is_add_to_exists)
+        # The next plot creates a new lines plot
+        self.plot()
+        self.assertIsInstance(self.user_interactor.ww_data_plotter, WWDataPlotter)
+
+    def test_adding_to_grid_is_unavailable(self):
+        # Pending adding is reset by heatmap plot
+        self.user_interactor.is_add_to_exists = True
+        self.user_interactor.plot_mode = 'grid'
+        self.plot()
+        self.assertIsInstance(self.user_interactor.ww_data_plotter, WWGridPlotter)
+        self.assertFalse(self.user_interactor.is_add_to_exists)
+        self.user_interactor.is_add_to_exists = True
+        self.assertIn('Adding unavailable', self.plot())
+        self.assertIsInstance(self.user_interactor.ww_data_plotter, WWGridPlotter)
+        self.assertFalse(self.user_interactor.is_add_to_exists)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import shutil
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase, STAGE_NAME, WW_FIELDS_INDEX
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
+from wrapper.misc.collections.ww_data_collecting.ww_dataset import WWDataset, WW_DATASET_ARRAY_NAME
+
+
+class WWDatasetTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5 * 10**4
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ww_indexes = self.workspace.generate_ww_data()
+        self.distributions_path = self.workspace.config.paths.result.temporary.distributions
+        self.stage_path = os.path.join(self.distributions_path, STAGE_NAME)
+
+    def load_ww_data(self) -> dict:
+        return WWDataCollector.load_ww_data(abs_res_path=self.distributions_path, stage_dir_name=STAGE_NAME,
+                                            ww_dir_indexes=self.ww_indexes, ww_aliases={WW_FIELDS_INDEX: 'fields'})
+
+    def test_dataset_slices_equal_parsed_files(self):
+        parsed_ww_data = self.load_ww_data()
+        dataset = WWDataset.consolidate(self.stage_path)
+        self.assertEqual(dataset.values.shape, (len(self.ww_indexes), 1, len(dataset.x)))
+        self.assertIsInstance(dataset.values, np.memmap)
+        dataset_ww_data = self.load_ww_data()
+        self.assertEqual(list(dataset_ww_data), list(parsed_ww_data))
+        for ww_index in self.ww_indexes:
+            parsed_df = parsed_ww_data[ww_index][WW_FIELDS_INDEX]
+            dataset_df = dataset_ww_data[ww_index][WW_FIELDS_INDEX]
+            self.assertEqual(list(dataset_df.columns), ['x', 'y', 'fields'])
+            np.testing.assert_array_equal(dataset_df.values, parsed_df.values)
+        np.testing.assert_array_equal(dataset.profiles(self.ww_indexes[1:3], WW_FIELDS_INDEX)[1],
+                                      dataset.profile(self.ww_indexes[2], WW_FIELDS_INDEX))
+
+    def test_stale_dataset_is_not_opened(self):
+        WWDataCollector.consolidate_ww_data(self.stage_path)
+        self.assertIsNotNone(WWDataset.open(self.stage_path))
+        # Re-extracted WW file
+        ww_file_path = os.path.join(self.stage_path, str(self.ww_indexes[0]), f'WW{WW_FIELDS_INDEX}.DAT')
+        future_time = time.time() + 100
+        os.utime(ww_file_path, (future_time, future_time))
+        self.assertIsNone(WWDataset.open(self.stage_path))
+        self.assertIsNotNone(WWDataset.open(self.stage_path, check_freshness=False))
+        WWDataCollector.consolidate_ww_data(self.stage_path)
+        self.assertIsNotNone(WWDataset.open(self.stage_path))
+        # Removed snapshot
+        shutil.rmtree(os.path.join(self.stage_path, str(self.ww_indexes[-1])))
+        self.assertIsNone(WWDataset.open(self.stage_path))
+        self.assertIsNone(WWDataset.open(self.stage_path, check_freshness=False))
+        self.ww_indexes = self.ww_indexes[:-1]
+        self.assertEqual(list(self.load_ww_data()), self.ww_indexes)
+
+    def test_load_does_not_state_ww_files(self):
+        WWDataCollector.consolidate_ww_data(self.stage_path)
+        with mock.patch('os.DirEntry.stat', side_effect=AssertionError('WW file is stated')):
+            self.assertEqual(list(self.load_ww_data()), self.ww_indexes)
+
+    def test_stage_without_ww_files(self):
+        empty_stage_path = os.path.join(self.distributions_path, 'empty')
+        os.makedirs(os.path.join(empty_stage_path, '100'))
+        with self.assertRaises(ValueError):
+            WWDataset.consolidate(empty_stage_path)
+        self.assertEqual(os.listdir(empty_stage_path), ['100'])
+        self.assertFalse(os.path.exists(os.path.join(empty_stage_path, WW_DATASET_ARRAY_NAME)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import time
+import unittest
+
+from wrapper.misc.collections.ww_data_collecting.ww_extraction import WWExtractor
+
+
+# Stand-in of SplViewLQ.exe: writes WW file in the working directory
+FAKE_EXTRACTOR_SOURCE = '''
+with open('WW6.DAT', 'w') as ww_file:
+    ww_file.write('X Y W\\n0. 0. 1.\\n')
+'''
+
+
+class WWExtractionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.stage_path = os.path.join(self.tmp_dir.name, 'distributions', 'light')
+        self.snapshot_paths = []
+        for step in (100, 200, 300, 400, 500):
+            snapshot_path = os.path.join(self.stage_path, str(step))
+            os.makedirs(snapshot_path)
+            with open(os.path.join(snapshot_path, 'MSRS'), 'w') as source_file:
+                source_file.write(f'STEP {step}\n')
+            self.snapshot_paths.append(snapshot_path)
+        exe_path = os.path.join(self.tmp_dir.name, 'fake_spl_view.py')
+        with open(exe_path, 'w') as exe_file:
+            exe_file.write(FAKE_EXTRACTOR_SOURCE)
+        self.progress = []
+        self.extractor = WWExtractor(exe_path, max_workers=3,
+                                     progress_callback=lambda done, total: self.progress.append((done, total)))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_only_missing_and_stale_snapshots_are_extracted(self):
+        self.assertEqual(self.extractor.extract_stage(self.stage_path), 5)
+        self.assertEqual(self.progress[-1], (5, 5))
+        self.assertTrue(all(map(WWExtractor.is_snapshot_fresh, self.snapshot_paths)))
+        self.assertEqual(self.extractor.extract_stage(self.stage_path), 0)
+        # Rewritten source distribution files make the snapshot stale
+        future_time = time.time() + 100
+        os.utime(os.path.join(self.snapshot_paths[1], 'MSRS'), (future_time, future_time))
+        self.assertEqual(self.extractor.list_stale_snapshots(self.stage_path), [self.snapshot_paths[1]])
+        self.assertEqual(self.extractor.extract_stage(self.stage_path), 1)
+        self.assertEqual(self.extractor.extract_stage(self.stage_path, ignore_existence=True), 5)
+
+    def test_missing_executable(self):
+        self.extractor.exe_path = os.path.join(self.tmp_dir.name, 'missing.exe')
+        self.assertEqual(self.extractor.extract_stage(self.stage_path), 0)
+        self.assertFalse(any(map(WWExtractor.is_snapshot_fresh, self.snapshot_paths)))
+
+
+if __name__ == '__main__':
+    unittest.main()
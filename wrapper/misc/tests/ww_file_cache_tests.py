@@ -0,0 +1,98 @@
+import os
+import time
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+from wrapper.misc.tests.synthetic_workspace import SyntheticWorkspaceTestCase, STAGE_NAME, WW_FIELDS_INDEX
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
+from wrapper.misc.collections.ww_data_collecting.ww_file_cache import WWFileCache, ww_file_cache
+
+
+class WWFileCacheTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5 * 10**4
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ww_indexes = self.workspace.generate_ww_data()
+        self.distributions_path = self.workspace.config.paths.result.temporary.distributions
+        self.ww_paths = [os.path.join(self.distributions_path, STAGE_NAME, str(ww_index), f'WW{WW_FIELDS_INDEX}.DAT')
+                         for ww_index in self.ww_indexes]
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache', 'ww')
+        self.cache = WWFileCache(max_workers=3)
+
+    def tearDown(self) -> None:
+        ww_file_cache.configure()
+        super().tearDown()
+
+    def test_cached_arrays_equal_parsed_files(self):
+        arrays = self.cache.get_many(self.ww_paths)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, len(self.ww_paths)))
+        for ww_path, array in zip(self.ww_paths, arrays):
+            ww_dataframe = pd.read_csv(ww_path, sep=r'\s+')
+            ww_dataframe = ww_dataframe.loc[ww_dataframe['Y'] == 0.]
+            np.testing.assert_array_equal(array, ww_dataframe[['X', 'W']].values.T)
+        self.assertIs(self.cache.get(self.ww_paths[0]), arrays[0])
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_modified_file_is_parsed_again(self):
+        array = self.cache.get(self.ww_paths[0])
+        future_time = time.time() + 100
+        os.utime(self.ww_paths[0], (future_time, future_time))
+        self.assertIsNot(self.cache.get(self.ww_paths[0]), array)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_least_recently_used_arrays_are_evicted(self):
+        array_size = self.cache.get(self.ww_paths[0]).nbytes
+        self.cache.configure(max_size_mb=2.5 * array_size / 2 ** 20)
+        self.cache.get_many(self.ww_paths[:2])
+        self.cache.get(self.ww_paths[0])
+        self.cache.get(self.ww_paths[2])
+        self.assertEqual(len(self.cache.entries), 2)
+        self.assertLessEqual(self.cache.size, self.cache.max_size)
+        misses = self.cache.misses
+        self.cache.get(self.ww_paths[0])
+        self.assertEqual(self.cache.misses, misses)
+        self.cache.get(self.ww_paths[1])
+        self.assertEqual(self.cache.misses, misses + 1)
+
+    def test_disk_cache_is_shared(self):
+        self.cache.configure(cache_dir=self.cache_dir)
+        arrays = self.cache.get_many(self.ww_paths)
+        self.assertEqual(len(os.listdir(self.cache_dir)), len(self.ww_paths))
+        other_cache = WWFileCache(cache_dir=self.cache_dir)
+        for array, other_array in zip(arrays, other_cache.get_many(self.ww_paths)):
+            np.testing.assert_array_equal(other_array, array)
+        self.assertEqual((other_cache.hits, other_cache.misses), (len(self.ww_paths), 0))
+
+    def test_least_recently_used_disk_entries_are_evicted(self):
+        self.cache.configure(cache_dir=self.cache_dir)
+        self.cache.get_many(self.ww_paths[:2])
+        entry_paths = [self.cache.disk_entry_path(self.cache.key(ww_path)) for ww_path in self.ww_paths[:2]]
+        past_time = time.time() - 100
+        for entry_path in entry_paths:
+            os.utime(entry_path, (past_time, past_time))
+        # Memory entries are cleared, so the first entry is loaded from disk and becomes the most recently used one
+        self.cache.configure(cache_dir=self.cache_dir, disk_max_size_mb=2.5 * os.path.getsize(entry_paths[0]) / 2 ** 20)
+        self.cache.get(self.ww_paths[0])
+        self.cache.get(self.ww_paths[2])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        self.assertTrue(os.path.isfile(entry_paths[0]))
+        self.assertFalse(os.path.isfile(entry_paths[1]))
+
+    def test_load_ww_data_uses_cache(self):
+        ww_file_cache.configure()
+        ww_data = WWDataCollector.load_ww_data(abs_res_path=self.distributions_path, stage_dir_name=STAGE_NAME,
+                                               ww_dir_indexes=self.ww_indexes, ww_aliases={WW_FIELDS_INDEX: 'fields'})
+        self.assertEqual(list(ww_data), self.ww_indexes)
+        self.assertEqual(list(ww_data[self.ww_indexes[0]][WW_FIELDS_INDEX].columns), ['x', 'y', 'fields'])
+        WWDataCollector.load_ww_data(abs_res_path=self.distributions_path, stage_dir_name=STAGE_NAME,
+                                     ww_dir_indexes=self.ww_indexes[:2], ww_aliases={WW_FIELDS_INDEX: 'fields'})
+        self.assertEqual((ww_file_cache.hits, ww_file_cache.misses), (2, len(self.ww_indexes)))
+
+
+if __name__ == '__main__':
+    unittest.main()
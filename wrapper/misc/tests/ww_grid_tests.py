@@ -0,0 +1,56 @@
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+from wrapper.misc.tests.synthetic_workspace import (
+    SyntheticWorkspaceTestCase, STAGE_NAME, WW_FIELDS_INDEX, WW_X_POINTS, WW_Y_ROWS
+)
+from wrapper.misc.collections.ww_data_collecting.collect_ww_data import WWDataCollector
+from wrapper.misc.collections.ww_data_collecting.ww_grid import WWGridSeries, read_ww_grid
+
+
+class WWGridTests(SyntheticWorkspaceTestCase):
+    workspace_size = 5 * 10**4
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.ww_indexes = self.workspace.generate_ww_data()
+        self.distributions_path = self.workspace.config.paths.result.temporary.distributions
+        self.stage_path = os.path.join(self.distributions_path, STAGE_NAME)
+
+    def test_grids_contain_y_zero_cut(self):
+        grids = WWGridSeries.load(self.stage_path, self.ww_indexes, WW_FIELDS_INDEX, max_workers=2)
+        self.assertEqual(grids.values.shape, (len(self.ww_indexes), WW_Y_ROWS, WW_X_POINTS))
+        self.assertEqual(grids.values.dtype, np.float32)
+        np.testing.assert_array_equal(grids.y, np.arange(WW_Y_ROWS, dtype=float))
+        ww_data = WWDataCollector.load_ww_data(abs_res_path=self.distributions_path, stage_dir_name=STAGE_NAME,
+                                               ww_dir_indexes=self.ww_indexes, ww_aliases={WW_FIELDS_INDEX: 'W'})
+        for position, ww_index in enumerate(self.ww_indexes):
+            ww_df = ww_data[ww_index][WW_FIELDS_INDEX]
+            np.testing.assert_array_equal(grids.x, ww_df['x'].values)
+            np.testing.assert_array_equal(grids.values[position, 0], ww_df['W'].values.astype(np.float32))
+
+    def test_unordered_and_missing_points(self):
+        grid_path = os.path.join(self.tmp_dir.name, 'WW1.DAT')
+        with open(grid_path, 'w') as grid_file:
+            grid_file.write('X Y W\n1. 1. 4.\n0. 0. 1.\n1. 0. 2.\n')
+        grid = read_ww_grid(grid_path)
+        np.testing.assert_array_equal(grid.values, np.array([[1., 2.], [np.nan, 4.]], dtype=np.float32))
+
+    def test_no_steps(self):
+        with self.assertRaises(ValueError):
+            WWGridSeries.load(self.stage_path, [], WW_FIELDS_INDEX)
+
+    def test_downsampled_grids_are_views(self):
+        grids = WWGridSeries.load(self.stage_path, self.ww_indexes, WW_FIELDS_INDEX)
+        values, x, y = grids.downsampled(max_shape=(2, 300))
+        self.assertEqual(values.shape, (len(self.ww_indexes), 2, 250))
+        self.assertEqual((len(x), len(y)), (250, 2))
+        self.assertTrue(np.shares_memory(values, grids.values))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+"""
+Lightweight tracing of launcher stages.
+Spans are saved in Chrome trace event format, so a trace file can be opened by chrome://tracing or Perfetto.
+When tracing is disabled, span() returns a shared no-op context manager and traced() functions
+are called directly after a single flag check.
+
+How to use:
+    1) tracer.configure(enable=True) at the start of computation
+    2) Wrap code by "with tracer.span('name', key=value):" or decorate functions by @traced()
+    3) tracer.save(trace_path) at the end of computation
+
+Peak memory of a code block is measured by "with PeakMemoryReport('name'):" (tracemalloc based).
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Callable, List, Union
+
+
+class _NullSpan:
+    """
+    Context manager that does nothing. Used when tracing is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start_time')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_time = 0.
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end_time = time.perf_counter()
+        if exc_type is not None:
+            self.args['exception'] = exc_type.__name__
+        self.tracer.add_complete_event(self.name, self.category, self.start_time, end_time, self.args)
+        return False
+
+
+class Tracer:
+    """
+    Collects complete ("X") trace events.
+
+    Attributes:
+        enabled: is tracing enabled
+        events: collected trace events
+    Methods:
+        configure(enable: bool)
+        span(name: str, category='launcher', **args)
+        save(trace_path: str)
+    """
+    def __init__(self):
+        self.enabled = False
+        self.events: List[dict] = []
+        self._lock = threading.Lock()
+        self._origin_time = time.perf_counter()
+        self._thread_names = {}
+
+    def configure(self, enable: bool):
+        """
+        Enables or disables tracing and clears previously collected events.
+        """
+        self.enabled = enable
+        with self._lock:
+            self.events = []
+            self._thread_names = {}
+        self._origin_time = time.perf_counter()
+
+    def span(self, name: str, category='launcher', **args):
+        if not self.enabled:
+            return _null_span
+        return _Span(self, name, category, args)
+
+    def add_complete_event(self, name: str, category: str, start_time: float, end_time: float, args: dict):
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start_time - self._origin_time) * 1e6,
+            'dur': (end_time - start_time) * 1e6,
+            'pid': os.getpid(),
+            'tid': thread.ident,
+            'args': {key: self._jsonable(value) for key, value in args.items()},
+        }
+        with self._lock:
+            self.events.append(event)
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    @staticmethod
+    def _jsonable(value):
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        return str(value)
+
+    def trace_dict(self) -> dict:
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self._thread_names)
+        pid = os.getpid()
+        metadata_events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                            'args': {'name': 'treada_launcher'}}]
+        metadata_events += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+                            for tid, thread_name in thread_names.items()]
+        return {'traceEvents': metadata_events + events, 'displayTimeUnit': 'ms'}
+
+    def save(self, trace_path: str) -> Union[str, None]:
+        """
+        Saves collected spans to trace file. Does nothing if tracing is disabled.
+        :return: trace_path if the file was saved
+        """
+        if not self.enabled:
+            return None
+        trace_dir = os.path.dirname(trace_path)
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+        with open(trace_path, 'w') as trace_file:
+            json.dump(self.trace_dict(), trace_file)
+        return trace_path
+
+
+tracer = Tracer()
+
+
+def traced(name: str = None, category='launcher') -> Callable:
+    """
+    Decorator that wraps each function call into a tracing span.
+    :param name: span name, function qualified name by default
+    :param category: span category
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PeakMemoryReport:
+    """
+    Measures peak memory allocated inside "with" block by tracemalloc and prints it.
+    Memory allocated by numpy and pandas is traced too. Allocations are slower while tracing.
+
+    Attributes:
+        name: name of measured block
+        peak_size: peak size of memory allocated inside the block (bytes)
+    How to use:
+        with PeakMemoryReport('result collecting: light') as memory_report:
+            ...
+        memory_report.peak_size
+    """
+    def __init__(self, name: str, enable=True):
+        self.name = name
+        self.enabled = enable
+        self.peak_size = 0
+        self._start_size = 0
+        self._start_time = 0.
+        self._is_started_here = False
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        self._is_started_here = not tracemalloc.is_tracing()
+        if self._is_started_here:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._start_size = tracemalloc.get_traced_memory()[0]
+        self._start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self.enabled:
+            return False
+        self.peak_size = tracemalloc.get_traced_memory()[1] - self._start_size
+        if self._is_started_here:
+            tracemalloc.stop()
+        print(f'Peak memory of {self.name}: {self.peak_size / 2 ** 20:.1f} MiB')
+        if tracer.enabled:
+            tracer.add_complete_event(self.name, 'memory', self._start_time, time.perf_counter(),
+                                      {'peak_size': self.peak_size})
+        return False
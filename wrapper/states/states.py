@@ -8,6 +8,9 @@ from colorama import Fore, Style
 
 from wrapper.config.config_build import Config
 from wrapper.core.data_management import MtutStageConfiger, MtutDataFrameManager, MtutManager
+from wrapper.core.progress_metrics import progress_metrics
+from wrapper.core.watchdog import TreadaStallError, watchdog_metrics
+from wrapper.misc.tracing import tracer
 
 
 @dataclass(frozen=True)
@@ -28,10 +31,14 @@ state_status = StateStatuses()
 class BaseState:
     states_file_path: str
 
-    def __init__(self, index: Union[int, str], status: str, mtut_vars: dict = None):
+    def __init__(self, index: Union[int, str], status: str, mtut_vars: dict = None,
+                 reason: str = None, metrics: dict = None):
         self.index = int(index)
         self._status = status
         self.mtut_vars = mtut_vars
+        # Failure reason and watchdog metrics of the state run
+        self.reason = reason
+        self.metrics = metrics
 
     def set_status(self, status, is_dump=True):
 
@@ -40,6 +47,8 @@ class BaseState:
             states = self.load_states(as_dicts=True)
             if self.index < len(states):
                 states[self.index]['_status'] = status
+                states[self.index]['reason'] = self.reason
+                states[self.index]['metrics'] = self.metrics
             else:
                 states.append(self.__dict__)
 
@@ -101,11 +110,24 @@ class BaseStatesMachine:
             if self.config.modes.mtut_dataframe:
                 self.set_mtut_vars(state.index)
             if state.status == state_status.READY:
+                watchdog_metrics.reset()
                 self.states[state.index].status = state_status.RUN
+                progress_metrics.start_state(state.index, states_number=len(self.states))
                 try:
-                    scenario_result = call_scenario_function(mtut_stage_configer, config)
+                    with tracer.span(f'state {state.index}', index=state.index, mtut_vars=state.mtut_vars):
+                        scenario_result = call_scenario_function(mtut_stage_configer, config)
                     self.plot_windows.append(scenario_result['plots'])
+                    self.keep_sweep_point()
+                    self.set_metrics(state.index)
                     self.states[state.index].status = state_status.END
+                    progress_metrics.finish_state()
+                except TreadaStallError as e:
+                    # Stalled point does not stop the sweep
+                    self.states[state.index].reason = e.reason
+                    self.set_metrics(state.index)
+                    self.states[state.index].status = state_status.ERROR
+                    progress_metrics.finish_state(is_failed=True)
+                    print(f'{Fore.RED}State with index={state.index} failed: {e}{Style.RESET_ALL}')
                 except Exception as e:
                     self.states[state.index].status = state_status.ERROR
                     print(f'State with index={state.index} raise an Exception: {e}')
@@ -113,6 +135,17 @@ class BaseStatesMachine:
                     raise e
         return self.plot_windows
 
+    def keep_sweep_point(self):
+        distributions_settings = self.config.advanced_settings.runtime.distributions
+        if self.config.options.preserve_distributions and distributions_settings.keep_sweep_points:
+            # Sweep module depends on plotting, so it is not imported by states machine until it is needed
+            from wrapper.misc.collections.fields_integral.fields_integral_sweep import store_sweep_point
+            store_sweep_point(self.config)
+
+    def set_metrics(self, state_index: int):
+        if self.config.advanced_settings.runtime.watchdog.enable:
+            self.states[state_index].metrics = watchdog_metrics.as_dict()
+
     def init_machine(self):
         if self.config.modes.mtut_dataframe:
             input_df_manager = MtutDataFrameManager(self.config.paths.input.mtut_dataframe)
@@ -0,0 +1,143 @@
+"""
+Live monitor of "Treada" transient currents. Runs in a separate process (treada_launcher.py --monitor),
+attaches to the shared memory buffer published by the launcher and draws decimated currents with blitting.
+Several monitors can be attached to the same buffer at the same time.
+"""
+import math
+from typing import Union
+
+import numpy as np
+import matplotlib
+matplotlib.use('QtAgg')
+import matplotlib.pyplot as plt
+
+from wrapper.config.config_build import Config
+from wrapper.core.live_currents import LiveCurrentsReader
+
+
+def run_live_monitor(config: Config):
+    settings = config.advanced_settings.runtime.live_monitor
+    monitor = LiveCurrentsMonitor(name=settings.shared_memory_name,
+                                  max_plot_points=settings.max_plot_points,
+                                  refresh_interval_ms=settings.refresh_interval_ms)
+    print(f'Waiting for live currents of "{settings.shared_memory_name}". Close the plot window to exit.')
+    monitor.show()
+
+
+def decimate(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Takes each n-th row so that the number of rows does not exceed max_points. The last row is always kept.
+    """
+    if len(values) <= max_points:
+        return values
+    stride = math.ceil(len(values) / max_points)
+    decimated = values[::stride]
+    if (len(values) - 1) % stride:
+        decimated = np.concatenate((decimated, values[-1:]))
+    return decimated
+
+
+class LiveCurrentsMonitor:
+    """
+    Polls live currents buffer by the figure timer and redraws only the line, unless axes limits change.
+
+    Attributes:
+        records: (step, time_ps, current) records of current generation (stage)
+    Methods:
+        poll() -> bool
+        show()
+    """
+    def __init__(self, name: str, max_plot_points=5000, refresh_interval_ms=200):
+        self.name = name
+        self.max_plot_points = max_plot_points
+        self.refresh_interval_ms = refresh_interval_ms
+        self.reader: Union[LiveCurrentsReader, None] = None
+        self.generation = None
+        self.records = np.empty((0, 3))
+        self.is_rescale_needed = True
+        self.figure, self.ax = plt.subplots()
+        self.ax.set_xlabel('time (ps)')
+        self.ax.set_ylabel('I (A)')
+        self.line, = self.ax.plot([], [], animated=True)
+        self.background = None
+        self.figure.canvas.mpl_connect('draw_event', self.on_draw)
+        self.figure.canvas.mpl_connect('close_event', self.on_close)
+        self.timer = self.figure.canvas.new_timer(interval=refresh_interval_ms)
+        self.timer.add_callback(self.on_timer)
+
+    def attach(self) -> bool:
+        if self.reader is None:
+            try:
+                self.reader = LiveCurrentsReader(self.name)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def poll(self) -> bool:
+        """
+        Reads new records from the buffer. Records of the previous stage are dropped on a new generation.
+        :return: True if there are new records
+        """
+        if not self.attach():
+            return False
+        generation, new_records = self.reader.read_new()
+        if generation != self.generation:
+            self.generation = generation
+            self.records = np.empty((0, 3))
+            self.is_rescale_needed = True
+            self.ax.set_title(f'Stage {generation}')
+        if not len(new_records):
+            return False
+        self.records = np.concatenate((self.records, new_records))
+        # Stored history is thinned, so memory and redraw time stay bounded on long transients
+        if len(self.records) > 4 * self.max_plot_points:
+            self.records = decimate(self.records, 2 * self.max_plot_points)
+        return True
+
+    def update_line(self) -> bool:
+        """
+        Sets decimated records to the line.
+        :return: True if axes limits were changed and full redraw is needed
+        """
+        plot_records = decimate(self.records, self.max_plot_points)
+        self.line.set_data(plot_records[:, 1], plot_records[:, 2])
+        if not len(plot_records):
+            return False
+        x_min, x_max = plot_records[0, 1], plot_records[-1, 1]
+        y_min, y_max = plot_records[:, 2].min(), plot_records[:, 2].max()
+        (x_low, x_high), (y_low, y_high) = self.ax.get_xlim(), self.ax.get_ylim()
+        if not self.is_rescale_needed and x_max <= x_high and y_low <= y_min and y_max <= y_high:
+            return False
+        # Limits are extended with margins to make full redraws rare
+        self.is_rescale_needed = False
+        x_margin = (x_max - x_min) * 0.5 or 1.
+        y_margin = (y_max - y_min) * 0.1 or abs(y_max) * 0.1 or 1.
+        self.ax.set_xlim(x_min, x_max + x_margin)
+        self.ax.set_ylim(y_min - y_margin, y_max + y_margin)
+        return True
+
+    def on_timer(self):
+        if not self.poll():
+            return
+        canvas = self.figure.canvas
+        if self.update_line() or self.background is None:
+            canvas.draw()
+        else:
+            canvas.restore_region(self.background)
+            self.ax.draw_artist(self.line)
+            canvas.blit(self.ax.bbox)
+        canvas.flush_events()
+
+    def on_draw(self, event):
+        self.background = self.figure.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
+    def on_close(self, event):
+        self.timer.stop()
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def show(self):
+        self.timer.start()
+        plt.show()
@@ -8,6 +8,10 @@ from colorama import Fore, Style
 import matplotlib
 matplotlib.use('QtAgg')
 import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection
+from matplotlib.image import AxesImage
+from matplotlib.widgets import Slider
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 
@@ -16,6 +20,7 @@ from PySide6.QtWidgets import (
 )
 
 
+import numpy as np
 import pandas as pd
 
 # Add path to "project" directory in environ variable - PYTHONPATH for cases of independent launch
@@ -26,6 +31,7 @@ from wrapper.core.data_management import (
     TransientResultData, transient_cols, FileManager, TransientParameters, MtutManager, small_signal_cols
 )
 from wrapper.config.config_build import load_config, Config
+from wrapper.core.analysis_cache import analysis_cache
 from wrapper.misc import lin_alg as la
 from wrapper.ui.console import ConsoleUserInteractor
 
@@ -38,6 +44,10 @@ def main():
 def run_res_plotting(config: Config):
     app = QApplication()
     user_interactor = ConsoleUserInteractor()
+    memoization_settings = config.advanced_settings.result.memoization
+    analysis_cache.configure(enable=memoization_settings.enable,
+                             cache_dir=config.paths.result.cache,
+                             max_size_mb=memoization_settings.max_size_mb)
     result_path = os.path.split(config.paths.result.main)[0] + os.sep
     print(f'{result_path=}')
     run_flag = True
@@ -213,7 +223,7 @@ class TransientPlotBuilder:
             cklkrs=mtut_file_manager.get_var('CKLKRS'),
             emini=result_file_manager.get_var('EMINI'),
             emaxi=result_file_manager.get_var('EMAXI'),
-            full_df=pd.read_csv(result_path, skiprows=skip_rows, header=0, sep='\s+'),
+            full_df=load_result_dataframe(result_path, skip_rows),
         )
         return results
 
@@ -572,6 +582,154 @@ class WWDataPlotter(SimplePlotter):
         plt.ion()
 
 
+def ww_dict_to_arrays(ww_dict: dict) -> tuple:
+    """
+    :param ww_dict: WW data in the format of WWDataCollector.load_ww_data() with one WW number
+    :return: snapshot steps, x of the first snapshot, array (snapshots, x points) of profiles
+    """
+    steps = np.array(list(ww_dict), dtype=np.int64)
+    ww_dfs = [next(iter(ww_number_dict.values())) for ww_number_dict in ww_dict.values()]
+    x = ww_dfs[0]['x'].values
+    values = np.vstack([ww_df[ww_df.columns[2]].values for ww_df in ww_dfs])
+    return steps, x, values
+
+
+class WWDataOverlayPlotter(SimplePlotter):
+    """
+    Overlay of many WW snapshots, which are drawn by single LineCollection.
+    Snapshots are colored by the colormap keyed by snapshot step (shown by colorbar instead of legend).
+    """
+    def __init__(self, ww_dict: dict, stage_name: str, cmap='viridis', backend='TkAgg'):
+        matplotlib.use(backend)
+        super().__init__(x=[], y=[])
+        # Single lines are not drawn
+        self.handle.remove()
+        self.cmap = cmap
+        self.collections = []
+        self.colorbar = None
+        self.add_bulk_plots(ww_dict, stage_name)
+
+    def add_bulk_plots(self, ww_dict: dict, stage_name: str) -> LineCollection:
+        steps, x, values = ww_dict_to_arrays(ww_dict)
+        # Segments array (snapshots, x points, 2) is built without per snapshot copies
+        segments = np.empty(values.shape + (2,))
+        segments[:, :, 0] = x
+        segments[:, :, 1] = values
+        collection = LineCollection(segments, cmap=self.cmap, linewidths=1.)
+        collection.set_array(steps)
+        self.ax.add_collection(collection)
+        self.ax.autoscale_view()
+        if self.colorbar is None:
+            self.colorbar = self.fig.colorbar(collection, ax=self.ax, label=f'{stage_name} step')
+        else:
+            # Common colormap range for all overlaid collections
+            step_limits = [min(steps.min(), self.colorbar.mappable.norm.vmin),
+                           max(steps.max(), self.colorbar.mappable.norm.vmax)]
+            for overlaid_collection in self.collections + [collection]:
+                overlaid_collection.set_clim(*step_limits)
+        self.collections.append(collection)
+        return collection
+
+
+class WWDataAnimationPlotter(SimplePlotter):
+    """
+    Animation of WW snapshots. Data of one line is updated on each frame and only the line is redrawn (blitting).
+    """
+    def __init__(self, ww_dict: dict, stage_name: str, interval_ms=50, backend='TkAgg'):
+        matplotlib.use(backend)
+        self.steps, x, self.values = ww_dict_to_arrays(ww_dict)
+        super().__init__(x=x, y=self.values[0])
+        # Axes limits are fixed, because the background is not redrawn with blitting
+        self.ax.set_ylim(*self.calculate_y_limits())
+        self.step_text = self.ax.text(0.02, 0.95, '', transform=self.ax.transAxes)
+        self.stage_name = stage_name
+        self.animation = FuncAnimation(self.fig, self.update_frame, frames=len(self.steps),
+                                       interval=interval_ms, blit=True)
+
+    def calculate_y_limits(self) -> tuple:
+        y_min, y_max = np.nanmin(self.values), np.nanmax(self.values)
+        margin = 0.05 * (y_max - y_min) or 1.
+        return y_min - margin, y_max + margin
+
+    def update_frame(self, frame: int) -> tuple:
+        self.handle.set_ydata(self.values[frame])
+        self.step_text.set_text(f'{self.stage_name} step: {self.steps[frame]}')
+        return self.handle, self.step_text
+
+
+class WWGridPlotter:
+    """
+    Heatmap of 2-D WW data with a slider for scrubbing through snapshots.
+    Image data of one artist is replaced on snapshot change: imshow is used for uniform grids,
+    pcolormesh - for non-uniform ones.
+
+    Attributes:
+        fig: Matplotlib Figure object
+        ax: Matplotlib Axes object
+        image: heatmap artist
+        slider: snapshots slider
+    """
+    def __init__(self, values: np.ndarray, x: np.ndarray, y: np.ndarray, steps: List[int], stage_name: str,
+                 cmap='viridis', backend='TkAgg'):
+        """
+        :param values: array (snapshots, y points, x points) which is already downsampled for the screen
+        :param x: x coordinates
+        :param y: y coordinates
+        :param steps: snapshot steps
+        """
+        matplotlib.use(backend)
+        self.values = values
+        self.steps = steps
+        self.stage_name = stage_name
+        self.fig, self.ax = plt.subplots(1, 1)
+        self.fig.subplots_adjust(bottom=0.2)
+        color_limits = (np.nanmin(values), np.nanmax(values))
+        if self.is_uniform(x) and self.is_uniform(y):
+            self.image = self.ax.imshow(values[0], origin='lower', aspect='auto', cmap=cmap,
+                                        extent=self.calculate_extent(x, y), vmin=color_limits[0], vmax=color_limits[1])
+        else:
+            self.image = self.ax.pcolormesh(x, y, values[0], shading='nearest', cmap=cmap,
+                                            vmin=color_limits[0], vmax=color_limits[1])
+        self.fig.colorbar(self.image, ax=self.ax)
+        slider_ax = self.fig.add_axes((0.15, 0.05, 0.6, 0.04))
+        self.slider = Slider(slider_ax, 'snapshot', 0, len(steps) - 1, valinit=0, valstep=1)
+        self.slider.on_changed(self.show_snapshot)
+        self.show_snapshot(0)
+
+    @staticmethod
+    def is_uniform(coordinates: np.ndarray) -> bool:
+        if len(coordinates) < 3:
+            return True
+        coordinates_steps = np.diff(coordinates)
+        return np.allclose(coordinates_steps, coordinates_steps[0], rtol=1e-3)
+
+    @staticmethod
+    def calculate_extent(x: np.ndarray, y: np.ndarray) -> tuple:
+        """
+        :return: extent of imshow with pixels centered at coordinates
+        """
+        x_half_step = (x[1] - x[0]) / 2 if len(x) > 1 else 0.5
+        y_half_step = (y[1] - y[0]) / 2 if len(y) > 1 else 0.5
+        return x[0] - x_half_step, x[-1] + x_half_step, y[0] - y_half_step, y[-1] + y_half_step
+
+    def show_snapshot(self, position):
+        position = int(position)
+        if isinstance(self.image, AxesImage):
+            self.image.set_data(self.values[position])
+        else:
+            self.image.set_array(self.values[position].ravel())
+        self.ax.set_title(f'{self.stage_name} step: {self.steps[position]}')
+        self.fig.canvas.draw_idle()
+
+    def set_plot_axes_labels(self, x_label='x', y_label='y'):
+        self.ax.set_xlabel(x_label)
+        self.ax.set_ylabel(y_label)
+
+    @classmethod
+    def show(cls, block=True):
+        SimplePlotter.show(block)
+
+
 class SmallSignalPlotter(SimplePlotter):
     """
     Class that extends the abilities of SimplePlotter.
@@ -592,8 +750,14 @@ class ImpedancePlotBuilder:
     """
     def __init__(self,
                  result_path: str,
-                 skip_rows=None):
-        self.result_df = self.load_result(result_path, skip_rows)
+                 skip_rows=None,
+                 result_df: Union[pd.DataFrame, None] = None):
+        """
+        :param result_df: result dataframe, which is used instead of loading the result file
+        """
+        self.result_path = result_path
+        self.is_result_file_loaded = result_df is None
+        self.result_df = self.load_result(result_path, skip_rows) if result_df is None else result_df
         self.freq_direction = ''
         # Create plotter objects
         self.plotters = self.create_plotters()
@@ -601,7 +765,7 @@ class ImpedancePlotBuilder:
 
     @staticmethod
     def load_result(result_path, skip_rows) -> pd.DataFrame:
-        df = pd.read_csv(result_path, skiprows=skip_rows, header=0, sep='\s+')
+        df = load_result_dataframe(result_path, skip_rows)
         return df
 
     def create_plotters(self):
@@ -621,12 +785,23 @@ class ImpedancePlotBuilder:
         return plotters
 
     def calculate_z_parameter(self) -> tuple:
+        # Memoization key is the result file digest, so results which are not loaded from the file are not memoized
+        if analysis_cache.enabled and self.is_result_file_loaded:
+            key = analysis_cache.key('z_parameter', analysis_cache.file_digest(self.result_path))
+            z_arrays = analysis_cache.memoize(key, self._calculate_z_arrays)
+        else:
+            z_arrays = self._calculate_z_arrays()
+        z_real = pd.Series(z_arrays['z_real'], index=self.result_df.index)
+        z_img = pd.Series(z_arrays['z_img'], index=self.result_df.index)
+        print(pd.DataFrame({'z_real': z_real, 'z_img': z_img, }))
+        return z_real, z_img
+
+    def _calculate_z_arrays(self) -> Dict[str, np.ndarray]:
         y22_real = self.result_df[small_signal_cols.y22.real]
         y22_img = self.result_df[small_signal_cols.y22.img]
         z_real = y22_real / (y22_real**2 + y22_img**2)
         z_img = -y22_img / (y22_real**2 + y22_img**2)
-        print(pd.DataFrame({'z_real': z_real, 'z_img': z_img, }))
-        return z_real, z_img
+        return {'z_real': z_real.values, 'z_img': z_img.values}
 
     @staticmethod
     def define_frequency_direction(z_real: pd.Series) -> str:
@@ -663,6 +838,25 @@ class ImpedancePlotBuilder:
         plt.savefig(plot_path)
 
 
+def load_result_dataframe(result_path: str, skip_rows: Union[int, None]) -> pd.DataFrame:
+    """
+    Loads dataframe from result file. Parsed dataframe is memoized by the result file digest.
+    """
+    def read_result_file() -> Dict[str, np.ndarray]:
+        df = pd.read_csv(result_path, skiprows=skip_rows, header=0, sep='\s+')
+        # Cols are saved separately to keep their types
+        arrays = {f'col_{index}': df[col_name].values for index, col_name in enumerate(df.columns)}
+        arrays['columns'] = np.array(df.columns, dtype=str)
+        return arrays
+
+    if not analysis_cache.enabled:
+        return pd.read_csv(result_path, skiprows=skip_rows, header=0, sep='\s+')
+    key = analysis_cache.key('result_dataframe', analysis_cache.file_digest(result_path), skip_rows)
+    arrays = analysis_cache.memoize(key, read_result_file)
+    columns = arrays['columns'].tolist()
+    return pd.DataFrame({col_name: arrays[f'col_{index}'] for index, col_name in enumerate(columns)})
+
+
 def plot_joint_stages_data(scenario,
                            joint_stages: list,
                            mtut_path: str,
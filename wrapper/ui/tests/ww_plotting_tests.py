@@ -0,0 +1,80 @@
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pandas as pd
+
+# Plotting module sets matplotlib backend, so it is imported before pyplot
+from wrapper.ui.plotting import WWDataOverlayPlotter, WWDataAnimationPlotter, WWGridPlotter, ww_dict_to_arrays
+import matplotlib.pyplot as plt
+from matplotlib.image import AxesImage
+
+
+SNAPSHOTS_NUMBER = 1000
+X_POINTS = 200
+
+
+def build_ww_dict(first_step=100, snapshots_number=SNAPSHOTS_NUMBER) -> dict:
+    x = np.linspace(0., 10., X_POINTS)
+    ww_dict = {}
+    for snapshot in range(snapshots_number):
+        step = first_step + 100 * snapshot
+        fields = np.exp(-(x - 5. - snapshot / snapshots_number) ** 2)
+        ww_dict[step] = {6: pd.DataFrame({'x': x, 'y': np.zeros_like(x), 'fields': fields})}
+    return ww_dict
+
+
+class WWDataPlottersTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ww_dict = build_ww_dict()
+
+    def tearDown(self) -> None:
+        plt.close('all')
+
+    def test_overlay_is_single_collection(self):
+        plotter = WWDataOverlayPlotter(self.ww_dict, 'light', backend='Agg')
+        self.assertEqual(len(plotter.ax.lines), 0)
+        self.assertEqual(len(plotter.ax.collections), 1)
+        self.assertIsNone(plotter.ax.get_legend())
+        steps, _, values = ww_dict_to_arrays(self.ww_dict)
+        np.testing.assert_array_equal(plotter.collections[0].get_array(), steps)
+        np.testing.assert_array_equal(plotter.collections[0].get_segments()[-1][:, 1], values[-1])
+        plotter.fig.canvas.draw()
+        # Added snapshots share the colormap range
+        plotter.add_bulk_plots(build_ww_dict(first_step=10 ** 6, snapshots_number=10), 'light')
+        self.assertEqual(len(plotter.ax.collections), 2)
+        self.assertEqual(plotter.collections[0].get_clim(), (steps[0], 10 ** 6 + 900))
+        self.assertEqual(plotter.collections[1].get_clim(), plotter.collections[0].get_clim())
+
+    def test_animation_updates_single_line(self):
+        plotter = WWDataAnimationPlotter(self.ww_dict, 'light', backend='Agg')
+        self.assertTrue(plotter.animation._blit)
+        self.assertEqual(len(plotter.ax.lines), 1)
+        plotter.fig.canvas.draw()
+        y_limits = plotter.ax.get_ylim()
+        _, _, values = ww_dict_to_arrays(self.ww_dict)
+        artists = plotter.update_frame(SNAPSHOTS_NUMBER - 1)
+        self.assertEqual(artists, (plotter.handle, plotter.step_text))
+        np.testing.assert_array_equal(plotter.handle.get_ydata(), values[-1])
+        self.assertIn(str(100 * SNAPSHOTS_NUMBER), plotter.step_text.get_text())
+        self.assertEqual(plotter.ax.get_ylim(), y_limits)
+
+
+    def test_grid_heatmap_scrubbing(self):
+        values = np.random.default_rng(0).random((50, 20, 40)).astype(np.float32)
+        steps = list(range(100, 5100, 100))
+        for y, is_uniform in ((np.arange(20.), True), (np.geomspace(1., 10., 20), False)):
+            with self.subTest(is_uniform=is_uniform):
+                plotter = WWGridPlotter(values, np.arange(40.), y, steps, 'light', backend='Agg')
+                # imshow for uniform grid, pcolormesh for non-uniform one
+                self.assertEqual(isinstance(plotter.image, AxesImage), is_uniform)
+                plotter.slider.set_val(49)
+                np.testing.assert_array_equal(np.asarray(plotter.image.get_array()).ravel(), values[49].ravel())
+                self.assertIn('5000', plotter.ax.get_title())
+                plotter.fig.canvas.draw()
+
+
+if __name__ == '__main__':
+    unittest.main()